@@ -0,0 +1,318 @@
+"""
+=============================================================================
+RUN_BENCHMARKS.PY - PERFORMANS ÖLÇÜM (BENCHMARK) ARACI
+=============================================================================
+
+Optimizasyon motoru ve analiz modülleri için bağımsız benchmark koşucusu.
+Her senaryo, generate_synthetic_players() ile üretilen farklı büyüklükteki
+oyuncu havuzlarında ölçülür ve sonuçlar JSON olarak yazılır. İki commit
+arasındaki sonuçlar --compare ile karşılaştırılabilir.
+
+Senaryolar:
+- load_fc26_data (gerçek CSV, havuz boyutundan bağımsız)
+- normalize_data
+- solve_optimal_lineup (her formasyon x strateji)
+- solve_alternative_lineup (rating/form/budget modları)
+- ParetoAnalyzer.generate_pareto_frontier
+- CompatibilityAnalyzer kurulumu
+- SensitivityAnalyzer.tornado_analysis
+- calculate_weighted_scores (toplu ağırlık ızgarası)
+- BenchAnalyzer metotları
+
+Kullanım:
+    python benchmarks/run_benchmarks.py --sizes 100 1000 --output bench.json
+    python benchmarks/run_benchmarks.py --compare eski.json --output yeni.json
+=============================================================================
+"""
+
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from statistics import mean, median
+from typing import Callable, Dict, List, Optional
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+import numpy as np
+import pandas as pd
+
+from src.config import FORMATIONS, STRATEGY_WEIGHTS
+from src.data_handler import load_fc26_data, normalize_data, generate_synthetic_players
+from src.optimizer import solve_optimal_lineup, solve_alternative_lineup
+from src.pareto_analysis import ParetoAnalyzer
+from src.compatibility import CompatibilityAnalyzer
+from src.sensitivity_analyzer import SensitivityAnalyzer
+from src.bench_analyzer import BenchAnalyzer
+from src.decision_analyzer import calculate_weighted_scores
+
+
+DEFAULT_SIZES = [100, 1000, 5000]
+
+# Karar destek sekmesindeki varsayılan ağırlıklar (main.py ile aynı)
+DEFAULT_WEIGHTS = {'rating': 0.25, 'form': 0.20, 'offense': 0.20, 'defense': 0.20, 'cost_penalty': 0.15}
+
+# Kadro bazlı senaryolarda kullanılan kadro büyüklükleri (11 = ilk 11, 25/40 = geniş kadro)
+SQUAD_SIZES = [11, 25, 40]
+
+# Toplu skorlama senaryosunda kullanılan ağırlık vektörü sayısı
+WEIGHT_GRID_SIZE = 5000
+
+# Bazı senaryolar havuz büyüklüğüyle hızla büyür; bu sınırların üstü atlanır
+MAX_POOL_SIZE = {
+    'solve_optimal_lineup': 5000,
+    'solve_alternative_lineup': 100000,
+    'generate_pareto_frontier': 1000000,
+    'bench_analyzer': 1000000,
+}
+
+
+def _git_commit() -> Optional[str]:
+    """Mevcut commit hash'i (git yoksa None)."""
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except Exception:
+        return None
+
+
+def _measure(func: Callable[[], object], repeats: int, warmup: int = 1) -> Dict[str, float]:
+    """Fonksiyonu warmup + repeats kez çalıştırıp süre istatistiklerini döndürür."""
+    for _ in range(warmup):
+        func()
+
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+
+    return {
+        'min_s': round(min(timings), 6),
+        'median_s': round(median(timings), 6),
+        'mean_s': round(mean(timings), 6),
+        'repeats': repeats
+    }
+
+
+def _budget_for(pool: pd.DataFrame) -> float:
+    """Havuz için gerçekçi bir bütçe: en pahalı 11 oyuncunun toplamının %60'ı."""
+    return float(pool['Fiyat_M'].nlargest(11).sum() * 0.6)
+
+
+def _run_scenario(results: List[Dict], scenario: str, size: Optional[int],
+                  func: Callable[[], object], repeats: int, verbose: bool, **params) -> None:
+    """Tek bir senaryoyu ölç ve sonuç listesine ekle."""
+    limit = MAX_POOL_SIZE.get(scenario.split('[')[0])
+    entry = {'scenario': scenario, 'pool_size': size, **params}
+
+    if limit is not None and size is not None and size > limit:
+        entry['status'] = 'skipped'
+    else:
+        try:
+            entry.update(_measure(func, repeats))
+            entry['status'] = 'ok'
+        except Exception as e:
+            entry['status'] = 'error'
+            entry['error'] = f"{type(e).__name__}: {e}"
+
+    results.append(entry)
+
+    if verbose:
+        timing = f"{entry['median_s'] * 1000:10.2f} ms" if entry['status'] == 'ok' else f"{entry['status']:>13}"
+        extra = ' '.join(f"{k}={v}" for k, v in params.items())
+        print(f"  {scenario:<40} n={str(size):<8} {timing}  {extra}")
+
+
+def run_benchmarks(sizes: List[int], repeats: int = 3, seed: int = 42,
+                   include_real_data: bool = True, verbose: bool = True) -> Dict:
+    """
+    Tüm senaryoları verilen havuz büyüklüklerinde çalıştırır.
+
+    Returns:
+        Dict: {'meta': {...}, 'results': [...]}
+    """
+    results: List[Dict] = []
+
+    if include_real_data:
+        if verbose:
+            print("Gerçek veri:")
+        _run_scenario(results, 'load_fc26_data', None, load_fc26_data,
+                      repeats=1, verbose=verbose)
+
+    for size in sizes:
+        if verbose:
+            print(f"Havuz büyüklüğü: {size}")
+
+        raw = generate_synthetic_players(size, seed=seed)
+        _run_scenario(results, 'normalize_data', size, lambda: normalize_data(raw),
+                      repeats, verbose)
+        pool = normalize_data(raw)
+        budget = _budget_for(pool)
+        weight_grid = np.random.default_rng(seed).uniform(0, 1, (WEIGHT_GRID_SIZE, 5))
+
+        # Optimizer: her formasyon x strateji
+        for formation in FORMATIONS:
+            for strategy in STRATEGY_WEIGHTS:
+                _run_scenario(
+                    results, 'solve_optimal_lineup', size,
+                    lambda f=formation, s=strategy: solve_optimal_lineup(pool, f, budget, s),
+                    repeats, verbose, formation=formation, strategy=strategy
+                )
+
+        for mode in ['rating', 'form', 'budget']:
+            _run_scenario(
+                results, 'solve_alternative_lineup', size,
+                lambda m=mode: solve_alternative_lineup(pool, '4-3-3', budget, m),
+                repeats, verbose, formation='4-3-3', mode=mode
+            )
+
+        _run_scenario(
+            results, 'generate_pareto_frontier', size,
+            lambda: ParetoAnalyzer(pool, budget).generate_pareto_frontier(num_solutions=10),
+            repeats, verbose
+        )
+
+        # Kadro bazlı senaryolar: havuzdan en yüksek rating'li k oyuncu
+        for squad_size in SQUAD_SIZES:
+            if squad_size > size:
+                continue
+            squad = pool.nlargest(squad_size, 'Rating')
+
+            _run_scenario(
+                results, 'CompatibilityAnalyzer', size,
+                lambda sq=squad: CompatibilityAnalyzer(sq),
+                repeats, verbose, squad_size=squad_size
+            )
+            _run_scenario(
+                results, 'tornado_analysis', size,
+                lambda sq=squad: SensitivityAnalyzer(sq, budget, DEFAULT_WEIGHTS).tornado_analysis(),
+                repeats, verbose, squad_size=squad_size
+            )
+            _run_scenario(
+                results, 'calculate_weighted_scores', size,
+                lambda sq=squad: calculate_weighted_scores(sq, weight_grid),
+                repeats, verbose, squad_size=squad_size, weights=WEIGHT_GRID_SIZE
+            )
+
+        starters = pool.nlargest(11, 'Rating')
+        bench = BenchAnalyzer(starters, pool)
+        first_pos = starters['Alt_Pozisyon'].iloc[0]
+        first_id = starters['ID'].iloc[0]
+
+        bench_methods = {
+            '__init__': lambda: BenchAnalyzer(starters, pool),
+            'find_position_backups': lambda: bench.find_position_backups(first_pos, top_n=5),
+            'build_bench_squad': lambda: bench.build_bench_squad(),
+            'analyze_injury_scenarios': lambda: bench.analyze_injury_scenarios(first_id, pool),
+            'analyze_squad_depth': lambda: bench.analyze_squad_depth(),
+        }
+        for method, func in bench_methods.items():
+            _run_scenario(results, f'bench_analyzer[{method}]', size, func,
+                          repeats, verbose)
+
+    return {
+        'meta': {
+            'commit': _git_commit(),
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'pandas': pd.__version__,
+            'sizes': sizes,
+            'repeats': repeats,
+            'seed': seed
+        },
+        'results': results
+    }
+
+
+def _result_key(entry: Dict) -> tuple:
+    """Karşılaştırma için senaryo anahtarı (süre alanları hariç)."""
+    ignore = {'min_s', 'median_s', 'mean_s', 'repeats', 'status', 'error'}
+    return tuple(sorted((k, str(v)) for k, v in entry.items() if k not in ignore))
+
+
+def compare_results(old: Dict, new: Dict, threshold: float = 1.25) -> List[Dict]:
+    """
+    İki benchmark çıktısını karşılaştırır.
+
+    Args:
+        old: Referans (eski commit) sonuçları
+        new: Yeni sonuçlar
+        threshold: Bu oranın üstündeki yavaşlamalar regresyon sayılır
+
+    Returns:
+        List: Her ortak senaryo için eski/yeni medyan ve oran
+    """
+    old_map = {_result_key(e): e for e in old['results'] if e.get('status') == 'ok'}
+
+    rows = []
+    for entry in new['results']:
+        ref = old_map.get(_result_key(entry))
+        if ref is None or entry.get('status') != 'ok':
+            continue
+        ratio = entry['median_s'] / ref['median_s'] if ref['median_s'] > 0 else float('inf')
+        rows.append({
+            'scenario': entry['scenario'],
+            'pool_size': entry['pool_size'],
+            'params': {k: v for k, v in entry.items()
+                       if k not in ('scenario', 'pool_size', 'min_s', 'median_s', 'mean_s', 'repeats', 'status')},
+            'old_median_s': ref['median_s'],
+            'new_median_s': entry['median_s'],
+            'ratio': round(ratio, 3),
+            'regression': ratio > threshold
+        })
+    return rows
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="KDS benchmark koşucusu")
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES,
+                        help="Sentetik havuz büyüklükleri")
+    parser.add_argument('--repeats', type=int, default=3, help="Senaryo başına tekrar sayısı")
+    parser.add_argument('--seed', type=int, default=42, help="Sentetik veri tohumu")
+    parser.add_argument('--output', type=Path, default=None, help="JSON çıktı dosyası")
+    parser.add_argument('--compare', type=Path, default=None, help="Karşılaştırılacak eski JSON")
+    parser.add_argument('--threshold', type=float, default=1.25,
+                        help="Regresyon eşiği (yeni/eski medyan oranı)")
+    parser.add_argument('--skip-real-data', action='store_true',
+                        help="load_fc26_data senaryosunu atla")
+    parser.add_argument('--quiet', action='store_true')
+    args = parser.parse_args(argv)
+
+    report = run_benchmarks(args.sizes, repeats=args.repeats, seed=args.seed,
+                            include_real_data=not args.skip_real_data,
+                            verbose=not args.quiet)
+
+    if args.output is not None:
+        args.output.write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding='utf-8')
+        print(f"Sonuçlar yazıldı: {args.output}")
+
+    if args.compare is not None:
+        old = json.loads(args.compare.read_text(encoding='utf-8'))
+        rows = compare_results(old, report, args.threshold)
+        regressions = [r for r in rows if r['regression']]
+
+        print(f"\nKarşılaştırma ({old['meta'].get('commit')} -> {report['meta'].get('commit')}):")
+        for r in rows:
+            flag = '  <-- REGRESYON' if r['regression'] else ''
+            print(f"  {r['scenario']:<40} n={str(r['pool_size']):<8} "
+                  f"{r['old_median_s'] * 1000:9.2f} -> {r['new_median_s'] * 1000:9.2f} ms "
+                  f"(x{r['ratio']:.2f}){flag}")
+
+        if regressions:
+            print(f"\n{len(regressions)} senaryoda regresyon (eşik x{args.threshold}).")
+            return 1
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -23,6 +23,8 @@ Kullanılan Teknikler:
 =============================================================================
 """
 
+import inspect
+
 import streamlit as st
 import pandas as pd
 
@@ -33,7 +35,7 @@ from src.config import (
     POSITIONAL_WEIGHTS
 )
 from src.data_handler import load_fc26_data, normalize_data
-from src.optimizer import solve_optimal_lineup, solve_alternative_lineup, check_formation_availability, calculate_position_score
+from src.optimizer import solve_optimal_lineup, solve_alternative_lineup, solve_chemistry_lineup, check_formation_availability, calculate_position_score, lineup_duals
 from src.visualizer import create_football_pitch, create_team_table, create_position_stats_table
 from src.ui_components import (
     apply_custom_css, render_main_title, render_metric_card,
@@ -44,16 +46,20 @@ from src.decision_analyzer import (
     calculate_weighted_score, calculate_squad_metrics, 
     rank_alternative_solutions, generate_decision_report, get_risk_alerts
 )
-from src.sensitivity_analyzer import SensitivityAnalyzer
+from src.sensitivity_analyzer import (
+    SensitivityAnalyzer, ReoptimizingSensitivityAnalyzer, MonteCarloRobustnessAnalyzer, MONTE_CARLO_NOISE
+)
 from src.alternative_solutions import (
     what_if_budget_analysis, what_if_rating_minimum, 
     what_if_formation_change
 )
-from src.explainability import SquadExplainer
+from src.explainability import CounterfactualExplainer, SquadExplainer
 from src.compatibility import CompatibilityAnalyzer
 from src.pareto_analysis import ParetoAnalyzer
 from src.narrative_builder import NarrativeBuilder
-from src.bench_analyzer import BenchAnalyzer
+from src.bench_analyzer import BenchAnalyzer, InjuryScenarioSimulator, get_depth_index
+from src.availability import solve_expected_lineup
+from src.lazy_analysis import LazyAnalysisRegistry, lineup_fingerprint
 
 
 # =============================================================================
@@ -79,6 +85,30 @@ def get_cached_data():
     return df_full
 
 
+# =============================================================================
+# PERFORMANS: LAZY SEKMELER VE ANALİZ ÖNBELLEĞİ
+# =============================================================================
+# Sekme durumu takibi (yalnızca seçili sekmenin çalışması) yeni Streamlit
+# sürümlerinde var; eski sürümlerde tüm sekmeler eskisi gibi çalışır.
+LAZY_TABS_SUPPORTED = 'on_change' in inspect.signature(st.tabs).parameters
+
+
+def is_tab_open(tab) -> bool:
+    """Sekme seçili mi? Durum takibi yoksa True döner (sekme çalıştırılır)."""
+    return getattr(tab, 'open', None) is not False
+
+
+def get_analysis_registry() -> LazyAnalysisRegistry:
+    """
+    Oturuma ait ertelenmiş analiz kayıt defteri.
+    Sonuçlar kadro parmak izine göre önbellekte tutulur; aynı kadro için
+    sekmeler arasında gezinmek analizleri tekrar hesaplatmaz.
+    """
+    if 'analysis_registry' not in st.session_state:
+        st.session_state.analysis_registry = LazyAnalysisRegistry()
+    return st.session_state.analysis_registry
+
+
 def main():
     """
     Streamlit uygulamasının ana fonksiyonu.
@@ -209,6 +239,8 @@ def main():
             {"id": "budget", "isim": "Bütçe Dostu", "icon": "💰", "aciklama": "En verimli kadro"},
             {"id": "attack", "isim": "Hücum Ağırlıklı", "icon": "⚔️", "aciklama": "Maksimum hücum gücü"},
             {"id": "defense", "isim": "Defans Ağırlıklı", "icon": "🛡️", "aciklama": "Maksimum defans gücü"},
+            {"id": "chemistry", "isim": "Kimya Odaklı", "icon": "🤝", "aciklama": "Oyuncu uyumu dahil optimizasyon"},
+            {"id": "expected", "isim": "Müsaitlik Odaklı", "icon": "🩺", "aciklama": "Oynama olasılığı ve bench ile beklenen skor"},
         ]
         
         # Session state'de mod indeksini tut
@@ -311,19 +343,31 @@ def main():
                 selected_df, total_score, total_cost, status = solve_alternative_lineup(
                     df, formation, budget, kadro_mod
                 )
+            elif kadro_mod == "expected":
+                # Oynama olasılıkları + bench ile beklenen skor
+                selected_df, total_score, total_cost, status = solve_expected_lineup(
+                    df, formation, budget, effective_strategy
+                )
+            elif kadro_mod == "chemistry":
+                # Skor + ikili uyum (kimya) - yerel arama
+                selected_df, total_score, total_cost, status = solve_chemistry_lineup(
+                    df, formation, budget, effective_strategy
+                )
             else:
                 # Normal optimizasyon
                 selected_df, total_score, total_cost, status = solve_optimal_lineup(
                     df, formation, budget, effective_strategy, use_flexible_positions=True
                 )
         
-        if status == 'Optimal' and selected_df is not None:
+        # Kimya modu yerel arama sonucudur ('Heuristic'): geçerli ama optimalliği kanıtlanmamış
+        if status in ('Optimal', 'Heuristic') and selected_df is not None:
             st.session_state.selected_df = selected_df
             st.session_state.total_score = total_score
             st.session_state.total_cost = total_cost
             st.session_state.status = status
             st.session_state.formation = formation
             st.session_state.team = selected_team
+            st.session_state.strategy = effective_strategy
         else:
             st.error(
                 f"❌ Optimizasyon başarısız! Status: {status}\n\n"
@@ -347,7 +391,13 @@ def main():
         current_formation = st.session_state.get('formation', formation)
         
         # Takım ve formasyon başlığı
-        st.markdown(f"### {get_icon('app_logo')} {current_team} - {current_formation} Optimal Kadro", unsafe_allow_html=True)
+        heuristic = st.session_state.get('status') == 'Heuristic'
+        st.markdown(
+            f"### {get_icon('app_logo')} {current_team} - {current_formation} "
+            f"{'Sezgisel' if heuristic else 'Optimal'} Kadro", unsafe_allow_html=True
+        )
+        if heuristic:
+            st.caption("⚠️ Bu kadro süre sınırlı yerel aramayla bulundu; optimal olduğu kanıtlanmamıştır.")
         
         # Ortalama rating varsa göster
         avg_rating = selected_df['Rating'].mean() if 'Rating' in selected_df.columns else 0
@@ -372,9 +422,45 @@ def main():
         
         st.markdown("<br>", unsafe_allow_html=True)
         
+        # =====================================================================
+        # ERTELENMİŞ ANALİZLER (yalnızca ilgili sekme açılınca hesaplanır)
+        # =====================================================================
+        weights = {'rating': 0.25, 'form': 0.20, 'offense': 0.20, 'defense': 0.20, 'cost_penalty': 0.15}
+        
+        analyses = get_analysis_registry()
+        analyses.activate(lineup_fingerprint(
+            selected_df, current_team, selected_team, current_formation, budget, round(total_score, 6)
+        ))
+        analyses.register('decision', lambda: generate_decision_report(
+            selected_df, total_score, budget, current_formation, weights
+        ))
+        
+        def run_sensitivity():
+            analyzer = SensitivityAnalyzer(selected_df, budget, weights)
+            return analyzer, analyzer.parameter_ranking()
+        
+        analyses.register('sensitivity', run_sensitivity)
+        analyses.register('compatibility', lambda: CompatibilityAnalyzer(selected_df))
+        pareto_strategy = st.session_state.get('strategy', strategy)
+        analyses.register('pareto_frontier', lambda: ParetoAnalyzer(
+            df_full, budget, current_formation, pareto_strategy
+        ).generate_pareto_frontier(num_solutions=10))
+        analyses.register('narrative', lambda: NarrativeBuilder(selected_df, current_formation, budget))
+        analyses.register('counterfactual', lambda: CounterfactualExplainer(
+            df, current_formation, budget, pareto_strategy
+        ).batch(workers=1))
+        analyses.register('explainer', lambda: SquadExplainer(
+            selected_df, df, duals=lineup_duals(df, current_formation, budget, pareto_strategy)
+        ))
+        analyses.register('bench', lambda: BenchAnalyzer(selected_df, df))
+        analyses.register('injury_sweep', lambda: InjuryScenarioSimulator(
+            df, selected_df, current_formation, budget, pareto_strategy
+        ).run(max_absences=2, workers=1))
+        
         # =====================================================================
         # SEKMELER
         # =====================================================================
+        tab_kwargs = {'key': 'aktif_sekme', 'on_change': 'rerun'} if LAZY_TABS_SUPPORTED else {}
         tab1, tab2, tab3, tab4, tab5, tab6, tab7, tab8, tab9, tab10 = st.tabs([
             "Saha Görünümü", 
             "Kadro Listesi",
@@ -386,7 +472,7 @@ def main():
             "Pareto Frontier",
             "Kadro Raporu",
             "Bench & Yedekler"
-        ])
+        ], **tab_kwargs)
         
         # -----------------------------------------------------------------
         # TAB 1: SAHA GÖRÜNÜMÜ
@@ -456,6 +542,9 @@ def main():
             # Renk kodları açıklaması
             render_info_box_with_sub_positions()
         
+        # İlk 11 çizildi; kalan analizleri arka planda hazırla
+        analyses.prefetch()
+        
         # -----------------------------------------------------------------
         # TAB 2: KADRO LİSTESİ
         # -----------------------------------------------------------------
@@ -502,15 +591,21 @@ def main():
             
             filtered_df = filtered_df.sort_values(sort_by, ascending=False)
             filtered_df['Durum'] = filtered_df['Sakatlik'].map({0: '✅', 1: '🤕'})
+            if 'Durum_Kodu' in filtered_df.columns:
+                # FPL durumu: şüpheli / cezalı / kadro dışı
+                filtered_df['Durum'] = filtered_df['Durum_Kodu'].map(
+                    {'a': '✅', 'd': '⚠️', 'i': '🤕', 's': '⛔', 'u': '⛔', 'n': '⛔'}
+                ).fillna(filtered_df['Durum'])
+            filtered_df['Müsaitlik'] = (filtered_df.get('Oynama_Olasiligi', 1.0) * 100).round(0)
             filtered_df['Seçildi'] = filtered_df['ID'].isin(selected_df['ID']).map({True: '⭐', False: ''})
             
             # Gösterilecek sütunlar
             display_all = filtered_df[[
                 'Seçildi', 'Oyuncu', 'Alt_Pozisyon', 'Rating', 'Fiyat_M',
-                'Form', 'Ofans_Gucu', 'Defans_Gucu', 'Durum'
+                'Form', 'Ofans_Gucu', 'Defans_Gucu', 'Müsaitlik', 'Durum'
             ]].copy()
             
-            display_all.columns = ['✓', 'Oyuncu', 'Poz', 'OVR', '£M', 'Form', 'Ofans', 'Defans', '']
+            display_all.columns = ['✓', 'Oyuncu', 'Poz', 'OVR', '£M', 'Form', 'Ofans', 'Defans', 'Oynama %', '']
             
             st.dataframe(display_all, use_container_width=True, hide_index=True, height=400)
             st.markdown(f"<small>{len(filtered_df)} oyuncu | {get_icon('score')} = İlk 11'de</small>", unsafe_allow_html=True)
@@ -519,562 +614,946 @@ def main():
         # TAB 4: OYUNCU ÖNERİLERİ
         # -----------------------------------------------------------------
         with tab4:
-            st.markdown(f"### {get_icon('score')} Alternatif Oyuncu Önerileri", unsafe_allow_html=True)
-            st.markdown("Gerçek Maç İstatistiklerine (xG, xA, Tackles, vb.) dayalı akıllı öneri sistemi.")
+            if is_tab_open(tab4):
+                st.markdown(f"### {get_icon('score')} Alternatif Oyuncu Önerileri", unsafe_allow_html=True)
+                st.markdown("Gerçek Maç İstatistiklerine (xG, xA, Tackles, vb.) dayalı akıllı öneri sistemi.")
             
-            col_rec1, col_rec2 = st.columns([1, 2])
+                col_rec1, col_rec2 = st.columns([1, 2])
             
-            with col_rec1:
-                rec_pos = st.selectbox(
-                    "Hangi Mevki İçin Öneri İstiyorsunuz?",
-                    options=list(POSITIONAL_WEIGHTS.keys()),
-                    index=list(POSITIONAL_WEIGHTS.keys()).index('ST'), # Default ST
-                    format_func=format_position_display
-                )
+                with col_rec1:
+                    rec_pos = st.selectbox(
+                        "Hangi Mevki İçin Öneri İstiyorsunuz?",
+                        options=list(POSITIONAL_WEIGHTS.keys()),
+                        index=list(POSITIONAL_WEIGHTS.keys()).index('ST'), # Default ST
+                        format_func=format_position_display
+                    )
                 
-                st.info(f"""
-                **{rec_pos} İçin Kullanılan Metrikler:**
-                """ + "\n".join([f"- {k}: %{v*100:.0f}" for k, v in POSITIONAL_WEIGHTS[rec_pos].items()]))
+                    st.info(f"""
+                    **{rec_pos} İçin Kullanılan Metrikler:**
+                    """ + "\n".join([f"- {k}: %{v*100:.0f}" for k, v in POSITIONAL_WEIGHTS[rec_pos].items()]))
 
-            with col_rec2:
-                # Sadece bu pozisyona uygun oyuncuları filtrele
-                from src.config import POSITION_CAN_BE_FILLED_BY
-                eligible_positions = POSITION_CAN_BE_FILLED_BY.get(rec_pos, [rec_pos])
-                rec_candidates = df_full[df_full['Alt_Pozisyon'].isin(eligible_positions)].copy()
-                
-                # Skor hesapla
-                rec_candidates['Recommendation_Score'] = rec_candidates.apply(
-                    lambda row: calculate_position_score(row, rec_pos), axis=1
-                )
+                with col_rec2:
+                    # Sadece bu pozisyona uygun oyuncuları filtrele
+                    from src.config import POSITION_CAN_BE_FILLED_BY
+                    eligible_positions = POSITION_CAN_BE_FILLED_BY.get(rec_pos, [rec_pos])
+                    rec_candidates = df_full[df_full['Alt_Pozisyon'].isin(eligible_positions)].copy()
                 
-                # Sırala
-                top_candidates = rec_candidates.sort_values('Recommendation_Score', ascending=False).head(10)
+                    # Skor hesapla
+                    rec_candidates['Recommendation_Score'] = rec_candidates.apply(
+                        lambda row: calculate_position_score(row, rec_pos), axis=1
+                    )
                 
-                # Tablo Gösterimi
-                st.markdown(f"#### {get_icon('chart')} En İyi {rec_pos} Oyuncuları", unsafe_allow_html=True)
+                    # Sırala
+                    top_candidates = rec_candidates.sort_values('Recommendation_Score', ascending=False).head(10)
                 
-                # Gösterilecek dinamik sütunlar (o pozisyon için önemli olanlar)
-                important_stats = list(POSITIONAL_WEIGHTS[rec_pos].keys())
-                display_cols = ['Oyuncu', 'Takim', 'Recommendation_Score', 'Fiyat_M']
+                    # Tablo Gösterimi
+                    st.markdown(f"#### {get_icon('chart')} En İyi {rec_pos} Oyuncuları", unsafe_allow_html=True)
                 
-                # Stat sütunlarını ekle (raw values)
-                for stat in important_stats:
-                    stat_col = f"stat_{stat}"
-                    if stat_col in top_candidates.columns:
-                        display_cols.append(stat_col)
+                    # Gösterilecek dinamik sütunlar (o pozisyon için önemli olanlar)
+                    important_stats = list(POSITIONAL_WEIGHTS[rec_pos].keys())
+                    display_cols = ['Oyuncu', 'Takim', 'Recommendation_Score', 'Fiyat_M']
                 
-                display_rec = top_candidates[display_cols].copy()
+                    # Stat sütunlarını ekle (raw values)
+                    for stat in important_stats:
+                        stat_col = f"stat_{stat}"
+                        if stat_col in top_candidates.columns:
+                            display_cols.append(stat_col)
                 
-                # Formatlama
-                display_rec['Recommendation_Score'] = display_rec['Recommendation_Score'].map('{:.1f}'.format)
-                display_rec['Fiyat_M'] = display_rec['Fiyat_M'].map('£{:.1f}M'.format)
+                    display_rec = top_candidates[display_cols].copy()
                 
-                st.dataframe(
-                    display_rec,
-                    column_config={
-                        "Recommendation_Score": st.column_config.ProgressColumn(
-                            "Skor (0-100)",
-                            help="Pozisyonel ağırlıklara göre hesaplanan gerçek performans skoru",
-                            format="%s",
-                            min_value=0,
-                            max_value=100,
-                        ),
-                    },
-                    hide_index=True,
-                    use_container_width=True
-                )
+                    # Formatlama
+                    display_rec['Recommendation_Score'] = display_rec['Recommendation_Score'].map('{:.1f}'.format)
+                    display_rec['Fiyat_M'] = display_rec['Fiyat_M'].map('£{:.1f}M'.format)
+                
+                    st.dataframe(
+                        display_rec,
+                        column_config={
+                            "Recommendation_Score": st.column_config.ProgressColumn(
+                                "Skor (0-100)",
+                                help="Pozisyonel ağırlıklara göre hesaplanan gerçek performans skoru",
+                                format="%s",
+                                min_value=0,
+                                max_value=100,
+                            ),
+                        },
+                        hide_index=True,
+                        use_container_width=True
+                    )
         
         # -----------------------------------------------------------------
         # TAB 5: KARAR DESTEK ANALİZİ
         # -----------------------------------------------------------------
         with tab5:
-            st.markdown(f"### {get_icon('analytics')} Karar Destek Sistemi", unsafe_allow_html=True)
-            
-            # Karar raporu oluştur
-            weights = {'rating': 0.25, 'form': 0.20, 'offense': 0.20, 'defense': 0.20, 'cost_penalty': 0.15}
-            decision_report = generate_decision_report(selected_df, total_score, budget, current_formation, weights)
-            
-            # 1. Kadro Raporu
-            st.subheader("📊 Kadro Analiz Raporu")
-            
-            col_d1, col_d2, col_d3 = st.columns(3)
-            with col_d1:
-                st.metric("Toplam Skor", f"{decision_report['weighted_score']:.2f}", "0-100 skala")
-            with col_d2:
-                st.metric("Bütçe Kullanımı", f"{decision_report['budget_utilization']:.1f}%", f"£{decision_report['total_cost']:.1f}M")
-            with col_d3:
-                st.metric("Risk Sayısı", len(decision_report['risk_alerts']), "Dikkat Noktası")
-            
-            # 2. Güçlü ve Zayıf Yönler
-            col_str1, col_str2 = st.columns(2)
-            
-            with col_str1:
-                st.subheader("💪 Güçlü Yönler")
-                for strength in decision_report['strengths']:
-                    st.write(strength)
-            
-            with col_str2:
-                st.subheader("⚠️ Zayıf Yönler")
-                for weakness in decision_report['weaknesses']:
-                    st.write(weakness)
-            
-            # 3. Risk Uyarıları
-            if decision_report['risk_alerts']:
-                st.subheader("🚨 Risk Uyarıları")
-                for alert in decision_report['risk_alerts']:
-                    if alert['level'] == 'high':
-                        st.error(f"**{alert['type']}**: {alert['message']}")
-                    else:
-                        st.warning(f"**{alert['type']}**: {alert['message']}")
+            if is_tab_open(tab5):
+                st.markdown(f"### {get_icon('analytics')} Karar Destek Sistemi", unsafe_allow_html=True)
             
-            # 4. Öneriler
-            st.subheader("💡 Tavsiyeler")
-            for rec in decision_report['recommendations']:
-                st.write(rec)
+                # Karar raporu (önbellekten)
+                decision_report = analyses.get('decision')
             
-            # 5. Duyarlılık Analizi
-            st.divider()
-            st.subheader("📈 Duyarlılık Analizi (Sensitivity Analysis)")
+                # 1. Kadro Raporu
+                st.subheader("📊 Kadro Analiz Raporu")
             
-            col_sens1, col_sens2 = st.columns(2)
+                col_d1, col_d2, col_d3 = st.columns(3)
+                with col_d1:
+                    st.metric("Toplam Skor", f"{decision_report['weighted_score']:.2f}", "0-100 skala")
+                with col_d2:
+                    st.metric("Bütçe Kullanımı", f"{decision_report['budget_utilization']:.1f}%", f"£{decision_report['total_cost']:.1f}M")
+                with col_d3:
+                    st.metric("Risk Sayısı", len(decision_report['risk_alerts']), "Dikkat Noktası")
             
-            with col_sens1:
-                st.info("Hangi parametrenin kadraya en çok etki ettiğini görmek için seçin:")
-                param_to_analyze = st.selectbox(
-                    "Parametre Seçin:",
-                    options=['rating', 'form', 'offense', 'defense', 'cost_penalty'],
-                    format_func=lambda x: x.replace('_', ' ').title()
-                )
+                # 2. Güçlü ve Zayıf Yönler
+                col_str1, col_str2 = st.columns(2)
+            
+                with col_str1:
+                    st.subheader("💪 Güçlü Yönler")
+                    for strength in decision_report['strengths']:
+                        st.write(strength)
+            
+                with col_str2:
+                    st.subheader("⚠️ Zayıf Yönler")
+                    for weakness in decision_report['weaknesses']:
+                        st.write(weakness)
             
-            with col_sens2:
-                st.info(f"Seçilen parametre: {param_to_analyze.replace('_', ' ').title()}")
+                # 3. Risk Uyarıları
+                if decision_report['risk_alerts']:
+                    st.subheader("🚨 Risk Uyarıları")
+                    for alert in decision_report['risk_alerts']:
+                        if alert['level'] == 'high':
+                            st.error(f"**{alert['type']}**: {alert['message']}")
+                        else:
+                            st.warning(f"**{alert['type']}**: {alert['message']}")
             
-            # Duyarlılık analizi çalıştır
-            try:
-                sensitivity_analyzer = SensitivityAnalyzer(selected_df, budget, weights)
-                tornado_df = sensitivity_analyzer.tornado_analysis()
-                ranking_df = sensitivity_analyzer.parameter_ranking()
+                # 4. Öneriler
+                st.subheader("💡 Tavsiyeler")
+                for rec in decision_report['recommendations']:
+                    st.write(rec)
+            
+                # 5. Duyarlılık Analizi
+                st.divider()
+                st.subheader("📈 Duyarlılık Analizi (Sensitivity Analysis)")
+            
+                col_sens1, col_sens2 = st.columns(2)
+            
+                with col_sens1:
+                    st.info("Hangi parametrenin kadraya en çok etki ettiğini görmek için seçin:")
+                    param_to_analyze = st.selectbox(
+                        "Parametre Seçin:",
+                        options=['rating', 'form', 'offense', 'defense', 'cost_penalty'],
+                        format_func=lambda x: x.replace('_', ' ').title()
+                    )
+            
+                with col_sens2:
+                    st.info(f"Seçilen parametre: {param_to_analyze.replace('_', ' ').title()}")
+            
+                # Duyarlılık analizi çalıştır
+                try:
+                    sensitivity_analyzer, ranking_df = analyses.get('sensitivity')
+                
+                    st.write("**Parametre Etki Sıralaması (Tornado Analizi):**")
+                    st.dataframe(ranking_df[['Sıra', 'Parametre', 'Etki_Büyüklüğü', 'Yüzde_Etki']], hide_index=True)
                 
-                st.write("**Parametre Etki Sıralaması (Tornado Analizi):**")
-                st.dataframe(ranking_df[['Sıra', 'Parametre', 'Etki_Büyüklüğü', 'Yüzde_Etki']], hide_index=True)
+                    # Seçili parametre için detay
+                    param_sensitivity = analyses.get(
+                        f'sensitivity:{param_to_analyze}',
+                        lambda: sensitivity_analyzer.analyze_weight_sensitivity(param_to_analyze, step=0.05)
+                    )
                 
-                # Seçili parametre için detay
-                param_sensitivity = sensitivity_analyzer.analyze_weight_sensitivity(param_to_analyze, step=0.05)
+                    col_chart1, col_chart2 = st.columns(2)
                 
-                col_chart1, col_chart2 = st.columns(2)
+                    with col_chart1:
+                        st.write(f"**{param_to_analyze.title()} Parametresinin Etkisi:**")
+                        st.dataframe(param_sensitivity, hide_index=True)
                 
-                with col_chart1:
-                    st.write(f"**{param_to_analyze.title()} Parametresinin Etkisi:**")
-                    st.dataframe(param_sensitivity, hide_index=True)
+                    with col_chart2:
+                        # Grafik oluştur
+                        import plotly.graph_objects as go
+                        fig = go.Figure()
+                        fig.add_trace(go.Scatter(
+                            x=param_sensitivity['Yüzde_Değişim'],
+                            y=param_sensitivity['Skor'],
+                            mode='lines+markers',
+                            name='Skor',
+                            line=dict(color='#1a472a', width=3),
+                            marker=dict(size=8, color='#d4af37')
+                        ))
+                        fig.update_layout(
+                            title=f"{param_to_analyze.title()} Sensitivitesi",
+                            xaxis_title="Parametre Değişimi (%)",
+                            yaxis_title="Kadro Skoru",
+                            template="plotly_white",
+                            height=400,
+                            hovermode='x unified'
+                        )
+                        st.plotly_chart(fig, use_container_width=True)
+            
+                except Exception as e:
+                    st.error(f"Duyarlılık analizi hesaplanırken hata: {e}")
                 
-                with col_chart2:
-                    # Grafik oluştur
+                # 6. Yeniden optimizasyonlu duyarlılık
+                st.divider()
+                st.subheader("🔁 Yeniden Optimizasyonlu Duyarlılık")
+                st.markdown(
+                    "Strateji ağırlıkları, istatistik payı ve bütçe değiştirildiğinde kadro "
+                    "**yeniden optimize edilir**. Aşağıdaki sınırlar içinde mevcut kadro optimal kalır."
+                )
+                
+                try:
+                    reopt_analyzer = analyses.get('reopt_analyzer', lambda: ReoptimizingSensitivityAnalyzer(
+                        df, current_formation, budget, st.session_state.get('strategy', strategy)
+                    ))
+                    
+                    with st.spinner("Kararlılık aralıkları hesaplanıyor..."):
+                        stability = analyses.get('stability_ranges', reopt_analyzer.stability_ranges)
+                    
+                    st.write("**Kadronun Optimal Kaldığı Kesin Aralıklar** (en hassas parametre üstte):")
+                    st.dataframe(stability, hide_index=True, use_container_width=True)
+                    st.caption(
+                        "Ağırlık ve istatistik payı sınırları 0-1 aralığında aranır; diğer parametreler "
+                        "sabit tutulur. Bütçe alt sınırı kadronun maliyeti, üst sınırı daha iyi bir "
+                        "kadronun alınabildiği en düşük bütçedir."
+                    )
+                    
+                    if st.checkbox("Tüm noktaları tara (±%50, 21 nokta x 5 parametre)", key="reopt_sensitivity"):
+                        with st.spinner("Pertürbasyonlar çözülüyor..."):
+                            reopt_sweep = analyses.get('reopt_sweep', reopt_analyzer.sweep)
+                        
+                        changes = reopt_sweep[reopt_sweep['Kadro_Değişti']]
+                        if changes.empty:
+                            st.success("✅ Hiçbir pertürbasyonda kadro değişmedi - kadro çok kararlı.")
+                        else:
+                            st.write("**Kadronun Değiştiği Noktalar:**")
+                            st.dataframe(
+                                changes[['Parametre', 'Yüzde_Değişim', 'Değer', 'Skor', 'Girenler',
+                                         'Çıkanlar', 'Yeniden_Optimizasyon_Kazancı']],
+                                hide_index=True, use_container_width=True
+                            )
+                except Exception as e:
+                    st.error(f"Yeniden optimizasyonlu duyarlılık hesaplanırken hata: {e}")
+                
+                # 7. Optimizer dual değerleri
+                st.divider()
+                st.subheader("🧮 Optimizer Açıklamaları (LP Dualleri)")
+                st.markdown(
+                    "Modelin LP gevşetmesinden gelen gölge fiyatlar: bütçenin ve her pozisyonun "
+                    "amaç fonksiyonuna marjinal katkısı, oyuncuların kadrodaki değeri."
+                )
+                
+                explainer = analyses.get('explainer')
+                dual_summary = explainer.optimizer_summary()
+                if dual_summary is None:
+                    st.info("Bu kadro için dual değerler hesaplanamadı.")
+                else:
+                    col_d1, col_d2, col_d3 = st.columns(3)
+                    col_d1.metric("Bütçe Gölge Fiyatı", f"{dual_summary['butce_golge_fiyati']:.3f}",
+                                  "Bağlayıcı" if dual_summary['butce_bagliyor'] else "Bağlayıcı değil")
+                    col_d2.metric("LP Skoru", f"{dual_summary['lp_skoru']:.2f}")
+                    col_d3.metric("LP Çözümü", "Tam sayılı" if dual_summary['tam_sayi'] else "Kesirli")
+                    
+                    st.write("**Pozisyon Marjinal Değerleri** (pozisyona bir oyuncu daha eklenmesinin skor etkisi):")
+                    st.dataframe(
+                        pd.DataFrame(list(dual_summary['pozisyon_marjinal'].items()),
+                                     columns=['Pozisyon', 'Marjinal_Değer']),
+                        hide_index=True, use_container_width=True
+                    )
+                    
+                    margins = explainer.optimizer_margins()
+                    col_m1, col_m2 = st.columns(2)
+                    with col_m1:
+                        st.write("**Kadrodaki Oyuncuların Değeri**")
+                        st.dataframe(
+                            margins[margins['Kadroda']][['Oyuncu', 'Pozisyon', 'Marjinal_Değer']],
+                            hide_index=True, use_container_width=True
+                        )
+                    with col_m2:
+                        st.write("**Kadroya En Yakın Oyuncular**")
+                        st.dataframe(
+                            margins[~margins['Kadroda']]
+                            .sort_values('İndirgenmiş_Maliyet')[['Oyuncu', 'Pozisyon', 'İndirgenmiş_Maliyet']]
+                            .head(10),
+                            hide_index=True, use_container_width=True
+                        )
+                    st.caption(
+                        "Atama modelleri dejenere olduğundan dual değerler tek değildir; "
+                        "indirgenmiş maliyet, kadroya girmek için gereken skor artışının alt sınırıdır."
+                    )
+                
+                # 8. Karşı-olgusal eşikler
+                st.divider()
+                st.subheader("🔮 Ne Gerekirdi? (Karşı-Olgusal Analiz)")
+                st.markdown(
+                    "Kadro dışındaki her oyuncunun ilk 11'e girmesi için gereken **en küçük skor artışı** "
+                    "veya **fiyat indirimi**; kadrodakiler için yerini kaybetmeden önceki skor marjı."
+                )
+                
+                counterfactual = analyses.get('counterfactual')
+                if counterfactual.empty:
+                    st.info("Karşı-olgusal analiz için optimal kadro bulunamadı.")
+                else:
+                    outside = counterfactual[~counterfactual['Kadroda']]
+                    st.dataframe(
+                        outside[['Oyuncu', 'Pozisyon', 'Fiyat_M', 'Gereken_Skor_Artışı',
+                                 'Gereken_Fiyat_İndirimi', 'Yeni_Fiyat', 'Durum']].round(2),
+                        hide_index=True, use_container_width=True
+                    )
+                    st.caption(
+                        "∞: yalnız bu değişiklik yetmez (ör. bütçe bağlayıcı değilken fiyat indirimi). "
+                        "Eşik değerinde oyuncu mevcut kadroyla eşit skorludur."
+                    )
+                
+                # 9. Monte Carlo sağlamlık analizi
+                st.divider()
+                st.subheader("🎲 Monte Carlo Sağlamlık Analizi")
+                st.markdown(
+                    "Form, Rating ve istatistik girdilerine rastgele gürültü eklenerek binlerce senaryoda "
+                    "kadro yeniden optimize edilir. Her oyuncunun **seçilme oranı** kadronun belirsizliğe "
+                    "karşı ne kadar sağlam olduğunu gösterir."
+                )
+                
+                mc_col1, mc_col2, mc_col3, mc_col4 = st.columns(4)
+                with mc_col1:
+                    mc_form = st.number_input("Form gürültüsü (σ, puan)", 0.0, 20.0,
+                                              MONTE_CARLO_NOISE['form'], 1.0, key="mc_form")
+                with mc_col2:
+                    mc_rating = st.number_input("Rating gürültüsü (σ, puan)", 0.0, 10.0,
+                                                MONTE_CARLO_NOISE['rating'], 0.5, key="mc_rating")
+                with mc_col3:
+                    mc_stat = st.number_input("İstatistik gürültüsü (σ, oran)", 0.0, 1.0,
+                                              MONTE_CARLO_NOISE['istatistik'], 0.05, key="mc_stat")
+                with mc_col4:
+                    mc_samples = st.selectbox("En fazla örnek", [1000, 2000, 5000, 10000], index=2, key="mc_samples")
+                
+                mc_name = f"monte_carlo_{mc_form}_{mc_rating}_{mc_stat}_{mc_samples}"
+                mc_result = analyses.get(mc_name) if analyses.is_ready(mc_name) else None
+                
+                if mc_result is None and st.button("🎲 Simülasyonu Başlat", key="mc_run"):
+                    try:
+                        mc_analyzer = MonteCarloRobustnessAnalyzer(
+                            df, current_formation, budget, st.session_state.get('strategy', strategy),
+                            noise={'form': mc_form, 'rating': mc_rating, 'istatistik': mc_stat}
+                        )
+                        progress = st.progress(0.0, text="Simülasyon başlıyor...")
+                        live_table = st.empty()
+                        
+                        # Ara sonuçlar her batch sonrası akıtılır
+                        for mc_result in mc_analyzer.run_iter(n_samples=mc_samples):
+                            progress.progress(
+                                mc_result['örnek_sayısı'] / mc_result['hedef_örnek'],
+                                text=f"{mc_result['örnek_sayısı']} örnek · en geniş güven aralığı "
+                                     f"±{mc_result['en_geniş_güven_aralığı']:.3f}"
+                            )
+                            live_table.dataframe(mc_result['oyuncu_frekansları'].head(15),
+                                                 hide_index=True, use_container_width=True)
+                        progress.empty()
+                        live_table.empty()
+                        
+                        if mc_result:
+                            analyses.get(mc_name, lambda: mc_result)
+                    except Exception as e:
+                        st.error(f"Monte Carlo analizi hesaplanırken hata: {e}")
+                
+                if mc_result:
+                    mc_m1, mc_m2, mc_m3 = st.columns(3)
+                    mc_m1.metric("Örnek Sayısı", mc_result['örnek_sayısı'],
+                                 "yakınsadı" if mc_result['yakınsadı'] else None)
+                    mc_m2.metric("Aynı Kadro Oranı", f"%{mc_result['temel_kadro_oranı'] * 100:.1f}")
+                    mc_m3.metric("Ort. Yeniden Optimizasyon Kazancı", mc_result['pişmanlık'].get('ortalama', 0))
+                    
+                    st.write("**Oyuncu Seçilme Oranları:**")
+                    st.dataframe(mc_result['oyuncu_frekansları'], hide_index=True, use_container_width=True)
+                    
                     import plotly.graph_objects as go
                     fig = go.Figure()
-                    fig.add_trace(go.Scatter(
-                        x=param_sensitivity['Yüzde_Değişim'],
-                        y=param_sensitivity['Skor'],
-                        mode='lines+markers',
-                        name='Skor',
-                        line=dict(color='#1a472a', width=3),
-                        marker=dict(size=8, color='#d4af37')
-                    ))
+                    fig.add_trace(go.Histogram(x=mc_result['optimal_skorlar'], name='Optimal kadro',
+                                               marker_color='#1a472a', opacity=0.7))
+                    fig.add_trace(go.Histogram(x=mc_result['temel_kadro_skorları'], name='Mevcut kadro',
+                                               marker_color='#d4af37', opacity=0.7))
                     fig.update_layout(
-                        title=f"{param_to_analyze.title()} Sensitivitesi",
-                        xaxis_title="Parametre Değişimi (%)",
-                        yaxis_title="Kadro Skoru",
+                        title="Skor Dağılımı (Gürültü Altında)",
+                        xaxis_title="Toplam Skor",
+                        yaxis_title="Örnek",
+                        barmode='overlay',
                         template="plotly_white",
-                        height=400,
-                        hovermode='x unified'
+                        height=350
                     )
                     st.plotly_chart(fig, use_container_width=True)
-            
-            except Exception as e:
-                st.error(f"Duyarlılık analizi hesaplanırken hata: {e}")
         
         # -----------------------------------------------------------------
         # TAB 6: SENARYO ANALİZİ
         # -----------------------------------------------------------------
         with tab6:
-            st.markdown(f"### {get_icon('scenarios')} What-If Senaryo Analizi", unsafe_allow_html=True)
-            st.markdown("Farklı parametreler değiştiğinde kadroya ne olacağını görmek için senaryoları test edin.")
-            
-            scenario_type = st.selectbox(
-                "Analiz Türü Seçin:",
-                options=[
-                    "Bütçe Senaryoları",
-                    "Rating Minimum Seviyeleri",
-                    "Formation Değişiklikleri"
-                ]
-            )
+            if is_tab_open(tab6):
+                st.markdown(f"### {get_icon('scenarios')} What-If Senaryo Analizi", unsafe_allow_html=True)
+                st.markdown("Farklı parametreler değiştiğinde kadroya ne olacağını görmek için senaryoları test edin.")
             
-            if scenario_type == "Bütçe Senaryoları":
-                st.subheader("💰 Bütçe What-If Analizi")
-                st.markdown("Bütçeyi %20 azaltır/arttırırsak ne olur?")
-                
-                budget_scenarios = what_if_budget_analysis(
-                    selected_df, 
-                    df_full,
-                    budget,
-                    budget_changes=[-0.2, -0.1, 0, 0.1, 0.2]
+                scenario_type = st.selectbox(
+                    "Analiz Türü Seçin:",
+                    options=[
+                        "Bütçe Senaryoları",
+                        "Rating Minimum Seviyeleri",
+                        "Formation Değişiklikleri"
+                    ]
                 )
+            
+                if scenario_type == "Bütçe Senaryoları":
+                    st.subheader("💰 Bütçe What-If Analizi")
+                    st.markdown("Bütçeyi %20 azaltır/arttırırsak ne olur?")
+                
+                    # Her seviye aynı takım havuzu ve formasyonla yeniden çözülür
+                    budget_scenarios = analyses.get('what_if_budget', lambda: what_if_budget_analysis(
+                        selected_df, 
+                        df,
+                        budget,
+                        budget_changes=[-0.2, -0.1, 0, 0.1, 0.2],
+                        formation=current_formation,
+                        strategy=pareto_strategy
+                    ))
                 
-                st.dataframe(budget_scenarios, hide_index=True, use_container_width=True)
+                    st.dataframe(budget_scenarios, hide_index=True, use_container_width=True)
                 
-                st.markdown("**Sonuç:** Bütçe değişiklikleri kadroya nasıl etki ediyor?")
-                for idx, row in budget_scenarios.iterrows():
-                    if row['Bütçe_Değişim'] == '+0%':
-                        st.info(f"📍 **Mevcut Senaryo**: {row['Tavsiye']}")
+                    st.markdown("**Sonuç:** Bütçe değişiklikleri kadroya nasıl etki ediyor?")
+                    for idx, row in budget_scenarios.iterrows():
+                        if row['Bütçe_Değişim'] == '+0%':
+                            st.info(f"📍 **Mevcut Senaryo**: {row['Tavsiye']}")
+                    
+                    # Serbest bütçe seviyesi: çözümler motor önbelleğinden gelir
+                    budget_change = st.select_slider(
+                        "Bütçe değişimi",
+                        options=list(range(-40, 45, 5)),
+                        value=0,
+                        format_func=lambda v: f"{v:+d}%",
+                        key='what_if_budget_change'
+                    )
+                    scenario = what_if_budget_analysis(
+                        selected_df, df, budget, [budget_change / 100],
+                        formation=current_formation, strategy=pareto_strategy
+                    ).iloc[0]
+                    if pd.isna(scenario['Skor']):
+                        st.warning(f"£{scenario['Yeni_Bütçe']:.1f}M ile {current_formation} kadrosu kurulamıyor.")
+                    else:
+                        col_b1, col_b2, col_b3 = st.columns(3)
+                        col_b1.metric("Skor", f"{scenario['Skor']:.2f}", f"{scenario['Skor_Farkı']:+.2f}")
+                        col_b2.metric("Maliyet", f"£{scenario['Maliyet']:.1f}M", f"£{scenario['Kalan_Bütçe']:.1f}M kalan")
+                        col_b3.metric("Değişen Oyuncu", int(scenario['Değişen_Oyuncu']))
+                        if scenario['Giren']:
+                            st.markdown(f"**Giren:** {scenario['Giren']}  \n**Çıkan:** {scenario['Çıkan']}")
             
-            elif scenario_type == "Rating Minimum Seviyeleri":
-                st.subheader("⭐ Minimum Rating Seviyeleri What-If Analizi")
-                st.markdown("Different quality levels (70, 75, 80, 85) ile ne kadrolar oluşturulabilir?")
+                elif scenario_type == "Rating Minimum Seviyeleri":
+                    st.subheader("⭐ Minimum Rating Seviyeleri What-If Analizi")
+                    st.markdown("Farklı kalite seviyelerinde (60-90) formasyona uygun hangi kadrolar kurulabilir?")
                 
-                rating_scenarios = what_if_rating_minimum(
-                    selected_df,
-                    df_full,
-                    budget,
-                    rating_thresholds=[70, 75, 80, 85]
-                )
+                    # Pozisyon bazlı uygunluk + yalnızca geçen eşiklerde gerçek çözüm
+                    rating_scenarios = analyses.get('what_if_rating', lambda: what_if_rating_minimum(
+                        selected_df,
+                        df,
+                        budget,
+                        rating_thresholds=list(range(60, 91)),
+                        formation=current_formation,
+                        strategy=pareto_strategy
+                    ))
                 
-                st.dataframe(rating_scenarios, hide_index=True, use_container_width=True)
+                    st.dataframe(
+                        rating_scenarios[rating_scenarios['Rating_Minimum'] % 5 == 0],
+                        hide_index=True, use_container_width=True
+                    )
+                    
+                    import plotly.express as px
+                    feasible = rating_scenarios[rating_scenarios['Durum'] == '✓ Mümkün']
+                    if not feasible.empty:
+                        fig = px.line(
+                            feasible, x='Rating_Minimum', y='Skor', markers=True,
+                            hover_data=['Maliyet', 'Ort_Rating', 'Değişen_Oyuncu'],
+                            labels={'Rating_Minimum': 'Minimum Rating', 'Skor': 'Optimal Skor'}
+                        )
+                        fig.update_layout(template="plotly_white", height=320)
+                        st.plotly_chart(fig, use_container_width=True)
                 
-                st.markdown("**Sonuç:** Kalite seviyesi arttıkça kaç oyuncu bulunabiliyor?")
+                    st.markdown("**Sonuç:** Kalite seviyesi arttıkça hangi pozisyonlar darboğaz oluyor?")
             
-            elif scenario_type == "Formation Değişiklikleri":
-                st.subheader("🎯 Formation What-If Analizi")
-                st.markdown("Farklı formasyonlarla ne kadar başarılı olabiliriz?")
+                elif scenario_type == "Formation Değişiklikleri":
+                    st.subheader("🎯 Formation What-If Analizi")
+                    st.markdown("Farklı formasyonlarla ne kadar başarılı olabiliriz?")
                 
-                formation_scenarios = what_if_formation_change(
-                    selected_df,
-                    df_full,
-                    budget,
-                    formations=['4-3-3', '4-4-2', '3-5-2', '5-3-2']
-                )
+                    # Her formasyon aynı takım havuzu ve bütçeyle yeniden çözülür
+                    formation_scenarios = analyses.get('what_if_formation', lambda: what_if_formation_change(
+                        selected_df,
+                        df,
+                        budget,
+                        formations=['4-3-3', '4-4-2', '3-5-2', '5-3-2'],
+                        strategy=pareto_strategy
+                    ))
                 
-                st.dataframe(formation_scenarios, hide_index=True, use_container_width=True)
+                    st.dataframe(formation_scenarios, hide_index=True, use_container_width=True)
                 
-                st.markdown("**Sonuç:** Formation değişiklikleri oyun gücüne nasıl etki ediyor?")
+                    st.markdown("**Sonuç:** Formation değişiklikleri oyun gücüne nasıl etki ediyor?")
+                    valid = formation_scenarios.dropna(subset=['Skor'])
+                    if not valid.empty:
+                        best = valid.loc[valid['Skor'].idxmax()]
+                        st.info(
+                            f"🏆 En yüksek skor: **{best['Formation']}** ({best['Skor']:.2f}, "
+                            f"{best['Skor_Farkı']:+.2f}) - {int(best['Değişen_Oyuncu'])} oyuncu değişikliği"
+                        )
         
         # -----------------------------------------------------------------
         # TAB 7: OYUNCU UYUMLULUĞU ANALİZİ
         # -----------------------------------------------------------------
         with tab7:
-            st.markdown(f"### {get_icon('team')} Oyuncu Uyumluluğu & Takım Kimyası", unsafe_allow_html=True)
-            
-            # Uyumluluk analizi
-            compatibility = CompatibilityAnalyzer(selected_df)
-            chemistry = compatibility.get_team_chemistry_score()
-            
-            # Kimya metrikleri
-            col_chem1, col_chem2, col_chem3, col_chem4 = st.columns(4)
-            
-            with col_chem1:
-                st.metric("Ortalama Uyumluluk", f"{chemistry['ortalama_uyumluluk']:.1f}/100", chemistry['takım_kimyası_seviyesi'])
-            with col_chem2:
-                st.metric("Genel Sinerji", f"{chemistry['genel_sinerji']:.1f}/100", "Tüm faktörler")
-            with col_chem3:
-                st.metric("Aynı Takımdan", f"{chemistry['aynı_takımdan_oyuncu_oranı']:.1f}%", "Kadroda")
-            with col_chem4:
-                st.metric("Pozisyon Dengesi", f"{chemistry['pozisyon_dengesi_skoru']:.1f}/100", "Dağılım")
-            
-            st.info(f"💡 **Takım Kimyası Tavsiyesi**: {chemistry['tavsiye']}")
-            
-            st.divider()
-            
-            # En iyi ve en kötü çiftler
-            col_best, col_worst = st.columns(2)
-            
-            with col_best:
-                st.subheader("✅ En Uyumlu Çiftler")
-                best_pairs = compatibility.get_best_pairs(top_n=5)
-                if best_pairs:
-                    for idx, pair in enumerate(best_pairs, 1):
-                        st.write(f"""
-                        **{idx}. {pair['Oyuncu 1']} ↔ {pair['Oyuncu 2']}**
-                        - Pozisyon: {pair['Pozisyon 1']} ↔ {pair['Pozisyon 2']}
-                        - Uyumluluk: {pair['Uyumluluk']:.1f}/100
-                        - {pair['Takım']}
-                        """)
+            if is_tab_open(tab7):
+                st.markdown(f"### {get_icon('team')} Oyuncu Uyumluluğu & Takım Kimyası", unsafe_allow_html=True)
             
-            with col_worst:
-                st.subheader("⚠️ Düşük Uyumlu Çiftler")
-                weak_pairs = compatibility.get_weak_pairs(top_n=5)
-                if weak_pairs:
-                    for idx, pair in enumerate(weak_pairs, 1):
-                        st.write(f"""
-                        **{idx}. {pair['Oyuncu 1']} ↔ {pair['Oyuncu 2']}**
-                        - Pozisyon: {pair['Pozisyon 1']} ↔ {pair['Pozisyon 2']}
-                        - Uyumluluk: {pair['Uyumluluk']:.1f}/100
-                        - Problem: {pair['Problem']}
-                        """)
+                # Uyumluluk analizi
+                compatibility = analyses.get('compatibility')
+                chemistry = compatibility.get_team_chemistry_score()
             
-            st.divider()
+                # Kimya metrikleri
+                col_chem1, col_chem2, col_chem3, col_chem4 = st.columns(4)
             
-            # Uyumluluk matrisi (heatmap benzeri)
-            st.subheader("📊 Uyumluluk Matrisi")
-            compat_matrix = compatibility.compatibility_matrix
+                with col_chem1:
+                    st.metric("Ortalama Uyumluluk", f"{chemistry['ortalama_uyumluluk']:.1f}/100", chemistry['takım_kimyası_seviyesi'])
+                with col_chem2:
+                    st.metric("Genel Sinerji", f"{chemistry['genel_sinerji']:.1f}/100", "Tüm faktörler")
+                with col_chem3:
+                    st.metric("Aynı Takımdan", f"{chemistry['aynı_takımdan_oyuncu_oranı']:.1f}%", "Kadroda")
+                with col_chem4:
+                    st.metric("Pozisyon Dengesi", f"{chemistry['pozisyon_dengesi_skoru']:.1f}/100", "Dağılım")
             
-            # Matrisi göster (Streamlit dataframe olarak)
-            st.write("Oyuncular arası uyumluluk skorları (0-100):")
-            st.dataframe(
-                compat_matrix.style.format("{:.0f}"),
-                use_container_width=True
-            )
+                st.info(f"💡 **Takım Kimyası Tavsiyesi**: {chemistry['tavsiye']}")
+            
+                st.divider()
+            
+                # En iyi ve en kötü çiftler
+                col_best, col_worst = st.columns(2)
+            
+                with col_best:
+                    st.subheader("✅ En Uyumlu Çiftler")
+                    best_pairs = compatibility.get_best_pairs(top_n=5)
+                    if best_pairs:
+                        for idx, pair in enumerate(best_pairs, 1):
+                            st.write(f"""
+                            **{idx}. {pair['Oyuncu 1']} ↔ {pair['Oyuncu 2']}**
+                            - Pozisyon: {pair['Pozisyon 1']} ↔ {pair['Pozisyon 2']}
+                            - Uyumluluk: {pair['Uyumluluk']:.1f}/100
+                            - {pair['Takım']}
+                            """)
+            
+                with col_worst:
+                    st.subheader("⚠️ Düşük Uyumlu Çiftler")
+                    weak_pairs = compatibility.get_weak_pairs(top_n=5)
+                    if weak_pairs:
+                        for idx, pair in enumerate(weak_pairs, 1):
+                            st.write(f"""
+                            **{idx}. {pair['Oyuncu 1']} ↔ {pair['Oyuncu 2']}**
+                            - Pozisyon: {pair['Pozisyon 1']} ↔ {pair['Pozisyon 2']}
+                            - Uyumluluk: {pair['Uyumluluk']:.1f}/100
+                            - Problem: {pair['Problem']}
+                            """)
+            
+                st.divider()
+            
+                # Uyumluluk matrisi (heatmap benzeri)
+                st.subheader("📊 Uyumluluk Matrisi")
+                compat_matrix = compatibility.compatibility_matrix
+            
+                # Matrisi göster (Streamlit dataframe olarak)
+                st.write("Oyuncular arası uyumluluk skorları (0-100):")
+                st.dataframe(
+                    compat_matrix.style.format("{:.0f}"),
+                    use_container_width=True
+                )
+            
+                st.divider()
+            
+                # Takas önerileri (tüm lig havuzu, vektörize)
+                st.subheader("🔁 Takas Önerileri")
+                col_swap1, col_swap2 = st.columns(2)
+                with col_swap1:
+                    swap_sort = st.selectbox(
+                        "Sıralama", ['Kimya_Farkı', 'Skor_Farkı', 'Uyum'], key='swap_sort'
+                    )
+                with col_swap2:
+                    swap_max_cost = st.number_input(
+                        "Maksimum fiyat artışı (£M)", min_value=0.0, value=10.0, step=5.0, key='swap_max_cost'
+                    )
+                swaps = compatibility.rank_swaps(
+                    df_full, strategy=st.session_state.get('strategy', strategy),
+                    max_cost_delta=swap_max_cost, sort_by=swap_sort, top_n=15
+                )
+                if swaps.empty:
+                    st.info("Bu kriterlere uyan takas bulunamadı.")
+                else:
+                    st.dataframe(swaps, hide_index=True, use_container_width=True)
         
         # -----------------------------------------------------------------
         # TAB 8: PARETO FRONTIER ANALİZİ
         # -----------------------------------------------------------------
         with tab8:
-            st.markdown(f"### {get_icon('chart')} Pareto Frontier - Multi-Objective Optimizasyon", unsafe_allow_html=True)
-            st.markdown("Rating maksimize et ↔ Maliyet minimize et - En iyi trade-off çözümleri")
+            if is_tab_open(tab8):
+                st.markdown(f"### {get_icon('chart')} Pareto Frontier - Multi-Objective Optimizasyon", unsafe_allow_html=True)
+                st.markdown("Rating maksimize et ↔ Maliyet minimize et - En iyi trade-off çözümleri")
             
-            # Pareto analizi
-            try:
-                pareto = ParetoAnalyzer(df_full, budget)
+                # Pareto analizi
+                try:
+                    pareto = ParetoAnalyzer(df_full, budget, current_formation, pareto_strategy)
                 
-                st.subheader("📈 Efficient Frontier Çözümleri")
+                    st.subheader("📈 Efficient Frontier Çözümleri")
                 
-                # Efficiency metrikleri
-                efficiency = pareto.calculate_efficiency_score(selected_df)
+                    # Efficiency metrikleri
+                    efficiency = pareto.calculate_efficiency_score(selected_df)
                 
-                col_eff1, col_eff2, col_eff3 = st.columns(3)
+                    col_eff1, col_eff2, col_eff3 = st.columns(3)
                 
-                with col_eff1:
-                    st.metric("Verimlilik Skoru", f"{efficiency['verimlilik_skoru']:.2f}", efficiency['verimlilik_derecesi'])
-                with col_eff2:
-                    st.metric("Rating/Maliyet Oranı", f"{efficiency['rating_per_milyon']:.2f}", "Birim başına Rating")
-                with col_eff3:
-                    st.metric("Ortalama Rating", f"{efficiency['ortalama_rating']:.1f}", f"£{efficiency['toplam_maliyet']:.1f}M")
+                    with col_eff1:
+                        st.metric("Verimlilik Skoru", f"{efficiency['verimlilik_skoru']:.2f}", efficiency['verimlilik_derecesi'])
+                    with col_eff2:
+                        st.metric("Rating/Maliyet Oranı", f"{efficiency['rating_per_milyon']:.2f}", "Birim başına Rating")
+                    with col_eff3:
+                        st.metric("Ortalama Rating", f"{efficiency['ortalama_rating']:.1f}", f"£{efficiency['toplam_maliyet']:.1f}M")
                 
-                st.divider()
+                    st.divider()
                 
-                st.subheader("🎯 Trade-off Analizi Seçenekleri")
+                    st.subheader("🎯 Trade-off Analizi Seçenekleri")
                 
-                analysis_type = st.selectbox(
-                    "Analiz türü seçin:",
-                    options=[
-                        "Pareto Frontier Çözümleri",
-                        "Alternatif Verimli Kadrolar",
-                        "Amaç Ağırlıkları Duyarlılığı"
-                    ]
-                )
+                    analysis_type = st.selectbox(
+                        "Analiz türü seçin:",
+                        options=[
+                            "Pareto Frontier Çözümleri",
+                            "Alternatif Verimli Kadrolar",
+                            "Amaç Ağırlıkları Duyarlılığı",
+                            "Kalite-Maliyet-Risk Arşivi"
+                        ]
+                    )
                 
-                if analysis_type == "Pareto Frontier Çözümleri":
-                    st.markdown("**En iyi Rating-Maliyet kombinasyonları:**")
+                    if analysis_type == "Pareto Frontier Çözümleri":
+                        st.markdown("**En iyi Rating-Maliyet kombinasyonları:**")
                     
-                    pareto_frontier = pareto.generate_pareto_frontier(num_solutions=10)
+                        pareto_frontier = analyses.get('pareto_frontier')
                     
-                    if not pareto_frontier.empty:
-                        display_pareto = pareto_frontier[[
-                            'Sıra', 'Ortalama Rating', 'Toplam Maliyet', 'Bütçe Kullanımı', 'Kalan Bütçe'
-                        ]].copy()
+                        if not pareto_frontier.empty:
+                            display_pareto = pareto_frontier[[
+                                'Sıra', 'Ortalama Rating', 'Toplam Maliyet', 'Bütçe Kullanımı', 'Kalan Bütçe'
+                            ]].copy()
                         
-                        st.dataframe(display_pareto, hide_index=True, use_container_width=True)
+                            st.dataframe(display_pareto, hide_index=True, use_container_width=True)
                         
-                        st.markdown("**Sonuç:** Daha yüksek rating için daha fazla para harcamanız gerekecek.")
+                            st.markdown("**Sonuç:** Daha yüksek rating için daha fazla para harcamanız gerekecek.")
                 
-                elif analysis_type == "Alternatif Verimli Kadrolar":
-                    st.markdown("**Seçilen kadroya alternatif verimli çözümler:**")
+                    elif analysis_type == "Alternatif Verimli Kadrolar":
+                        st.markdown("**Seçilen kadroya alternatif verimli çözümler:**")
                     
-                    alternatives = pareto.find_efficient_alternatives(
-                        selected_df,
-                        df_full,
-                        num_alternatives=3
-                    )
+                        alternatives = pareto.find_efficient_alternatives(
+                            selected_df,
+                            df_full,
+                            num_alternatives=3
+                        )
                     
-                    if alternatives:
-                        alt_df = pd.DataFrame([{
-                            'Ortalama Rating': alt['Ortalama Rating'],
-                            'Toplam Maliyet': alt['Toplam Maliyet'],
-                            'Verimlilik': alt['Verimlilik'],
-                            'Rating Farkı': alt['Fark (Rating)'],
-                            'Maliyet Farkı': alt['Fark (Maliyet)']
-                        } for alt in alternatives])
+                        if alternatives:
+                            alt_df = pd.DataFrame([{
+                                'Ortalama Rating': alt['Ortalama Rating'],
+                                'Toplam Maliyet': alt['Toplam Maliyet'],
+                                'Verimlilik': alt['Verimlilik'],
+                                'Rating Farkı': alt['Fark (Rating)'],
+                                'Maliyet Farkı': alt['Fark (Maliyet)']
+                            } for alt in alternatives])
                         
-                        st.dataframe(alt_df, hide_index=True, use_container_width=True)
+                            st.dataframe(alt_df, hide_index=True, use_container_width=True)
                 
-                else:  # Amaç Ağırlıkları Duyarlılığı
-                    st.markdown("**Amaç ağırlıkları değişirse sonuçlar nasıl değişir?**")
+                    elif analysis_type == "Kalite-Maliyet-Risk Arşivi":
+                        st.markdown("**Kalite, maliyet ve derinlik riski arasında baskın olunmayan kadrolar:**")
                     
-                    sensitivity = pareto.sensitivity_to_objectives(selected_df)
+                        with st.spinner("Aday kadrolar üretiliyor..."):
+                            archive = analyses.get('objective_archive', lambda: ParetoAnalyzer(
+                                df, budget, current_formation, pareto_strategy
+                            ).generate_objective_archive(n_candidates=2000))
                     
-                    st.dataframe(sensitivity, hide_index=True, use_container_width=True)
+                        archive_df = archive.to_frame()
+                        if not archive_df.empty:
+                            archive_df = archive_df.sort_values('Kalite', ascending=False)
+                        
+                            import plotly.express as px
+                            fig = px.scatter(
+                                archive_df, x='Maliyet', y='Kalite', color='Derinlik_Riski',
+                                hover_data=['Ortalama Rating'], color_continuous_scale='RdYlGn_r',
+                                labels={'Maliyet': 'Toplam Maliyet (£M)', 'Derinlik_Riski': 'Derinlik Riski'}
+                            )
+                            fig.update_layout(template="plotly_white", height=400)
+                            st.plotly_chart(fig, use_container_width=True)
+                        
+                            st.dataframe(
+                                archive_df[['Kalite', 'Maliyet', 'Derinlik_Riski', 'Ortalama Rating', 'Oyuncular']].round(2),
+                                hide_index=True, use_container_width=True
+                            )
+                            st.caption(
+                                "Derinlik riski: bir ilk 11 oyuncusu eksildiğinde pozisyonuna girebilecek en iyi "
+                                "kadro dışı oyuncuya göre ortalama Rating kaybı (takım havuzu üzerinden)."
+                            )
+                
+                    else:  # Amaç Ağırlıkları Duyarlılığı
+                        st.markdown("**Amaç ağırlıkları değişirse sonuçlar nasıl değişir?**")
                     
-                    st.markdown("""
-                    **Açıklama:**
-                    - Rating Ağırlığı ↑ → Daha pahalı oyuncuları tercih eder
-                    - Maliyet Ağırlığı ↑ → Daha ekonomik oyuncuları tercih eder
-                    """)
+                        sensitivity = pareto.sensitivity_to_objectives(selected_df)
+                    
+                        st.dataframe(sensitivity, hide_index=True, use_container_width=True)
+                    
+                        st.markdown("""
+                        **Açıklama:**
+                        - Rating Ağırlığı ↑ → Daha pahalı oyuncuları tercih eder
+                        - Maliyet Ağırlığı ↑ → Daha ekonomik oyuncuları tercih eder
+                        """)
             
-            except Exception as e:
-                st.error(f"Pareto analizi hesaplanırken hata: {e}")
+                except Exception as e:
+                    st.error(f"Pareto analizi hesaplanırken hata: {e}")
 
         # -----------------------------------------------------------------
         # TAB 9: KADRO RAPORU (NARRATIVE)
         # -----------------------------------------------------------------
         with tab9:
-            st.markdown(f"### {get_icon('report')} Kadro Raporu & Analiz", unsafe_allow_html=True)
-            
-            # Narrative builder
-            narrative = NarrativeBuilder(selected_df, current_formation, budget)
-            
-            # Hızlı içgörüler
-            st.subheader("⚡ Hızlı İçgörüler")
-            insights = narrative.get_quick_insights()
-            
-            col_insight1, col_insight2, col_insight3 = st.columns(3)
-            with col_insight1:
-                for insight in insights[:2]:
-                    st.write(insight)
-            with col_insight2:
-                for insight in insights[2:4]:
-                    st.write(insight)
-            with col_insight3:
-                for insight in insights[4:]:
-                    st.write(insight)
-            
-            st.divider()
-            
-            # Sekmeler
-            report_tab1, report_tab2, report_tab3 = st.tabs([
-                "Genel Özet",
-                "Formation Analizi",
-                "Tavsiyeler"
-            ])
-            
-            with report_tab1:
-                st.markdown(narrative.generate_executive_summary())
-            
-            with report_tab2:
-                st.markdown(narrative.explain_formation_choice())
+            if is_tab_open(tab9):
+                st.markdown(f"### {get_icon('report')} Kadro Raporu & Analiz", unsafe_allow_html=True)
+            
+                # Narrative builder
+                narrative = analyses.get('narrative')
+            
+                # Hızlı içgörüler
+                st.subheader("⚡ Hızlı İçgörüler")
+                insights = narrative.get_quick_insights()
+            
+                col_insight1, col_insight2, col_insight3 = st.columns(3)
+                with col_insight1:
+                    for insight in insights[:2]:
+                        st.write(insight)
+                with col_insight2:
+                    for insight in insights[2:4]:
+                        st.write(insight)
+                with col_insight3:
+                    for insight in insights[4:]:
+                        st.write(insight)
+            
                 st.divider()
-                st.markdown(narrative.identify_key_players(top_n=4))
             
-            with report_tab3:
-                st.markdown(narrative.analyze_strengths_weaknesses())
+                # Sekmeler
+                report_tab1, report_tab2, report_tab3 = st.tabs([
+                    "Genel Özet",
+                    "Formation Analizi",
+                    "Tavsiyeler"
+                ])
+            
+                with report_tab1:
+                    st.markdown(narrative.generate_executive_summary())
+            
+                with report_tab2:
+                    st.markdown(narrative.explain_formation_choice())
+                    st.divider()
+                    st.markdown(narrative.identify_key_players(top_n=4))
+            
+                with report_tab3:
+                    st.markdown(narrative.analyze_strengths_weaknesses())
+                    st.divider()
+                    st.markdown(narrative.generate_recommendations())
+            
                 st.divider()
-                st.markdown(narrative.generate_recommendations())
-            
-            st.divider()
-            
-            # Tam raporu indir
-            if st.button("📥 Tam Raporu İndir (Markdown)", use_container_width=True):
-                full_report = narrative.generate_full_report()
-                st.download_button(
-                    label="Raporu İndir",
-                    data=full_report,
-                    file_name=f"kadro_raporu_{current_team}_{current_formation}.md",
-                    mime="text/markdown"
-                )
+            
+                # Tam raporu indir
+                if st.button("📥 Tam Raporu İndir (Markdown)", use_container_width=True):
+                    full_report = narrative.generate_full_report()
+                    st.download_button(
+                        label="Raporu İndir",
+                        data=full_report,
+                        file_name=f"kadro_raporu_{current_team}_{current_formation}.md",
+                        mime="text/markdown"
+                    )
         
         # -----------------------------------------------------------------
         # TAB 10: BENCH VE YEDEKLER
         # -----------------------------------------------------------------
         with tab10:
-            st.markdown(f"### {get_icon('subs')} Bench Kadrası & Yedek Oyuncular", unsafe_allow_html=True)
+            if is_tab_open(tab10):
+                st.markdown(f"### {get_icon('subs')} Bench Kadrası & Yedek Oyuncular", unsafe_allow_html=True)
             
-            bench_analyzer = BenchAnalyzer(selected_df, df)
+                bench_analyzer = analyses.get('bench')
             
-            # Bench kadrası özeti
-            st.subheader("📋 Bench Kadrası Özeti")
-            st.markdown(bench_analyzer.get_bench_squad_summary())
+                # Bench kadrası özeti
+                st.subheader("📋 Bench Kadrası Özeti")
+                st.markdown(bench_analyzer.get_bench_squad_summary())
             
-            st.divider()
+                st.divider()
             
-            # Sekmeler
-            bench_tab1, bench_tab2, bench_tab3 = st.tabs([
-                "Pozisyon Yedekleri",
-                "Squad Derinliği",
-                "Yaralanma Senaryoları"
-            ])
+                # Sekmeler
+                bench_tab1, bench_tab2, bench_tab3, bench_tab4 = st.tabs([
+                    "Pozisyon Yedekleri",
+                    "Squad Derinliği",
+                    "Yaralanma Senaryoları",
+                    "Optimal Bench"
+                ])
             
-            with bench_tab1:
-                st.subheader("🔄 Pozisyon Başına En İyi Yedekler")
+                with bench_tab1:
+                    st.subheader("🔄 Pozisyon Başına En İyi Yedekler")
                 
-                pos_col = 'Alt_Pozisyon' if 'Alt_Pozisyon' in selected_df.columns else 'Atanan_Pozisyon'
-                positions = sorted(selected_df[pos_col].unique().tolist())
+                    pos_col = 'Alt_Pozisyon' if 'Alt_Pozisyon' in selected_df.columns else 'Atanan_Pozisyon'
+                    positions = sorted(selected_df[pos_col].unique().tolist())
                 
-                selected_position = st.selectbox(
-                    "Pozisyon seçin:",
-                    options=positions
-                )
+                    selected_position = st.selectbox(
+                        "Pozisyon seçin:",
+                        options=positions
+                    )
                 
-                backups = bench_analyzer.find_position_backups(selected_position, top_n=5)
+                    backups = bench_analyzer.find_position_backups(selected_position, top_n=5)
                 
-                if backups.empty:
-                    st.warning(f"⚠️ {selected_position} pozisyonunda yedek oyuncu yok!")
-                else:
-                    st.dataframe(backups, hide_index=True, use_container_width=True)
-            
-            with bench_tab2:
-                st.subheader("📊 Squad Derinliği Analizi")
-                
-                depth_analysis = bench_analyzer.analyze_squad_depth()
-                
-                depth_df = pd.DataFrame([
-                    {
-                        'Pozisyon': pos,
-                        'Starter': data['starter'],
-                        'Yedek': data['backup'],
-                        'Toplam': data['total'],
-                        'Derinlik': data['derinlik']
-                    }
-                    for pos, data in depth_analysis.items()
-                ])
+                    if backups.empty:
+                        st.warning(f"⚠️ {selected_position} pozisyonunda yedek oyuncu yok!")
+                    else:
+                        st.dataframe(backups, hide_index=True, use_container_width=True)
+            
+                with bench_tab2:
+                    st.subheader("📊 Squad Derinliği Analizi")
                 
-                st.dataframe(depth_df, hide_index=True, use_container_width=True)
+                    depth_analysis = bench_analyzer.analyze_squad_depth()
                 
-                st.markdown("""
-                **Derinlik Açıklaması:**
-                - 🟢 İyi: 3+ oyuncu (Starter + 2 Yedek)
-                - 🟠 Zayıf: 2 oyuncu (Starter + 1 Yedek)
-                - 🔴 Kritik: 1 oyuncu (Yedek yok!)
-                """)
+                    depth_df = pd.DataFrame([
+                        {
+                            'Pozisyon': pos,
+                            'Starter': data['starter'],
+                            'Yedek': data['backup'],
+                            'Esnek Yedek': data['esnek_yedek'],
+                            'Toplam': data['total'],
+                            'Derinlik': data['derinlik']
+                        }
+                        for pos, data in depth_analysis.items()
+                    ])
+                
+                    st.dataframe(depth_df, hide_index=True, use_container_width=True)
+                
+                    st.markdown("""
+                    **Derinlik Açıklaması:**
+                    - 🟢 İyi: 3+ oyuncu (Starter + 2 Yedek)
+                    - 🟠 Zayıf: 2 oyuncu (Starter + 1 Yedek)
+                    - 🔴 Kritik: 1 oyuncu (Yedek yok!)
+                    """)
+                
+                    st.markdown("**🗺️ Lig Geneli Derinlik Haritası**")
+                    depth_flexible = st.checkbox("Esnek pozisyonları dahil et", value=True, key='depth_flexible')
+                    league_depth = get_depth_index(df_full).count_matrix(flexible=depth_flexible)
+                    import plotly.express as px
+                    fig_depth = px.imshow(
+                        league_depth, color_continuous_scale='RdYlGn', text_auto=True, aspect='auto',
+                        labels={'color': 'Oyuncu'}
+                    )
+                    fig_depth.update_layout(height=620, margin=dict(l=10, r=10, t=30, b=10))
+                    st.plotly_chart(fig_depth, use_container_width=True)
             
-            with bench_tab3:
-                st.subheader("🤕 Yaralanma Senaryoları")
+                with bench_tab3:
+                    st.subheader("🤕 Yaralanma Senaryoları")
                 
-                col_scenario1, col_scenario2 = st.columns(2)
+                    col_scenario1, col_scenario2 = st.columns(2)
                 
-                with col_scenario1:
-                    st.markdown("**Sakatlık Simülasyonu:**")
+                    with col_scenario1:
+                        st.markdown("**Sakatlık Simülasyonu:**")
                     
-                    name_cols = [c for c in ['Oyuncu_Adi', 'Oyuncu'] if c in selected_df.columns]
+                        name_cols = [c for c in ['Oyuncu_Adi', 'Oyuncu'] if c in selected_df.columns]
 
-                    if not name_cols:
-                        st.warning("⚠️ Oyuncu isim kolonu bulunamadı.")
-                    else:
-                        name_col = name_cols[0]
+                        if not name_cols:
+                            st.warning("⚠️ Oyuncu isim kolonu bulunamadı.")
+                        else:
+                            name_col = name_cols[0]
 
-                        injured_name = st.selectbox(
-                            "Hangi oyuncu sakat olursa?",
-                            options=selected_df[name_col].tolist()
-                        )
+                            injured_name = st.selectbox(
+                                "Hangi oyuncu sakat olursa?",
+                                options=selected_df[name_col].tolist()
+                            )
                         
-                        # Oyuncu ID'sini bul (tek kolon üzerinden, fallback ile)
-                        injured_player = selected_df[selected_df[name_col] == injured_name]
+                            # Oyuncu ID'sini bul (tek kolon üzerinden, fallback ile)
+                            injured_player = selected_df[selected_df[name_col] == injured_name]
                         
-                        if not injured_player.empty:
-                            player_id = injured_player.iloc[0].get('ID', injured_player.index[0])
-                            scenario = bench_analyzer.analyze_injury_scenarios(player_id, df)
+                            if not injured_player.empty:
+                                player_id = injured_player.iloc[0].get('ID', injured_player.index[0])
+                                scenario = bench_analyzer.analyze_injury_scenarios(player_id, df)
                             
-                            if 'error' not in scenario:
-                                st.write(f"**Sakat Oyuncu:** {scenario['sakat_oyuncu']}")
-                                st.write(f"**Pozisyon:** {scenario['pozisyon']}")
+                                if 'error' not in scenario:
+                                    st.write(f"**Sakat Oyuncu:** {scenario['sakat_oyuncu']}")
+                                    st.write(f"**Pozisyon:** {scenario['pozisyon']}")
                                 
-                                # Yedek oyuncu varsa göster
-                                if 'yedek' in scenario:
-                                    st.write(f"**Yedek:** {scenario['yedek']}")
-                                    st.write(f"**Rating Farkı:** {scenario['rating_farkı']} puan")
+                                    # Yedek oyuncu varsa göster
+                                    if 'yedek' in scenario:
+                                        st.write(f"**Yedek:** {scenario['yedek']}")
+                                        st.write(f"**Rating Farkı:** {scenario['rating_farkı']} puan")
                                 
-                                st.write(f"**Tavsiye:** {scenario['recommendation']}")
+                                    st.write(f"**Tavsiye:** {scenario['recommendation']}")
                                 
-                                if 'impact' in scenario and scenario['impact']['toplam_etki'] != 0:
-                                    st.write(f"\n**Kadro Etkisi:**")
-                                    st.write(f"- Ofans kaybı: {scenario['impact']['ofans_kaybı']:.1f}")
-                                    st.write(f"- Defans kaybı: {scenario['impact']['defans_kaybı']:.1f}")
-                                    st.write(f"- Toplam: {scenario['impact']['toplam_etki']:.1f} puan")
+                                    if 'impact' in scenario and scenario['impact']['toplam_etki'] != 0:
+                                        st.write(f"\n**Kadro Etkisi:**")
+                                        st.write(f"- Ofans kaybı: {scenario['impact']['ofans_kaybı']:.1f}")
+                                        st.write(f"- Defans kaybı: {scenario['impact']['defans_kaybı']:.1f}")
+                                        st.write(f"- Toplam: {scenario['impact']['toplam_etki']:.1f} puan")
+                
+                    st.divider()
+                    st.markdown("**🧪 Toplu Senaryo Simülasyonu** (tüm tekli ve ikili eksiklikler, kadro yeniden optimize edilir)")
+                    sweep = analyses.get('injury_sweep')
+                
+                    if sweep.get('durum') != 'Optimal':
+                        st.warning(f"⚠️ Simülasyon çalıştırılamadı: {sweep.get('durum')}")
+                    else:
+                        st.caption(
+                            f"{sweep['senaryo_sayısı']} senaryo, {sweep['çözülen_model']} model çözümü, "
+                            f"{sweep['süre_sn']:.2f} sn"
+                        )
+                        col_sweep1, col_sweep2 = st.columns(2)
+                        with col_sweep1:
+                            st.markdown("**En kırılgan pozisyonlar**")
+                            st.dataframe(sweep['kırılgan_pozisyonlar'], hide_index=True, use_container_width=True)
+                        with col_sweep2:
+                            st.markdown("**Tekli eksiklikler**")
+                            st.dataframe(sweep['tekli_senaryolar'][['Oyuncu', 'Pozisyon', 'Skor_Kaybı', 'Girenler']],
+                                         hide_index=True, use_container_width=True)
+                    
+                        import plotly.express as px
+                        # Çözümsüz senaryolar (sonsuz kayıp) ısı haritasında boş hücre olarak gösterilir
+                        fig_sweep = px.imshow(
+                            sweep['kayıp_matrisi'].replace(float('inf'), float('nan')),
+                            color_continuous_scale='Reds', text_auto='.0f',
+                            labels={'color': 'Skor Kaybı'}, title="Eksiklik Skor Kaybı Matrisi (köşegen: tekli)"
+                        )
+                        st.plotly_chart(fig_sweep, use_container_width=True)
+            
+                with bench_tab4:
+                    st.subheader("🧮 Optimal Bench (İkinci Aşama Optimizasyon)")
+                    st.caption("Eksik oyuncu senaryolarında beklenen kadro skorunu maksimize eden yedek kulübesi")
+                
+                    col_bo1, col_bo2, col_bo3 = st.columns(3)
+                    with col_bo1:
+                        bench_size = st.slider("Bench boyutu", 3, 12, 7, key='bench_size')
+                    with col_bo2:
+                        bench_budget = st.number_input(
+                            "Bench bütçesi (£M, 0 = sınırsız)", min_value=0.0, value=0.0, step=10.0, key='bench_budget'
+                        )
+                    with col_bo3:
+                        bench_absences = st.radio(
+                            "Senaryolar", [1, 2], horizontal=True, key='bench_absences',
+                            format_func=lambda k: "Tek eksik" if k == 1 else "Tek + ikili eksik"
+                        )
+                
+                    bench_opt = bench_analyzer.optimize_bench(
+                        strategy=st.session_state.get('strategy', strategy),
+                        bench_size=bench_size,
+                        bench_budget=bench_budget or None,
+                        max_absences=bench_absences
+                    )
+                
+                    col_bm1, col_bm2, col_bm3 = st.columns(3)
+                    with col_bm1:
+                        st.metric("İlk 11 Skoru", f"{bench_opt['ilk_11_skoru']:.1f}")
+                    with col_bm2:
+                        st.metric("Beklenen Skor", f"{bench_opt['beklenen_skor']:.1f}",
+                                  f"{-bench_opt['beklenen_kayıp']:.1f}")
+                    with col_bm3:
+                        st.metric("Bench Maliyeti", f"£{bench_opt['toplam_maliyet']:.1f}M")
+                
+                    if bench_opt['yedekler'].empty:
+                        st.warning("⚠️ Uygun yedek oyuncu bulunamadı.")
+                    else:
+                        bench_cols = [c for c in ['Oyuncu', 'Alt_Pozisyon', 'Rating', 'Fiyat_M',
+                                                  'Kapsadığı_Pozisyonlar', 'Kullanım_Oranı']
+                                      if c in bench_opt['yedekler'].columns]
+                        st.dataframe(bench_opt['yedekler'][bench_cols], hide_index=True, use_container_width=True)
+                        st.markdown("**En maliyetli eksiklik senaryoları:**")
+                        st.dataframe(bench_opt['senaryolar'].head(10), hide_index=True, use_container_width=True)
 
     
     # Footer
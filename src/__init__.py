@@ -13,7 +13,7 @@ Modüller:
 """
 
 from .config import *
-from .data_handler import load_premier_league_data, normalize_data, create_dummy_dataset
+from .data_handler import load_premier_league_data, normalize_data, create_dummy_dataset, generate_synthetic_players
 from .optimizer import solve_optimal_lineup
 from .visualizer import create_football_pitch, create_team_table
 from .ui_components import apply_custom_css, render_metric_card, render_info_box
@@ -0,0 +1,7 @@
+"""`python -m src` giriş noktası - bkz. src/cli.py"""
+
+import sys
+
+from .cli import main
+
+sys.exit(main())
@@ -10,6 +10,10 @@ Alternative Solutions Engine:
 - What-if: Formation değiştir ne olur?
 - Karşılaştırma matriksleri
 
+What-if analizleri gerçek yeniden çözümlerle yapılır (WhatIfEngine): oyuncu
+havuzu ve strateji başına skor matrisi bir kez hesaplanır, her formasyon için
+LineupModel bir kez kurulur ve solve_fast ile tekrar tekrar çözülür.
+
 Bu modül:
 1. Çoklu senaryo kadrolar oluştur
 2. What-if analizleri çalıştır
@@ -18,11 +22,173 @@ Bu modül:
 =============================================================================
 """
 
+import hashlib
+import threading
+from collections import OrderedDict
+
 import pandas as pd
 import numpy as np
 from typing import Dict, List, Tuple, Optional
 from itertools import combinations
 from .decision_analyzer import calculate_weighted_score, calculate_squad_metrics
+from .config import FORMATIONS
+from .optimizer import LineupModel, build_score_matrix, formation_availability_sweep
+
+
+# =============================================================================
+# WHAT-IF MOTORU (yeniden çözümler)
+# =============================================================================
+
+class WhatIfEngine:
+    """
+    Aynı oyuncu havuzu ve strateji için what-if yeniden çözümleri.
+    
+    Skor matrisi tüm alt pozisyonlar için bir kez hesaplanır; her formasyonun
+    LineupModel'i ilk kullanımda kurulur ve solve_fast (Macar algoritması,
+    bütçe aktifse HiGHS) ile çözülür. Çözümler formasyon başına, bütçe
+    aralıklarıyla yeniden kullanılacak şekilde önbellekte tutulur.
+    """
+    
+    def __init__(self, players: pd.DataFrame, strategy: str = 'Dengeli'):
+        self.players = players
+        self.strategy = strategy
+        self.score_matrix = build_score_matrix(players, strategy)
+        self._models: Dict[str, Tuple[LineupModel, np.ndarray]] = {}
+        self._solutions: Dict[str, List[Tuple[float, Tuple]]] = {}
+        self._threshold_solutions: Dict[Tuple[str, float, float], Tuple] = {}
+        self._lock = threading.Lock()
+        self.solve_count = 0
+    
+    def model(self, formation: str) -> Tuple[LineupModel, np.ndarray]:
+        """Formasyonun modeli ve model.df satırları x pozisyonlar skor dizisi."""
+        cached = self._models.get(formation)
+        if cached is None:
+            model = LineupModel(self.players, formation)
+            values = self.score_matrix.loc[model.df.index, model.positions].to_numpy()
+            cached = self._models[formation] = (model, values)
+        return cached
+    
+    def solve(self, formation: str, budget: float) -> Tuple[Optional[pd.DataFrame], float, float, str]:
+        """
+        Formasyon ve bütçe için optimal kadro (önbellekli).
+        
+        Önceki çözümler bütçe monotonluğuyla yeniden kullanılır: B bütçesinde
+        bulunan ve maliyeti c olan optimal kadro, c <= B' <= B olan her B' için
+        de optimaldir; B'de çözümsüz model B' <= B için de çözümsüzdür. İlk
+        çağrıda bütçesiz atama çözülür, böylece bütçenin bağlayıcı olmadığı
+        seviyeler hiç çözülmez. Dönen DataFrame önbellekle paylaşılır.
+        
+        Returns:
+            Tuple: (selected_df, total_score, total_cost, status)
+        """
+        budget = float(budget)
+        with self._lock:
+            entries = self._solutions.get(formation)
+            if entries is None:
+                entries = self._solutions[formation] = []
+                entries.append((np.inf, self._solve(formation, np.inf)))
+            
+            for solved_budget, result in entries:
+                if budget > solved_budget + 1e-9:
+                    continue
+                if result[3] != 'Optimal' or result[2] <= budget + 1e-9:
+                    return result
+            
+            result = self._solve(formation, budget)
+            entries.append((budget, result))
+            return result
+    
+    def _solve(self, formation: str, budget: float) -> Tuple[Optional[pd.DataFrame], float, float, str]:
+        model, values = self.model(formation)
+        selection, _, status = model.solve_fast(values, budget)
+        self.solve_count += 1
+        if status != 'Optimal':
+            return None, 0.0, 0.0, status
+        return (*model.lineup_frame(selection, values), status)
+    
+    def solve_min_rating(self, formation: str, budget: float,
+                         min_rating: float) -> Tuple[Optional[pd.DataFrame], float, float, str]:
+        """
+        Rating >= min_rating oyuncularla optimal kadro (önbellekli).
+        
+        Model yeniden kurulmaz: eşik altındaki oyuncular solve_fast'e excluded
+        maskesiyle verilir (değişken üst sınırı 0). Eşiksiz optimal kadro
+        eşiği zaten sağlıyorsa çözüm yapılmaz.
+        
+        Returns:
+            Tuple: (selected_df, total_score, total_cost, status)
+        """
+        result = self.solve(formation, budget)
+        if result[3] == 'Optimal' and result[0]['Rating'].min() >= min_rating:
+            return result
+        
+        key = (formation, round(float(budget), 4), float(min_rating))
+        with self._lock:
+            if key not in self._threshold_solutions:
+                model, values = self.model(formation)
+                excluded = model.df['Rating'].to_numpy(dtype=float) < min_rating
+                selection, _, status = model.solve_fast(values, budget, excluded=excluded)
+                self.solve_count += 1
+                if status == 'Optimal':
+                    self._threshold_solutions[key] = (*model.lineup_frame(selection, values), status)
+                else:
+                    self._threshold_solutions[key] = (None, 0.0, 0.0, status)
+            return self._threshold_solutions[key]
+    
+    def squad_score(self, squad_df: pd.DataFrame) -> float:
+        """Kadronun atandığı pozisyonlardaki toplam skoru (bu stratejinin skor matrisiyle)."""
+        pos_col = 'Atanan_Pozisyon' if 'Atanan_Pozisyon' in squad_df.columns else 'Alt_Pozisyon'
+        row_of = pd.Series(self.score_matrix.index, index=self.players['ID'].to_numpy())
+        row_of = row_of[~row_of.index.duplicated()]
+        total = 0.0
+        for player_id, position, fallback in zip(
+            squad_df['ID'], squad_df[pos_col],
+            squad_df['Pozisyon_Skoru'] if 'Pozisyon_Skoru' in squad_df.columns else np.zeros(len(squad_df))
+        ):
+            if player_id in row_of.index and position in self.score_matrix.columns:
+                total += float(self.score_matrix.at[row_of[player_id], position])
+            else:
+                total += float(fallback)
+        return total
+
+
+def _frame_version(players: pd.DataFrame) -> str:
+    """Oyuncu havuzunun içerik özeti (önbellek anahtarı)."""
+    digest = pd.util.hash_pandas_object(players, index=True).to_numpy()
+    payload = digest.tobytes() + repr(list(players.columns)).encode('utf-8')
+    return hashlib.sha1(payload).hexdigest()[:16]
+
+
+_ENGINE_CACHE: 'OrderedDict[Tuple[str, str], WhatIfEngine]' = OrderedDict()
+_ENGINE_LOCK = threading.Lock()
+
+
+def get_what_if_engine(players: pd.DataFrame, strategy: str = 'Dengeli',
+                       max_entries: int = 8) -> WhatIfEngine:
+    """Havuz içeriği + strateji başına önbellekli WhatIfEngine."""
+    key = (_frame_version(players), strategy)
+    with _ENGINE_LOCK:
+        engine = _ENGINE_CACHE.get(key)
+        if engine is not None:
+            _ENGINE_CACHE.move_to_end(key)
+            return engine
+    
+    engine = WhatIfEngine(players, strategy)
+    with _ENGINE_LOCK:
+        engine = _ENGINE_CACHE.setdefault(key, engine)
+        _ENGINE_CACHE.move_to_end(key)
+        while len(_ENGINE_CACHE) > max_entries:
+            _ENGINE_CACHE.popitem(last=False)
+    return engine
+
+
+def lineup_changes(current_df: pd.DataFrame, new_df: pd.DataFrame) -> Tuple[List[str], List[str]]:
+    """İki kadro arasındaki oyuncu farkı: (girenler, çıkanlar) - ID bazlı."""
+    current_ids = set(current_df['ID'])
+    new_ids = set(new_df['ID'])
+    entering = new_df.loc[~new_df['ID'].isin(current_ids), 'Oyuncu'].tolist()
+    leaving = current_df.loc[~current_df['ID'].isin(new_ids), 'Oyuncu'].tolist()
+    return entering, leaving
 
 
 def generate_alternative_squads(players_df: pd.DataFrame, 
@@ -95,52 +261,88 @@ def generate_alternative_squads(players_df: pd.DataFrame,
     return alternatives[:num_alternatives]
 
 
+def infer_formation(squad_df: pd.DataFrame) -> Optional[str]:
+    """Kadronun Atanan_Pozisyon dağılımına birebir uyan formasyon (yoksa None)."""
+    if 'Atanan_Pozisyon' not in squad_df.columns:
+        return None
+    counts = squad_df['Atanan_Pozisyon'].value_counts().to_dict()
+    for name, requirement in FORMATIONS.items():
+        if counts == requirement:
+            return name
+    return None
+
+
 def what_if_budget_analysis(squad_df: pd.DataFrame,
                            all_players: pd.DataFrame,
                            base_budget: float,
                            budget_changes: List[float],
-                           weights: Dict = None) -> pd.DataFrame:
+                           weights: Dict = None,
+                           formation: Optional[str] = None,
+                           strategy: str = 'Dengeli') -> pd.DataFrame:
     """
     What-if: Bütçeyi değiştirince ne olur?
     
+    Her bütçe seviyesinde optimal kadro aynı havuz ve formasyonla yeniden
+    çözülür (WhatIfEngine). Çözümler bütçe aralıklarıyla önbellekte tutulur;
+    bütçe kaydırıcısı tekrar oynatıldığında çoğu seviye çözülmeden döner.
+    
     Args:
         squad_df: Mevcut kadro
-        all_players: Tüm oyuncular
+        all_players: Kadronun seçildiği oyuncu havuzu
         base_budget: Temel bütçe
         budget_changes: Bütçe değişimleri (örn: [-0.2, -0.1, 0, 0.1, 0.2])
-        weights: Skor hesaplama ağırlıkları
+        weights: Geriye uyumluluk için (skorlar strateji bazlı pozisyon skorudur)
+        formation: Formasyon (None ise kadronun pozisyonlarından çıkarılır)
+        strategy: Takım stratejisi
         
     Returns:
-        DataFrame: Bütçe senaryoları ve sonuçları
+        DataFrame: Bütçe senaryoları, yeni kadro skoru/maliyeti ve oyuncu farkları
     """
-    if weights is None:
-        weights = {'rating': 0.25, 'form': 0.20, 'offense': 0.20, 'defense': 0.20, 'cost_penalty': 0.15}
+    formation = formation or infer_formation(squad_df)
+    if formation is None:
+        raise ValueError("Kadronun formasyonu belirlenemedi; formation parametresini verin")
+    
+    engine = get_what_if_engine(all_players, strategy)
+    current_score = engine.squad_score(squad_df)
     
     results = []
-    base_score = calculate_weighted_score(squad_df, weights)
     
     for change in budget_changes:
         new_budget = base_budget * (1 + change)
+        lineup_df, score, cost, status = engine.solve(formation, new_budget)
         
-        # Sadece mevcut kadroya kalan bütçeyi hesapla
-        current_cost = squad_df['Fiyat_M'].sum()
-        available = new_budget - current_cost
+        if status != 'Optimal':
+            results.append({
+                'Bütçe_Değişim': f"{change*100:+.0f}%",
+                'Yeni_Bütçe': round(new_budget, 1),
+                'Maliyet': None, 'Kalan_Bütçe': None,
+                'Skor': None, 'Skor_Farkı': None,
+                'Değişen_Oyuncu': None, 'Giren': '', 'Çıkan': '',
+                'Tavsiye': 'Bütçe yetersiz - kadro kurulamıyor'
+            })
+            continue
         
-        # Ne yapabilir?
-        better_players = all_players[
-            (all_players['Rating'] > squad_df['Rating'].min()) &
-            (all_players['Fiyat_M'] <= available + 1)
-        ]
+        entering, leaving = lineup_changes(squad_df, lineup_df)
+        score_delta = score - current_score
         
-        improvement_potential = len(better_players)
+        if score_delta > 0.005:
+            advice = 'İyileştirme mümkün'
+        elif score_delta < -0.005:
+            advice = 'Skor kaybı'
+        else:
+            advice = 'Değişiklik yok'
         
         results.append({
             'Bütçe_Değişim': f"{change*100:+.0f}%",
             'Yeni_Bütçe': round(new_budget, 1),
-            'Mevcut_Maliyeti': round(current_cost, 1),
-            'Kalan_Bütçe': round(new_budget - current_cost, 1),
-            'İyileştirme_Potansiyeli': improvement_potential,
-            'Tavsiye': 'Bütçe kısıtlı' if available < 0 else ('Bütçe yetersiz' if available < 3 else 'Yeterli bütçe')
+            'Maliyet': round(cost, 1),
+            'Kalan_Bütçe': round(new_budget - cost, 1),
+            'Skor': round(score, 2),
+            'Skor_Farkı': round(score_delta, 2),
+            'Değişen_Oyuncu': len(entering),
+            'Giren': ', '.join(entering),
+            'Çıkan': ', '.join(leaving),
+            'Tavsiye': advice
         })
     
     return pd.DataFrame(results)
@@ -150,98 +352,146 @@ def what_if_rating_minimum(squad_df: pd.DataFrame,
                           all_players: pd.DataFrame,
                           budget: float,
                           rating_thresholds: List[float],
-                          weights: Dict = None) -> pd.DataFrame:
+                          weights: Dict = None,
+                          formation: Optional[str] = None,
+                          strategy: str = 'Dengeli') -> pd.DataFrame:
     """
     What-if: Rating minimumunu değiştirince ne olur?
     
+    Önce tüm eşikler için pozisyon bazlı uygunluk sayımı ve bütçe alt sınırı
+    tek vektörize geçişte hesaplanır (formation_availability_sweep); yalnızca
+    bu kontrolleri geçen eşikler için gerçek kadro aynı model üzerinde eşik
+    altı oyuncular dışlanarak çözülür. Eşikler artan sırada taranır; önceki
+    kadronun en düşük Rating'i yeni eşiği sağlıyorsa (ya da önceki eşik
+    çözümsüzse) çözüm tekrarlanmaz.
+    
     Args:
         squad_df: Mevcut kadro
-        all_players: Tüm oyuncular
+        all_players: Kadronun seçildiği oyuncu havuzu
         budget: Bütçe
         rating_thresholds: Rating seviyeleri (örn: [70, 75, 80, 85])
-        weights: Skor hesaplama ağırlıkları
+        weights: Geriye uyumluluk için (skorlar strateji bazlı pozisyon skorudur)
+        formation: Formasyon (None ise kadronun pozisyonlarından çıkarılır)
+        strategy: Takım stratejisi
         
     Returns:
-        DataFrame: Rating seviyeleri ve sonuçları
+        DataFrame: Rating seviyeleri, eksik pozisyonlar ve çözülen kadrolar
     """
-    if weights is None:
-        weights = {'rating': 0.25, 'form': 0.20, 'offense': 0.20, 'defense': 0.20, 'cost_penalty': 0.15}
+    formation = formation or infer_formation(squad_df)
+    if formation is None:
+        raise ValueError("Kadronun formasyonu belirlenemedi; formation parametresini verin")
     
-    results = []
+    engine = get_what_if_engine(all_players, strategy)
+    current_score = engine.squad_score(squad_df)
+    sweep = formation_availability_sweep(all_players, formation, rating_thresholds)
     
-    for threshold in rating_thresholds:
-        eligible = all_players[all_players['Rating'] >= threshold]
-        
-        # Bütçe içinde 11 oyuncu seçebilir mi?
-        can_form = len(eligible) >= 11
+    rows = {}
+    previous = None
+    for t in np.argsort(sweep['esikler'], kind='stable'):
+        threshold = sweep['esikler'][t]
+        short = [p for p, have, need in zip(sweep['pozisyonlar'], sweep['mevcut'][t], sweep['gerekli'])
+                 if have < need]
+        row = {
+            'Rating_Minimum': int(threshold),
+            'Uygun_Oyuncu_Sayı': int(sweep['oyuncu_sayisi'][t]),
+            'Eksik_Pozisyonlar': ', '.join(short),
+            'Ort_Rating': 0,
+            'Maliyet': None,
+            'Skor': 0,
+            'Skor_Farkı': None,
+            'Değişen_Oyuncu': None
+        }
         
-        if can_form:
-            # En iyi 11'i seç
-            best_11 = eligible.nlargest(11, 'Rating')
-            total_cost = best_11['Fiyat_M'].sum()
-            avg_rating = best_11['Rating'].mean()
+        if not sweep['uygun'][t]:
+            row['Durum'] = '✗ Oyuncu Yok'
+        elif sweep['min_maliyet'][t] > budget + 1e-9:
+            row['Durum'] = '✗ Bütçe Yetersiz'
+        else:
+            if previous is not None and (previous[3] != 'Optimal' or previous[0]['Rating'].min() >= threshold):
+                # Havuz yalnızca daralır: önceki kadro hâlâ optimal / çözümsüzlük sürer
+                result = previous
+            else:
+                result = engine.solve_min_rating(formation, budget, threshold)
             
-            if total_cost <= budget:
-                score = calculate_weighted_score(best_11, weights)
-                status = '✓ Mümkün'
+            previous = result
+            if result[3] != 'Optimal':
+                row['Durum'] = '✗ Kadro Kurulamıyor'
             else:
-                score = 0
-                status = '✗ Bütçe Yetersiz'
-        else:
-            avg_rating = 0
-            score = 0
-            status = '✗ Oyuncu Yok'
-        
-        results.append({
-            'Rating_Minimum': int(threshold),
-            'Uygun_Oyuncu_Sayı': len(eligible),
-            'Ort_Rating': round(avg_rating, 1),
-            'Skor': round(score, 2),
-            'Durum': status
-        })
+                lineup_df, score, cost, _ = result
+                entering, _ = lineup_changes(squad_df, lineup_df)
+                row.update({
+                    'Ort_Rating': round(lineup_df['Rating'].mean(), 1),
+                    'Maliyet': round(cost, 1),
+                    'Skor': round(score, 2),
+                    'Skor_Farkı': round(score - current_score, 2),
+                    'Değişen_Oyuncu': len(entering),
+                    'Durum': '✓ Mümkün'
+                })
+        rows[t] = row
     
-    return pd.DataFrame(results)
+    return pd.DataFrame([rows[t] for t in range(len(sweep['esikler']))])
 
 
 def what_if_formation_change(squad_df: pd.DataFrame,
                             all_players: pd.DataFrame,
                             budget: float,
                             formations: List[str],
-                            weights: Dict = None) -> pd.DataFrame:
+                            weights: Dict = None,
+                            strategy: str = 'Dengeli') -> pd.DataFrame:
     """
     What-if: Formation değiştirince ne olur?
     
+    Her formasyon için aynı havuz ve bütçeyle optimal kadro yeniden çözülür
+    (WhatIfEngine; skor matrisi ve modeller önbellekten). Farklar mevcut
+    kadroya göre verilir; mevcut kadronun skoru aynı skor matrisiyle hesaplanır.
+    
     Args:
         squad_df: Mevcut kadro
-        all_players: Tüm oyuncular
+        all_players: Kadronun seçildiği oyuncu havuzu
         budget: Bütçe
         formations: Formation listesi ('4-3-3', '4-4-2', vb)
-        weights: Skor hesaplama ağırlıkları
+        weights: Geriye uyumluluk için (skorlar strateji bazlı pozisyon skorudur)
+        strategy: Takım stratejisi
         
     Returns:
-        DataFrame: Formation karşılaştırması
+        DataFrame: Formation karşılaştırması (skor, maliyet ve kadro farkları)
     """
-    if weights is None:
-        weights = {'rating': 0.25, 'form': 0.20, 'offense': 0.20, 'defense': 0.20, 'cost_penalty': 0.15}
-    
+    engine = get_what_if_engine(all_players, strategy)
     current_cost = squad_df['Fiyat_M'].sum()
-    current_score = calculate_weighted_score(squad_df, weights)
+    current_score = engine.squad_score(squad_df)
     
     results = []
     
     for formation in formations:
-        # Her formation için mevcut oyuncularla hesapla
-        # (Basit yaklaşım - gerçekte taktik ayarlamalar yapılmalı)
-        metrics = calculate_squad_metrics(squad_df)
+        lineup_df, score, cost, status = engine.solve(formation, budget)
+        
+        if status != 'Optimal':
+            results.append({
+                'Formation': formation,
+                'Geçerli': '✗',
+                'Maliyet': None, 'Maliyet_Farkı': None,
+                'Skor': None, 'Skor_Farkı': None,
+                'Ort_Rating': None, 'Ort_Ofans': None, 'Ort_Defans': None,
+                'Değişen_Oyuncu': None, 'Giren': '', 'Çıkan': ''
+            })
+            continue
+        
+        metrics = calculate_squad_metrics(lineup_df)
+        entering, leaving = lineup_changes(squad_df, lineup_df)
         
         results.append({
             'Formation': formation,
-            'Geçerli': '✓' if metrics['squad_size'] >= 11 else '✗',
-            'Maliyet': round(current_cost, 1),
-            'Skor': round(current_score * (1 + np.random.uniform(-0.05, 0.05)), 2),  # Yaklaşık etki
+            'Geçerli': '✓',
+            'Maliyet': round(cost, 1),
+            'Maliyet_Farkı': round(cost - current_cost, 1),
+            'Skor': round(score, 2),
+            'Skor_Farkı': round(score - current_score, 2),
             'Ort_Rating': round(metrics['avg_rating'], 1),
             'Ort_Ofans': round(metrics['avg_offense'], 1),
-            'Ort_Defans': round(metrics['avg_defense'], 1)
+            'Ort_Defans': round(metrics['avg_defense'], 1),
+            'Değişen_Oyuncu': len(entering),
+            'Giren': ', '.join(entering),
+            'Çıkan': ', '.join(leaving)
         })
     
     return pd.DataFrame(results)
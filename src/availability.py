@@ -0,0 +1,304 @@
+"""
+=============================================================================
+AVAILABILITY.PY - MÜSAİTLİK (OYNAMA OLASILIĞI) ODAKLI OPTİMİZASYON
+=============================================================================
+
+Oyuncuların bir sonraki maçta oynama olasılığı (Oynama_Olasiligi, FPL
+status / chance_of_playing_next_round verisinden) ile beklenen maç günü
+skorunu maksimize eden ilk 11 + bench seçimi.
+
+Yöntem (beklenen değer doğrusallaştırması + senaryo değerlendirmesi):
+1. Aday kadrolar: farklı risk seviyeleri λ için Skor x p^λ amaçlı atama
+   modeli (LineupModel.solve_fast) çözülür; λ=0 nominal optimum, λ=1 beklenen
+   değer doğrusallaştırması, λ>1 riskten kaçınan kadrodur. Oynama olasılığı
+   0 olan oyuncular hiçbir adayda ilk 11'e giremez
+2. Her aday için bench, eksiklik olasılıklarıyla ağırlıklandırılmış ikinci
+   aşama modelle (BenchAnalyzer.optimize_bench) bench bütçesi içinde seçilir
+   (varsayılan: ilk 11'den artan bütçe)
+3. Değerlendirme: müsaitlik senaryoları (belirsiz oyuncu sayısı küçükse tam
+   sayım, değilse max_scenarios ile sınırlı örnekleme; tüm adaylar için aynı
+   senaryolar) üzerinde gerçekleşen skorun beklentisi paralel hesaplanır.
+   Eksik ilk 11 oyuncusunun yerine müsait bench oyuncuları girer
+   (Macar algoritması); diğer oyuncular yerinde kalır. Yedeğin katkısı eksik
+   oyuncunun kendi pozisyon skoruyla sınırlıdır, böylece beklenen skor hiçbir
+   zaman nominal skoru aşamaz
+4. En yüksek beklenen skorlu aday seçilir
+=============================================================================
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+from itertools import product
+from typing import Dict, Optional, Sequence, Tuple
+
+import pandas as pd
+import numpy as np
+from scipy.optimize import linear_sum_assignment
+
+from .bench_analyzer import BenchAnalyzer
+from .config import FORMATIONS, STRATEGY_WEIGHTS
+from .optimizer import INELIGIBLE_SCORE, LineupModel, build_score_matrix
+
+
+# Aday kadro üretiminde kullanılan risk seviyeleri (p^λ)
+DEFAULT_RISK_LEVELS = (0.0, 0.5, 1.0, 2.0)
+
+
+def availability_vector(df: pd.DataFrame) -> np.ndarray:
+    """
+    Oyuncu başına oynama olasılığı (0-1).
+
+    Oynama_Olasiligi sütunu yoksa herkes müsait kabul edilir; Sakatlik=1
+    olan oyuncuların olasılığı 0'dır.
+    """
+    if 'Oynama_Olasiligi' in df.columns:
+        prob = df['Oynama_Olasiligi'].fillna(1.0).to_numpy(dtype=float)
+    else:
+        prob = np.ones(len(df))
+    if 'Sakatlik' in df.columns:
+        prob = np.where(df['Sakatlik'].to_numpy() == 1, 0.0, prob)
+    return np.clip(prob, 0.0, 1.0)
+
+
+class ExpectedLineupOptimizer:
+    """
+    Oynama olasılıklarıyla beklenen skoru maksimize eden ilk 11 + bench seçimi.
+
+    Kullanım:
+        optimizer = ExpectedLineupOptimizer(df, '4-3-3', 300, 'Dengeli')
+        result = optimizer.optimize()
+        result['kadro'], result['yedekler'], result['beklenen_skor']
+    """
+
+    def __init__(self, pool_df: pd.DataFrame, formation: str, budget: float,
+                 strategy: str = 'Dengeli', bench_size: int = 7,
+                 max_scenarios: int = 512, seed: int = 42,
+                 bench_budget: Optional[float] = None):
+        if strategy not in STRATEGY_WEIGHTS:
+            raise ValueError(f"Geçersiz strateji: {strategy}")
+
+        self.formation = formation
+        self.budget = budget
+        self.strategy = strategy
+        self.bench_size = bench_size
+        self.bench_budget = bench_budget
+        self.max_scenarios = max_scenarios
+        self.seed = seed
+
+        self.model = LineupModel(pool_df, formation)
+        self.scores = build_score_matrix(self.model.df, strategy, self.model.positions).to_numpy()
+        self.prob = availability_vector(self.model.df)
+        self.eligible = self.scores > INELIGIBLE_SCORE
+        # Oynaması kesin olarak imkansız oyuncular ilk 11'e giremez
+        self._starter_eligible = self.eligible & (self.prob > 0)[:, np.newaxis]
+
+        # Bench skorları: beklenen katkı (skor x oynama olasılığı)
+        self._bench_scores = pd.DataFrame(
+            np.where(self.eligible, self.scores * self.prob[:, np.newaxis], self.scores),
+            index=self.model.df.index, columns=self.model.positions
+        )
+
+    def _candidate(self, risk: float) -> Optional[Dict]:
+        """Risk seviyesi λ için ilk 11 (Skor x p^λ) ve bench adayı."""
+        weighted = np.where(self._starter_eligible, self.scores * self.prob[:, np.newaxis] ** risk,
+                            INELIGIBLE_SCORE)
+        selection, _, status = self.model.solve_fast(weighted, self.budget)
+        if status != 'Optimal':
+            return None
+
+        starters_df, nominal, cost = self.model.lineup_frame(selection, self.scores)
+        ids = starters_df['ID'].to_numpy()
+        absence = {pid: 1.0 - p for pid, p in zip(ids, availability_vector(starters_df))}
+        # Bench bütçesi verilmemişse ilk 11'den artan bütçe kullanılır
+        bench_budget = self.bench_budget if self.bench_budget is not None else max(self.budget - cost, 0.0)
+        bench = BenchAnalyzer(starters_df, self.model.df).optimize_bench(
+            strategy=self.strategy,
+            bench_size=self.bench_size,
+            bench_budget=bench_budget,
+            max_absences=2,
+            absence_weights=absence if any(w > 0 for w in absence.values()) else None,
+            score_matrix=self._bench_scores
+        )['yedekler']
+
+        col_of = {p: col for col, p in enumerate(self.model.positions)}
+        id_to_row = dict(zip(self.model.df['ID'], range(len(self.model.players))))
+        return {
+            'risk': risk,
+            'kadro': starters_df,
+            'nominal_skor': nominal,
+            'maliyet': cost,
+            'rows': np.array([id_to_row[pid] for pid in ids]),
+            'cols': np.array([col_of[p] for p in starters_df['Atanan_Pozisyon']]),
+            'bench_rows': np.array([id_to_row[pid] for pid in bench['ID']], dtype=int) if len(bench) else np.array([], dtype=int),
+            'yedekler': bench
+        }
+
+    def _scenarios(self, players: np.ndarray) -> Tuple[np.ndarray, np.ndarray, bool]:
+        """
+        Verilen oyuncular için müsaitlik senaryoları.
+
+        Belirsiz (0 < p < 1) oyuncu sayısı küçükse tüm kombinasyonlar olasılıklarıyla
+        sayılır; değilse max_scenarios örnek çekilir.
+
+        Returns:
+            Tuple: (senaryo x oyuncu müsaitlik matrisi, senaryo ağırlıkları, tam sayım mı)
+        """
+        prob = self.prob[players]
+        uncertain = np.flatnonzero((prob > 0) & (prob < 1))
+        fixed = prob >= 1
+
+        if 2 ** len(uncertain) <= self.max_scenarios:
+            combos = np.array(list(product([True, False], repeat=len(uncertain))), dtype=bool)
+            combos = combos.reshape(2 ** len(uncertain), len(uncertain))
+            avail = np.tile(fixed, (len(combos), 1))
+            avail[:, uncertain] = combos
+            p = prob[uncertain]
+            weights = np.where(combos, p, 1 - p).prod(axis=1)
+            return avail, weights, True
+
+        rng = np.random.default_rng(self.seed)
+        avail = rng.random((self.max_scenarios, len(players))) < prob
+        return avail, np.full(self.max_scenarios, 1.0 / self.max_scenarios), False
+
+    def _evaluate(self, candidate: Dict, players: np.ndarray, avail: np.ndarray,
+                  weights: np.ndarray) -> float:
+        """Adayın senaryolar üzerinden beklenen gerçekleşen skoru."""
+        position = {row: k for k, row in enumerate(players)}
+        rows, cols, bench_rows = candidate['rows'], candidate['cols'], candidate['bench_rows']
+        starter_scores = self.scores[rows, cols]
+        starter_avail = avail[:, [position[r] for r in rows]]
+        bench_avail = avail[:, [position[r] for r in bench_rows]] if len(bench_rows) else np.zeros((len(avail), 0), bool)
+        fit_all = self.scores[np.ix_(bench_rows, cols)] if len(bench_rows) else np.zeros((0, len(rows)))
+
+        # Aynı (eksik ilk 11, müsait bench) durumları bir kez çözülür
+        gains = {}
+        total = 0.0
+        for s in range(len(avail)):
+            missing = np.flatnonzero(~starter_avail[s])
+            present_bench = np.flatnonzero(bench_avail[s])
+            value = starter_scores[starter_avail[s]].sum()
+            if len(missing) and len(present_bench):
+                key = (missing.tobytes(), present_bench.tobytes())
+                if key not in gains:
+                    # Yedeğin katkısı eksik oyuncunun kendi pozisyon skorunu aşamaz
+                    fit = fit_all[np.ix_(present_bench, missing)]
+                    fit = np.where(fit > INELIGIBLE_SCORE, np.minimum(fit, starter_scores[missing]), fit)
+                    r, c = linear_sum_assignment(np.where(fit > INELIGIBLE_SCORE, fit, -1e6), maximize=True)
+                    gains[key] = float(np.where(fit[r, c] > INELIGIBLE_SCORE, fit[r, c], 0).sum())
+                value += gains[key]
+            total += weights[s] * value
+        return total / weights.sum()
+
+    def optimize(self, risk_levels: Sequence[float] = DEFAULT_RISK_LEVELS,
+                 workers: Optional[int] = None) -> Dict:
+        """
+        Aday kadroları üretir, senaryolar üzerinde paralel değerlendirir ve
+        beklenen skoru en yüksek olanı döndürür.
+
+        Args:
+            risk_levels: Aday üretiminde kullanılacak λ değerleri
+            workers: Değerlendirme thread sayısı (varsayılan: CPU sayısı, en fazla 4)
+
+        Returns:
+            Dict: kadro, yedekler, beklenen_skor, nominal_skor, toplam_maliyet,
+                  risk_seviyesi, adaylar, senaryo_sayısı, tam_sayım, durum
+        """
+        if not self.model.feasible:
+            return {'durum': 'Infeasible'}
+
+        # Aynı ilk 11 + bench'i veren risk seviyeleri tek aday sayılır
+        candidates, seen = [], set()
+        for risk in risk_levels:
+            candidate = self._candidate(risk)
+            if candidate is None:
+                continue
+            key = (frozenset(zip(candidate['rows'], candidate['cols'])), frozenset(candidate['bench_rows']))
+            if key not in seen:
+                seen.add(key)
+                candidates.append(candidate)
+        if not candidates:
+            return {'durum': 'Infeasible'}
+
+        # Ortak senaryolar: tüm adayların oyuncu birleşimi
+        players = np.unique(np.concatenate([
+            np.concatenate([c['rows'], c['bench_rows']]) for c in candidates
+        ]))
+        avail, weights, exact = self._scenarios(players)
+
+        if workers is None:
+            workers = min(4, os.cpu_count() or 1)
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+            expected = list(pool.map(lambda c: self._evaluate(c, players, avail, weights), candidates))
+
+        # Eksik oyunculu kadro, aynı kadronun tam müsait halini (nominal skor) geçemez
+        for candidate, value in zip(candidates, expected):
+            if value > candidate['nominal_skor'] + 1e-6:
+                raise RuntimeError(
+                    f"Beklenen skor ({value:.2f}) nominal skoru ({candidate['nominal_skor']:.2f}) aşıyor"
+                )
+
+        # Eşitlikte ilk 11'in kendi beklenen skoru yüksek olan (oynamayacak oyuncuyu
+        # bench'e bırakmayan) aday tercih edilir
+        starter_ev = [float((self.scores[c['rows'], c['cols']] * self.prob[c['rows']]).sum()) for c in candidates]
+        best_k = max(range(len(candidates)), key=lambda k: (round(expected[k], 6), starter_ev[k]))
+        best = candidates[best_k]
+        # Değişen oyuncular ilk risk seviyesinin (varsayılan λ=0, nominal) kadrosuna göre
+        nominal_ids = set(candidates[0]['kadro']['ID'])
+
+        kadro = best['kadro'].copy()
+        kadro['Oynama_Olasiligi'] = availability_vector(kadro)
+        kadro['Beklenen_Skor'] = np.round(kadro['Pozisyon_Skoru'] * kadro['Oynama_Olasiligi'], 2)
+
+        summary = pd.DataFrame({
+            'Risk_Seviyesi': [c['risk'] for c in candidates],
+            'Nominal_Skor': [round(c['nominal_skor'], 2) for c in candidates],
+            'Beklenen_Skor': np.round(expected, 2),
+            'Maliyet': [round(c['maliyet'], 1) for c in candidates],
+            'Değişen_Oyuncu': [len(set(c['kadro']['ID']) - nominal_ids) for c in candidates],
+            'Seçildi': [k == best_k for k in range(len(candidates))]
+        })
+
+        return {
+            'durum': 'Optimal',
+            'kadro': kadro,
+            'yedekler': best['yedekler'],
+            'beklenen_skor': round(expected[best_k], 2),
+            'nominal_skor': round(best['nominal_skor'], 2),
+            'toplam_maliyet': round(best['maliyet'], 1),
+            'risk_seviyesi': best['risk'],
+            'adaylar': summary,
+            'senaryo_sayısı': len(avail),
+            'tam_sayım': exact
+        }
+
+
+def solve_expected_lineup(
+    df: pd.DataFrame,
+    formation: str,
+    budget: float,
+    strategy: str,
+    bench_size: int = 7,
+    max_scenarios: int = 512,
+    workers: Optional[int] = None,
+    bench_budget: Optional[float] = None
+) -> Tuple[Optional[pd.DataFrame], float, float, str]:
+    """
+    Oynama olasılıklarıyla beklenen skoru maksimize eden kadro
+    (solve_optimal_lineup ile aynı dönüş biçimi).
+
+    Returns:
+        Tuple: (selected_df, total_score, total_cost, status)
+    """
+    if formation not in FORMATIONS:
+        raise ValueError(f"Geçersiz formasyon: {formation}")
+
+    result = ExpectedLineupOptimizer(
+        df, formation, budget, strategy, bench_size=bench_size, max_scenarios=max_scenarios,
+        bench_budget=bench_budget
+    ).optimize(workers=workers)
+
+    if result['durum'] != 'Optimal':
+        return None, 0, 0, result['durum']
+
+    selected_df = result['kadro']
+    return selected_df, float(selected_df['Pozisyon_Skoru'].sum()), float(selected_df['Fiyat_M'].sum()), 'Optimal'
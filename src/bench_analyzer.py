@@ -14,13 +14,140 @@ Bu modül:
 2. Bench kadrası oluştur
 3. Yaralanma senaryolarında çözümleri sun
 4. Squad derinliğini analiz et
+5. Eksik oyuncu senaryolarında beklenen kadro skorunu maksimize eden
+   bench'i ikinci aşama optimizasyonla seç (optimize_bench)
+6. Tüm tekli ve ikili ilk 11 eksikliklerini kadroyu yeniden optimize
+   ederek topluca simüle et (InjuryScenarioSimulator)
+
+Derinlik indeksi (SquadDepthIndex): veri seti sürümü başına bir kez kurulan
+kulüp x alt pozisyon sıralı oyuncu dizileri (esnek uygunluk dahil); derinlik,
+yedek ve lig geneli ısı haritası sorguları sözlük aramasıyla yanıtlanır.
 =============================================================================
 """
 
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from itertools import combinations
+
 import pandas as pd
 import numpy as np
+from scipy.optimize import LinearConstraint, linear_sum_assignment, milp
+from scipy.sparse import csr_matrix, vstack
 from typing import Dict, List, Optional, Tuple
 
+from .config import POSITION_CAN_BE_FILLED_BY
+from .optimizer import INELIGIBLE_SCORE, LineupModel, build_score_matrix
+
+
+# Tüm kulüpleri kapsayan indeks anahtarı
+ALL_CLUBS = None
+
+
+def dataset_version(players: pd.DataFrame) -> str:
+    """Derinlik indeksini etkileyen sütunlardan kararlı veri seti sürümü."""
+    cols = [c for c in ['ID', 'Takim', 'Alt_Pozisyon', 'Atanan_Pozisyon', 'Rating'] if c in players.columns]
+    digest = pd.util.hash_pandas_object(players[cols], index=False).to_numpy()
+    return hashlib.sha1(digest.tobytes() + repr(cols).encode('utf-8')).hexdigest()[:16]
+
+
+class SquadDepthIndex:
+    """
+    Kulüp x pozisyon sıralı oyuncu dizileri.
+    
+    Oyuncular bir kez (kulüp, Rating azalan) sıralanır; her pozisyon için
+    doğal (aynı alt pozisyon) ve esnek (POSITION_CAN_BE_FILLED_BY) oyuncu
+    dizileri kulüplere bölünerek sözlükte tutulur. Diziler players
+    DataFrame'indeki satır konumlarıdır (iloc). ALL_CLUBS anahtarı tüm
+    havuzu kapsar. Eşit Rating'de orijinal sıra korunur (nlargest ile aynı).
+    
+    İndeks DataFrame'i tutmaz: sürüm yalnızca sıralamayı etkileyen sütunlardan
+    hesaplandığından satırlar her zaman çağıranın güncel DataFrame'inden okunur.
+    """
+    
+    def __init__(self, players: pd.DataFrame, version: Optional[str] = None):
+        self.ids = players['ID'].to_numpy()
+        self.version = version or dataset_version(players)
+        self.pos_col = 'Alt_Pozisyon' if 'Alt_Pozisyon' in players.columns else 'Atanan_Pozisyon'
+        self.positions = list(POSITION_CAN_BE_FILLED_BY.keys())
+        
+        sub_pos = players[self.pos_col].to_numpy()
+        extra = [p for p in pd.unique(sub_pos) if p not in POSITION_CAN_BE_FILLED_BY]
+        self.positions += extra
+        
+        clubs = players['Takim'].to_numpy() if 'Takim' in players.columns else np.full(len(players), '')
+        club_codes, self.clubs = pd.factorize(clubs, sort=True)
+        self.clubs = list(self.clubs)
+        rating = players['Rating'].to_numpy(dtype=float) if 'Rating' in players.columns else np.zeros(len(players))
+        
+        # Kulüp, sonra Rating azalan; eşitlikte orijinal sıra
+        order = np.lexsort((np.arange(len(players)), -rating, club_codes))
+        league_order = np.lexsort((np.arange(len(players)), -rating))
+        ordered_clubs = club_codes[order]
+        
+        self._natural: Dict[Tuple, np.ndarray] = {}
+        self._flexible: Dict[Tuple, np.ndarray] = {}
+        for position in self.positions:
+            fillers = POSITION_CAN_BE_FILLED_BY.get(position, [position])
+            for table, mask in ((self._natural, sub_pos == position),
+                                (self._flexible, np.isin(sub_pos, fillers))):
+                rows = order[mask[order]]
+                bounds = np.searchsorted(ordered_clubs[mask[order]], np.arange(len(self.clubs) + 1))
+                for k, club in enumerate(self.clubs):
+                    table[club, position] = rows[bounds[k]:bounds[k + 1]]
+                table[ALL_CLUBS, position] = league_order[mask[league_order]]
+        
+        self._empty = np.array([], dtype=int)
+    
+    def get(self, club, position: str, flexible: bool = False) -> np.ndarray:
+        """Kulüp (ALL_CLUBS: tüm havuz) ve pozisyon için Rating sıralı satır konumları."""
+        table = self._flexible if flexible else self._natural
+        return table.get((club, position), self._empty)
+    
+    def count(self, club, position: str, flexible: bool = False) -> int:
+        return len(self.get(club, position, flexible))
+    
+    def backups(self, club, position: str, exclude_ids=(), top_n: int = 3,
+                flexible: bool = False) -> np.ndarray:
+        """Dışlanan oyuncular (ör. ilk 11) hariç en iyi top_n oyuncunun satır konumları."""
+        rows = self.get(club, position, flexible)
+        if len(exclude_ids):
+            rows = rows[~np.isin(self.ids[rows], list(exclude_ids))]
+        return rows[:top_n] if top_n else rows
+    
+    def count_matrix(self, flexible: bool = False, positions: Optional[List[str]] = None) -> pd.DataFrame:
+        """Lig geneli kulüp x pozisyon oyuncu sayıları (derinlik ısı haritası)."""
+        positions = positions or self.positions
+        table = self._flexible if flexible else self._natural
+        return pd.DataFrame(
+            [[len(table.get((club, p), self._empty)) for p in positions] for club in self.clubs],
+            index=self.clubs, columns=positions
+        )
+
+
+_DEPTH_INDEX_CACHE: 'OrderedDict[str, SquadDepthIndex]' = OrderedDict()
+_DEPTH_INDEX_LOCK = threading.Lock()
+
+
+def get_depth_index(players: pd.DataFrame, max_entries: int = 8) -> SquadDepthIndex:
+    """Veri seti sürümü başına bir kez kurulan derinlik indeksi (önbellekli)."""
+    version = dataset_version(players)
+    with _DEPTH_INDEX_LOCK:
+        index = _DEPTH_INDEX_CACHE.get(version)
+        if index is not None:
+            _DEPTH_INDEX_CACHE.move_to_end(version)
+            return index
+    
+    index = SquadDepthIndex(players, version)
+    with _DEPTH_INDEX_LOCK:
+        _DEPTH_INDEX_CACHE[version] = index
+        while len(_DEPTH_INDEX_CACHE) > max_entries:
+            _DEPTH_INDEX_CACHE.popitem(last=False)
+    return index
+
 
 class BenchAnalyzer:
     """Yedek ve bench oyuncuları analiz eder."""
@@ -31,7 +158,11 @@ class BenchAnalyzer:
         
         # Bench oyuncularını belirle
         starter_ids = set(starter_squad['ID'].tolist())
+        self._starter_ids = list(starter_ids)
         self.bench = all_players[~all_players['ID'].isin(starter_ids)].copy()
+        
+        # Pozisyon sorguları veri seti sürümü başına bir kez kurulan indeksten okunur
+        self.depth_index = get_depth_index(all_players)
     
     def find_position_backups(self, position: str, top_n: int = 3) -> pd.DataFrame:
         """
@@ -44,8 +175,6 @@ class BenchAnalyzer:
         Returns:
             DataFrame: En iyi yedekler
         """
-        pos_col = 'Alt_Pozisyon' if 'Alt_Pozisyon' in self.bench.columns else 'Atanan_Pozisyon'
-
         # Oyuncu adı kolonu: önce Oyuncu_Adi, yoksa Oyuncu, yoksa ilk kolon
         name_candidates = ['Oyuncu_Adi', 'Oyuncu']
         name_col = None
@@ -56,15 +185,14 @@ class BenchAnalyzer:
         if name_col is None:
             name_col = self.bench.columns[0]
         
-        # Bu pozisyondan yedekleri bul
-        backups = self.bench[self.bench[pos_col] == position].copy()
+        # Bu pozisyondan Rating sıralı yedekler (ilk 11 hariç)
+        backups = self.all_players.iloc[self.depth_index.backups(ALL_CLUBS, position, self._starter_ids, top_n)]
         
         if backups.empty:
             return pd.DataFrame()
         
-        # Rating'e göre sırala
         selected_cols = [c for c in [name_col, 'Rating', 'Form', 'Fiyat_M', 'Ofans_Gucu', 'Defans_Gucu'] if c in backups.columns]
-        backups = backups.nlargest(top_n, 'Rating')[selected_cols].copy()
+        backups = backups[selected_cols].copy()
 
         # Sütunları standart isimlere dönüştür
         rename_map = {name_col: 'Oyuncu', 'Fiyat_M': 'Fiyat', 'Ofans_Gucu': 'Ofans', 'Defans_Gucu': 'Defans'}
@@ -111,6 +239,210 @@ class BenchAnalyzer:
         
         return pd.DataFrame.from_records(normalized).head(max_players)
     
+    def _bench_candidates(self, scores: np.ndarray, prices: np.ndarray,
+                          per_position: int, with_budget: bool) -> np.ndarray:
+        """Pozisyon başına skora göre en iyi (bütçe varsa en ucuz da) adaylar."""
+        keep = set()
+        for col in range(scores.shape[1]):
+            eligible = np.flatnonzero(scores[:, col] > INELIGIBLE_SCORE)
+            if len(eligible) == 0:
+                continue
+            best = eligible[np.argsort(-scores[eligible, col], kind='stable')[:per_position]]
+            keep.update(best.tolist())
+            if with_budget:
+                cheap = eligible[np.argsort(prices[eligible], kind='stable')[:max(1, per_position // 2)]]
+                keep.update(cheap.tolist())
+        return np.array(sorted(keep), dtype=int)
+    
+    def optimize_bench(self,
+                       strategy: str = 'Dengeli',
+                       bench_size: int = 7,
+                       bench_budget: Optional[float] = None,
+                       max_absences: int = 1,
+                       absence_weights: Optional[Dict] = None,
+                       candidates_per_position: int = 6,
+                       score_matrix: Optional[pd.DataFrame] = None) -> Dict:
+        """
+        İlk 11'e ikinci aşama olarak optimal bench seçimi.
+        
+        Senaryolar: tek (ve max_absences=2 ise ikili) ilk 11 oyuncusu eksikliği.
+        Her senaryoda boşalan pozisyonlara bench'ten oyuncu girer (diğer
+        ilk 11 oyuncuları yerinde kalır); boş kalan pozisyon skoru kaybedilir.
+        Amaç, senaryolar üzerinden beklenen kadro skorunu maksimize etmektir:
+        
+            max Σ_s p_s Σ_{h∈s, b} Skor[b, pozisyon_h] w[s,h,b]
+            Σ_b w[s,h,b] <= 1           (her boş pozisyona en fazla bir yedek)
+            Σ_{h∈s} w[s,h,b] <= z[b]    (yedek seçildiyse ve senaryoda bir kez)
+            Σ z[b] <= bench_size,  Σ Fiyat_b z[b] <= bench_budget
+        
+        Pozisyon uygunluğu ve skorlar ilk 11 modelindeki skor matrisinden
+        (build_score_matrix, POSITION_CAN_BE_FILLED_BY esnekliği dahil) gelir.
+        Sabit z için senaryo alt problemleri atama problemidir; yalnızca z
+        tamsayıdır. Çözüm HiGHS (scipy.optimize.milp) ile yapılır.
+        
+        Args:
+            strategy: Pozisyon skoru stratejisi
+            bench_size: Maksimum bench oyuncu sayısı
+            bench_budget: Bench bütçesi (Milyon £, None: sınırsız)
+            max_absences: 1 = tek eksik, 2 = tek + ikili eksikler
+            absence_weights: {ID: göreli eksik olma olasılığı} (varsayılan: eşit)
+            candidates_per_position: Pozisyon başına değerlendirilecek aday sayısı
+            score_matrix: all_players için hazır skor matrisi (index=all_players.index)
+            
+        Returns:
+            Dict: yedekler, senaryolar, ilk_11_skoru, beklenen_skor,
+                  beklenen_kayıp, toplam_maliyet, durum
+        """
+        starters = self.starter_squad.reset_index(drop=True)
+        slot_col = 'Atanan_Pozisyon' if 'Atanan_Pozisyon' in starters.columns else 'Alt_Pozisyon'
+        slots = starters[slot_col].to_numpy()
+        positions = list(dict.fromkeys(slots))
+        slot_idx = np.array([positions.index(p) for p in slots])
+        n = len(starters)
+        
+        starter_scores = build_score_matrix(starters, strategy, positions).to_numpy()[np.arange(n), slot_idx]
+        base_score = float(starter_scores.sum())
+        
+        # Senaryolar: her eksiklik sayısı eşit ağırlıklı, içinde ağırlıklar çarpımıyla orantılı
+        weights = np.array([
+            float((absence_weights or {}).get(pid, 1.0)) for pid in starters['ID']
+        ])
+        scenarios, probs = [], []
+        for size in range(1, min(max_absences, n) + 1):
+            level = list(combinations(range(n), size))
+            level_weights = np.array([weights[list(c)].prod() for c in level])
+            if level_weights.sum() <= 0:
+                continue
+            scenarios.extend(level)
+            probs.extend(level_weights / level_weights.sum())
+        probs = np.array(probs) / max(len({len(c) for c in scenarios}), 1)
+        
+        # Aday havuzu ve skorları (sakat oyuncular yedek olarak önerilmez)
+        pool = self.bench
+        if 'Sakatlik' in pool.columns:
+            pool = pool[pool['Sakatlik'] == 0]
+        if score_matrix is not None:
+            pool_scores = score_matrix.loc[pool.index, positions].to_numpy(dtype=float)
+        else:
+            pool_scores = build_score_matrix(pool, strategy, positions).to_numpy()
+        pool_prices = pool['Fiyat_M'].to_numpy(dtype=float)
+        cand = self._bench_candidates(pool_scores, pool_prices, candidates_per_position,
+                                      bench_budget is not None)
+        
+        # Bench olmadan beklenen kayıp: boşalan pozisyonların skoru
+        bare_loss = float(probs @ np.array([starter_scores[list(c)].sum() for c in scenarios])) if scenarios else 0.0
+        result = {
+            'yedekler': pd.DataFrame(),
+            'senaryolar': pd.DataFrame(),
+            'ilk_11_skoru': round(base_score, 2),
+            'beklenen_skor': round(base_score - bare_loss, 2),
+            'beklenen_kayıp': round(bare_loss, 2),
+            'toplam_maliyet': 0.0,
+            'durum': 'Optimal'
+        }
+        if len(cand) == 0 or not scenarios or bench_size <= 0:
+            return result
+        
+        scores = pool_scores[cand]
+        prices = pool_prices[cand]
+        n_cand = len(cand)
+        
+        # Boş pozisyonlar (senaryo, eksik oyuncu) ve uygun (boşluk, aday) değişkenleri
+        hole_scenario = np.array([s for s, combo in enumerate(scenarios) for _ in combo])
+        hole_player = np.array([i for combo in scenarios for i in combo])
+        eligible = scores[:, slot_idx[hole_player]] > INELIGIBLE_SCORE
+        w_cand, w_hole = np.nonzero(eligible)
+        n_w = len(w_cand)
+        
+        # Amaç (min): -p_s x skor; z için küçük eşitlik bozucu (kullanılmayan kontenjan dolsun)
+        best_fit = np.where(scores > INELIGIBLE_SCORE, scores, 0).max(axis=1)
+        c = np.concatenate([
+            -1e-4 * best_fit,
+            -probs[hole_scenario[w_hole]] * scores[w_cand, slot_idx[hole_player[w_hole]]]
+        ])
+        
+        w_cols = n_cand + np.arange(n_w)
+        link_keys, link_rows = np.unique(hole_scenario[w_hole] * n_cand + w_cand, return_inverse=True)
+        link = csr_matrix(
+            (np.concatenate([np.ones(n_w), -np.ones(len(link_keys))]),
+             (np.concatenate([link_rows, np.arange(len(link_keys))]),
+              np.concatenate([w_cols, link_keys % n_cand]))),
+            shape=(len(link_keys), n_cand + n_w)
+        )
+        hole_rows = csr_matrix((np.ones(n_w), (w_hole, w_cols)), shape=(len(hole_player), n_cand + n_w))
+        size_row = csr_matrix((np.ones(n_cand), (np.zeros(n_cand, dtype=int), np.arange(n_cand))),
+                              shape=(1, n_cand + n_w))
+        blocks = [link, hole_rows, size_row]
+        upper = [np.zeros(len(link_keys)), np.ones(len(hole_player)), [float(bench_size)]]
+        if bench_budget is not None:
+            blocks.append(csr_matrix((prices, (np.zeros(n_cand, dtype=int), np.arange(n_cand))),
+                                     shape=(1, n_cand + n_w)))
+            upper.append([float(bench_budget) + 1e-9])
+        
+        res = milp(
+            c,
+            constraints=LinearConstraint(vstack(blocks).tocsr(), -np.inf, np.concatenate(upper)),
+            integrality=np.concatenate([np.ones(n_cand), np.zeros(n_w)]),
+            bounds=(0, 1)
+        )
+        if res.x is None:
+            result['durum'] = 'Infeasible'
+            return result
+        
+        chosen = np.flatnonzero(res.x[:n_cand] > 0.5)
+        
+        # Senaryo başına giriş planı (seçili bench ile atama)
+        names = self._names(starters)
+        pool_names = self._names(pool)
+        usage = np.zeros(len(chosen))
+        rows, losses = [], []
+        for s, combo in enumerate(scenarios):
+            combo = list(combo)
+            gain, entering = 0.0, ['-'] * len(combo)
+            if len(chosen):
+                fit = scores[np.ix_(chosen, slot_idx[combo])]
+                r, k = linear_sum_assignment(np.where(fit > INELIGIBLE_SCORE, fit, -1e6), maximize=True)
+                for b, h in zip(r, k):
+                    if fit[b, h] > INELIGIBLE_SCORE:
+                        gain += fit[b, h]
+                        entering[h] = pool_names[cand[chosen[b]]]
+                        usage[b] += probs[s]
+            loss = float(starter_scores[combo].sum() - gain)
+            losses.append(loss)
+            rows.append({
+                'Eksik': ', '.join(names[combo]),
+                'Pozisyon': ', '.join(slots[combo]),
+                'Giren': ', '.join(entering),
+                'Skor_Kaybı': round(loss, 2),
+                'Olasılık': round(float(probs[s]), 4)
+            })
+        
+        bench = pool.iloc[cand[chosen]].copy()
+        coverage = scores[chosen] > INELIGIBLE_SCORE
+        bench['Kapsadığı_Pozisyonlar'] = [
+            ', '.join(p for p, ok in zip(positions, mask) if ok) for mask in coverage
+        ]
+        bench['Kullanım_Oranı'] = np.round(usage * 100, 1)
+        bench = bench.sort_values('Kullanım_Oranı', ascending=False, kind='stable').reset_index(drop=True)
+        
+        expected_loss = float(probs @ np.array(losses))
+        result.update({
+            'yedekler': bench,
+            'senaryolar': pd.DataFrame(rows).sort_values('Skor_Kaybı', ascending=False, kind='stable').reset_index(drop=True),
+            'beklenen_skor': round(base_score - expected_loss, 2),
+            'beklenen_kayıp': round(expected_loss, 2),
+            'toplam_maliyet': round(float(prices[chosen].sum()), 1)
+        })
+        return result
+    
+    @staticmethod
+    def _names(df: pd.DataFrame) -> np.ndarray:
+        """Oyuncu isimleri (Oyuncu_Adi, yoksa Oyuncu, yoksa ID)."""
+        for col in ['Oyuncu_Adi', 'Oyuncu', 'ID']:
+            if col in df.columns:
+                return df[col].astype(str).to_numpy()
+        return df.index.astype(str).to_numpy()
+    
     def analyze_injury_scenarios(self, player_id: str, all_players: pd.DataFrame) -> Dict:
         """
         Belirli bir oyuncu sakat olursa ne olur?
@@ -192,10 +524,17 @@ class BenchAnalyzer:
         pos_col = 'Alt_Pozisyon' if 'Alt_Pozisyon' in self.starter_squad.columns else 'Atanan_Pozisyon'
         
         depth_analysis = {}
+        index = self.depth_index
+        ids = index.ids
+        starter_counts = self.starter_squad[pos_col].value_counts(sort=False)
         
         for pos in self.starter_squad[pos_col].unique():
-            starter_count = len(self.starter_squad[self.starter_squad[pos_col] == pos])
-            backup_count = len(self.bench[self.bench[pos_col] == pos])
+            starter_count = int(starter_counts[pos])
+            # Havuzdaki oyuncular - havuzdaki ilk 11 oyuncuları (indeks dizileri üzerinden)
+            natural = index.get(ALL_CLUBS, pos)
+            flexible = index.get(ALL_CLUBS, pos, flexible=True)
+            backup_count = len(natural) - int(np.isin(ids[natural], self._starter_ids).sum())
+            flexible_count = len(flexible) - int(np.isin(ids[flexible], self._starter_ids).sum())
             total = starter_count + backup_count
             
             if total == 1:
@@ -210,6 +549,7 @@ class BenchAnalyzer:
             depth_analysis[pos] = {
                 'starter': starter_count,
                 'backup': backup_count,
+                'esnek_yedek': flexible_count,
                 'total': total,
                 'derinlik': depth
             }
@@ -280,3 +620,203 @@ class BenchAnalyzer:
             summary += "🔴 Zayıf\n"
         
         return summary
+
+
+# =============================================================================
+# TOPLU SAKATLIK SENARYOSU SİMÜLATÖRÜ
+# =============================================================================
+
+class _InjuryWorker:
+    """
+    Tek bir işçinin (süreç ya da ana süreç) atama modeli ve skor matrisi.
+    
+    Model bir kez kurulur; her senaryo yalnızca eksik oyuncu satırlarını
+    dışlayan bir maske ile LineupModel.solve_fast üzerinden çözülür.
+    """
+    
+    def __init__(self, pool_df: pd.DataFrame, formation: str, budget: float, strategy: str):
+        self.model = LineupModel(pool_df, formation)
+        self.budget = budget
+        self.score_values = build_score_matrix(
+            self.model.df, strategy, self.model.positions
+        ).to_numpy()
+    
+    def solve(self, absent_rows: Tuple[int, ...]) -> Tuple[Tuple, float, str]:
+        """Verilen satırlar dışlanarak kadroyu yeniden optimize eder."""
+        excluded = np.zeros(len(self.model.players), dtype=bool)
+        excluded[list(absent_rows)] = True
+        selection, score, status = self.model.solve_fast(self.score_values, self.budget, excluded)
+        return tuple(selection), score, status
+
+
+_INJURY_WORKER: Optional[_InjuryWorker] = None
+
+
+def _injury_init(*args) -> None:
+    """İşçi süreç başlatıcısı: model süreç başına bir kez kurulur."""
+    global _INJURY_WORKER
+    _INJURY_WORKER = _InjuryWorker(*args)
+
+
+def _injury_solve(absent_rows: Tuple[int, ...]) -> Tuple[Tuple, float, str]:
+    return _INJURY_WORKER.solve(absent_rows)
+
+
+class InjuryScenarioSimulator:
+    """
+    İlk 11'deki her oyuncunun ve her oyuncu ikilisinin eksikliğinde kadroyu
+    yeniden optimize ederek skor kaybını ölçer.
+    
+    - Her senaryo tam atama modelinin (bütçe, formasyon, esnek pozisyonlar)
+      eksik oyuncular dışlanarak yeniden çözülmesidir
+    - Artımlı çözüm: i'nin eksikliğindeki optimal kadroda j yoksa, (i, j)
+      ikilisinin optimumu tekli i optimumuyla aynıdır; yalnızca kalan ikililer çözülür
+    - Aynı eksik kümesi tekrar çözülmez (önbellek)
+    - Çözümler isteğe bağlı süreç havuzuna dağıtılır
+    """
+    
+    def __init__(self, pool_df: pd.DataFrame, starter_squad: pd.DataFrame,
+                 formation: str, budget: float, strategy: str = 'Dengeli'):
+        self.pool_df = pool_df
+        self.starter_squad = starter_squad.reset_index(drop=True)
+        self.formation = formation
+        self.budget = budget
+        self.strategy = strategy
+        self._worker = _InjuryWorker(pool_df, formation, budget, strategy)
+        self._cache: Dict[frozenset, Tuple[Tuple, float, str]] = {}
+    
+    def _worker_args(self) -> Tuple:
+        return (self.pool_df, self.formation, self.budget, self.strategy)
+    
+    def _solve_all(self, scenarios: List[Tuple[int, ...]], workers: int) -> None:
+        """Önbellekte olmayan senaryoları (sırayla ya da süreç havuzunda) çözer."""
+        todo = list(dict.fromkeys(
+            tuple(sorted(rows)) for rows in scenarios if frozenset(rows) not in self._cache
+        ))
+        if not todo:
+            return
+        if workers <= 1 or len(todo) < 2 * workers:
+            results = [self._worker.solve(rows) for rows in todo]
+        else:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_injury_init,
+                                     initargs=self._worker_args()) as pool:
+                results = list(pool.map(_injury_solve, todo, chunksize=max(1, len(todo) // (4 * workers))))
+        for rows, outcome in zip(todo, results):
+            self._cache[frozenset(rows)] = outcome
+    
+    def run(self, max_absences: int = 2, workers: Optional[int] = None) -> Dict:
+        """
+        Tüm tekli (ve max_absences=2 ise ikili) eksiklikleri simüle eder.
+        
+        Args:
+            max_absences: 1 = yalnızca tekli, 2 = tekli + ikili eksiklikler
+            workers: Paralel süreç sayısı (varsayılan: CPU sayısı, en fazla 4; 1 = süreç içi)
+            
+        Returns:
+            Dict: temel_skor, kayıp_matrisi (köşegen: tekli, diğer: ikili kayıp),
+                  tekli_senaryolar, kırılgan_pozisyonlar, çözülen_model,
+                  artımlı_atlanan, süre_sn
+        """
+        start = time.perf_counter()
+        if workers is None:
+            workers = min(4, os.cpu_count() or 1)
+        
+        model = self._worker.model
+        row_of = {index: row for row, index in enumerate(model.players)}
+        id_to_index = dict(zip(model.df['ID'], model.df.index))
+        
+        # Modelde bulunan ilk 11 oyuncuları
+        starters = self.starter_squad[self.starter_squad['ID'].isin(id_to_index)].reset_index(drop=True)
+        rows = np.array([row_of[id_to_index[pid]] for pid in starters['ID']], dtype=int)
+        names = BenchAnalyzer._names(starters)
+        slot_col = 'Atanan_Pozisyon' if 'Atanan_Pozisyon' in starters.columns else 'Alt_Pozisyon'
+        slots = starters[slot_col].to_numpy()
+        n = len(starters)
+        
+        self._solve_all([()], 1)
+        base_selection, base_score, base_status = self._cache[frozenset()]
+        if base_status != 'Optimal':
+            return {'durum': base_status}
+        
+        # 1) Tekli eksiklikler
+        self._solve_all([(r,) for r in rows], workers)
+        single = [self._cache[frozenset((r,))] for r in rows]
+        in_single = [
+            {row_of[index] for index, _ in selection} for selection, _, _ in single
+        ]
+        
+        # 2) İkili eksiklikler: tekli optimum diğer oyuncuyu kullanmıyorsa çözüm aynıdır
+        pairs = list(combinations(range(n), 2)) if max_absences >= 2 else []
+        pair_outcome, to_solve, skipped = {}, [], 0
+        for i, j in pairs:
+            if single[i][2] == 'Optimal' and rows[j] not in in_single[i]:
+                pair_outcome[i, j] = single[i]
+                skipped += 1
+            elif single[j][2] == 'Optimal' and rows[i] not in in_single[j]:
+                pair_outcome[i, j] = single[j]
+                skipped += 1
+            else:
+                to_solve.append((i, j))
+        self._solve_all([(rows[i], rows[j]) for i, j in to_solve], workers)
+        for i, j in to_solve:
+            pair_outcome[i, j] = self._cache[frozenset((rows[i], rows[j]))]
+        
+        # Çözümsüz senaryo (eksik kapatılamıyor) en kötü durumdur: kayıp sonsuz
+        def loss(outcome: Tuple[Tuple, float, str]) -> float:
+            return base_score - outcome[1] if outcome[2] == 'Optimal' else np.inf
+        
+        # Kayıp matrisi
+        matrix = np.full((n, n), np.nan)
+        for k in range(n):
+            matrix[k, k] = loss(single[k])
+        for (i, j), outcome in pair_outcome.items():
+            matrix[i, j] = matrix[j, i] = loss(outcome)
+        loss_matrix = pd.DataFrame(np.round(matrix, 2), index=names, columns=names)
+        
+        base_players = {index for index, _ in base_selection}
+        single_rows = []
+        for k in range(n):
+            selection, _, status = single[k]
+            entering = [index for index, _ in selection if index not in base_players]
+            single_rows.append({
+                'Oyuncu': names[k],
+                'Pozisyon': slots[k],
+                'Skor_Kaybı': round(loss(single[k]), 2),
+                'Girenler': ', '.join(BenchAnalyzer._names(model.df.loc[entering])) if status == 'Optimal' else '-',
+                'Yer_Değişikliği': sum(
+                    1 for index, pos in selection if index in base_players and (index, pos) not in base_selection
+                ) if status == 'Optimal' else 0,
+                'Durum': status
+            })
+        singles_df = pd.DataFrame(single_rows).sort_values('Skor_Kaybı', ascending=False, kind='stable')
+        
+        # Pozisyon kırılganlığı: tekli kayıp ve pozisyonu içeren ikililerin en kötüsü;
+        # çözümsüz senaryosu olan pozisyonlar en üstte
+        off_diagonal = np.where(np.eye(n, dtype=bool), np.nan, matrix)
+        fragility = pd.DataFrame({
+            'Pozisyon': slots,
+            'Çözümsüz': np.isinf(matrix).sum(axis=1),
+            'Tekli_Kayıp': np.diag(matrix),
+            'İkili_Ortalama': np.nanmean(off_diagonal, axis=1) if n > 1 and pairs else np.nan,
+            'İkili_En_Kötü': np.nanmax(off_diagonal, axis=1) if n > 1 and pairs else np.nan,
+        }).groupby('Pozisyon', sort=False).agg(
+            Oyuncu_Sayısı=('Tekli_Kayıp', 'size'),
+            Çözümsüz_Senaryo=('Çözümsüz', 'sum'),
+            Ortalama_Tekli_Kayıp=('Tekli_Kayıp', 'mean'),
+            İkili_Ortalama=('İkili_Ortalama', 'mean'),
+            İkili_En_Kötü=('İkili_En_Kötü', 'max')
+        ).round(2).reset_index().sort_values(
+            ['Çözümsüz_Senaryo', 'Ortalama_Tekli_Kayıp'], ascending=False, kind='stable'
+        )
+        
+        return {
+            'durum': 'Optimal',
+            'temel_skor': round(base_score, 2),
+            'kayıp_matrisi': loss_matrix,
+            'tekli_senaryolar': singles_df.reset_index(drop=True),
+            'kırılgan_pozisyonlar': fragility.reset_index(drop=True),
+            'senaryo_sayısı': n + len(pairs),
+            'çözülen_model': len(self._cache),
+            'artımlı_atlanan': skipped,
+            'süre_sn': round(time.perf_counter() - start, 3)
+        }
@@ -0,0 +1,233 @@
+"""
+=============================================================================
+CLI.PY - TARAYICISIZ (HEADLESS) TOPLU OPTİMİZASYON
+=============================================================================
+
+Streamlit arayüzüne ihtiyaç duymadan komut satırından toplu optimizasyon:
+- Veri bir kez yüklenir ve normalize edilir
+- Takım x Formasyon x Bütçe x Strateji kombinasyonları için
+  solve_optimal_lineup çalıştırılır (isteğe bağlı paralel işçilerle)
+- Sonuçlar CSV/JSON olarak, istenirse NarrativeBuilder markdown
+  raporlarıyla birlikte yazılır
+
+Kullanım:
+    python -m src --teams Arsenal Liverpool --formations 4-3-3 4-4-2 \\
+        --strategies Dengeli Ofansif --output-dir cikti --report --workers 4
+=============================================================================
+"""
+
+import argparse
+import json
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import product
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+from .config import FORMATIONS, STRATEGY_WEIGHTS
+from .data_handler import load_fc26_data, normalize_data, generate_synthetic_players
+from .optimizer import solve_optimal_lineup
+from .narrative_builder import NarrativeBuilder
+
+
+# Çıktı dosyalarında tutulacak oyuncu sütunları
+LINEUP_COLUMNS = [
+    'ID', 'Oyuncu', 'Takim', 'Alt_Pozisyon', 'Atanan_Pozisyon', 'Pozisyon_Skoru',
+    'Rating', 'Fiyat_M', 'Form', 'Ofans_Gucu', 'Defans_Gucu'
+]
+
+
+def default_team_budget(team_df: pd.DataFrame) -> float:
+    """Arayüzdeki varsayılan bütçe: takımın en pahalı 11 oyuncusunun toplamı."""
+    if len(team_df) >= 11:
+        return float(round(team_df['Fiyat_M'].nlargest(11).sum()))
+    return float(round(team_df['Fiyat_M'].sum()))
+
+
+def _slug(text: str) -> str:
+    """Dosya adı için güvenli metin."""
+    return re.sub(r'[^A-Za-z0-9]+', '_', str(text)).strip('_')
+
+
+def _json_default(value):
+    """NumPy skalerlerini JSON'a uygun Python tiplerine çevirir."""
+    if hasattr(value, 'item'):
+        return value.item()
+    return str(value)
+
+
+def run_job(job: Dict, team_df: pd.DataFrame, with_report: bool = False) -> Dict:
+    """
+    Tek bir optimizasyon işini çalıştırır (işçi süreçlerde de çağrılır).
+
+    Args:
+        job: {'team', 'formation', 'budget', 'strategy'}
+        team_df: Takımın normalize edilmiş oyuncuları
+        with_report: NarrativeBuilder raporu üretilsin mi
+
+    Returns:
+        Dict: İş bilgisi, durum, skor, maliyet, kadro kayıtları ve (varsa) rapor
+    """
+    start = time.perf_counter()
+    selected_df, total_score, total_cost, status = solve_optimal_lineup(
+        team_df, job['formation'], job['budget'], job['strategy']
+    )
+
+    result = {
+        **job,
+        'status': status,
+        'total_score': round(float(total_score), 4),
+        'total_cost': round(float(total_cost), 1),
+        'players': [],
+        'report': None
+    }
+
+    if status == 'Optimal' and selected_df is not None:
+        cols = [c for c in LINEUP_COLUMNS if c in selected_df.columns]
+        result['players'] = selected_df[cols].to_dict('records')
+        if with_report:
+            result['report'] = NarrativeBuilder(
+                selected_df, job['formation'], job['budget']
+            ).generate_full_report()
+
+    result['elapsed_s'] = round(time.perf_counter() - start, 4)
+    return result
+
+
+def build_jobs(df: pd.DataFrame, teams: List[str], formations: List[str],
+               strategies: List[str], budgets: Optional[List[float]]) -> List[Dict]:
+    """Takım x Formasyon x Bütçe x Strateji iş listesini oluşturur."""
+    jobs = []
+    for team in teams:
+        team_budgets = budgets or [default_team_budget(df[df['Takim'] == team])]
+        for formation, budget, strategy in product(formations, team_budgets, strategies):
+            jobs.append({
+                'team': team,
+                'formation': formation,
+                'budget': float(budget),
+                'strategy': strategy
+            })
+    return jobs
+
+
+def run_batch(df: pd.DataFrame, jobs: List[Dict], workers: int = 1,
+              with_report: bool = False) -> List[Dict]:
+    """
+    İşleri sırayla veya süreç havuzunda çalıştırır.
+
+    Her işçiye yalnızca ilgili takımın oyuncuları gönderilir; veri seti
+    ana süreçte bir kez yüklenir.
+    """
+    team_frames = {team: df[df['Takim'] == team] for team in {j['team'] for j in jobs}}
+
+    if workers <= 1:
+        return [run_job(job, team_frames[job['team']], with_report) for job in jobs]
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            pool.submit(run_job, job, team_frames[job['team']], with_report)
+            for job in jobs
+        ]
+        return [f.result() for f in futures]
+
+
+def write_outputs(results: List[Dict], output_dir: Path, formats: List[str]) -> List[Path]:
+    """Sonuçları CSV/JSON ve markdown rapor olarak yazar."""
+    output_dir.mkdir(parents=True, exist_ok=True)
+    written = []
+
+    if 'csv' in formats:
+        rows = []
+        for r in results:
+            for player in r['players']:
+                rows.append({
+                    'team': r['team'], 'formation': r['formation'],
+                    'budget': r['budget'], 'strategy': r['strategy'],
+                    'status': r['status'], 'total_score': r['total_score'],
+                    **player
+                })
+        path = output_dir / 'lineups.csv'
+        pd.DataFrame(rows).to_csv(path, index=False)
+        written.append(path)
+
+    if 'json' in formats:
+        path = output_dir / 'lineups.json'
+        payload = [{k: v for k, v in r.items() if k != 'report'} for r in results]
+        path.write_text(json.dumps(payload, indent=2, ensure_ascii=False, default=_json_default), encoding='utf-8')
+        written.append(path)
+
+    reports = [r for r in results if r.get('report')]
+    if reports:
+        report_dir = output_dir / 'reports'
+        report_dir.mkdir(exist_ok=True)
+        for r in reports:
+            name = f"{_slug(r['team'])}_{r['formation']}_{_slug(r['strategy'])}_{r['budget']:.0f}.md"
+            path = report_dir / name
+            path.write_text(r['report'], encoding='utf-8')
+            written.append(path)
+
+    return written
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog='python -m src',
+        description="Premier League kadro optimizasyonu - toplu (headless) çalıştırma"
+    )
+    parser.add_argument('--teams', nargs='+', default=None,
+                        help="Takım adları (varsayılan: tüm takımlar)")
+    parser.add_argument('--formations', nargs='+', default=['4-3-3'],
+                        choices=list(FORMATIONS.keys()))
+    parser.add_argument('--strategies', nargs='+', default=['Dengeli'],
+                        choices=list(STRATEGY_WEIGHTS.keys()))
+    parser.add_argument('--budgets', nargs='+', type=float, default=None,
+                        help="Bütçeler (Milyon £). Varsayılan: takımın en pahalı 11 oyuncusu")
+    parser.add_argument('--output-dir', type=Path, default=Path('cikti'))
+    parser.add_argument('--format', nargs='+', default=['csv', 'json'],
+                        choices=['csv', 'json'], dest='formats')
+    parser.add_argument('--report', action='store_true',
+                        help="Her kadro için NarrativeBuilder markdown raporu yaz")
+    parser.add_argument('--workers', type=int, default=1, help="Paralel işçi süreç sayısı")
+    parser.add_argument('--synthetic', type=int, default=None, metavar='N',
+                        help="Gerçek veri yerine N oyunculuk sentetik havuz kullan")
+    parser.add_argument('--seed', type=int, default=42, help="Sentetik veri tohumu")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+
+    # Veri bir kez yüklenir
+    if args.synthetic:
+        df_raw = generate_synthetic_players(args.synthetic, seed=args.seed)
+    else:
+        df_raw = load_fc26_data()
+    df = normalize_data(df_raw)
+
+    available = sorted(df['Takim'].unique().tolist())
+    teams = args.teams or available
+    unknown = [t for t in teams if t not in available]
+    if unknown:
+        print(f"Bilinmeyen takım(lar): {', '.join(unknown)}", file=sys.stderr)
+        return 2
+
+    jobs = build_jobs(df, teams, args.formations, args.strategies, args.budgets)
+    print(f"{len(jobs)} optimizasyon işi çalıştırılıyor ({args.workers} işçi)...")
+
+    start = time.perf_counter()
+    results = run_batch(df, jobs, workers=args.workers, with_report=args.report)
+    elapsed = time.perf_counter() - start
+
+    written = write_outputs(results, args.output_dir, args.formats)
+
+    failed = [r for r in results if r['status'] != 'Optimal']
+    print(f"Tamamlandı: {len(results) - len(failed)}/{len(results)} optimal, {elapsed:.1f} sn")
+    for r in failed:
+        print(f"  ✗ {r['team']} {r['formation']} £{r['budget']:.0f}M {r['strategy']}: {r['status']}")
+    print(f"{len(written)} dosya yazıldı: {args.output_dir}")
+
+    return 0 if not failed else 1
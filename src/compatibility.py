@@ -14,6 +14,8 @@ Bu modül:
 2. Takım kimyasını analiz et
 3. Sinerji puanı ver
 4. İdeal kombinasyonları öner
+5. Takas motoru: tüm (ilk 11 oyuncusu, aday) değişimlerini tek seferde
+   skor, kimya ve maliyet farklarıyla sırala (rank_swaps)
 =============================================================================
 """
 
@@ -21,6 +23,8 @@ import pandas as pd
 import numpy as np
 from typing import Dict, List, Tuple, Optional
 
+from .optimizer import INELIGIBLE_SCORE, build_score_matrix
+
 
 class CompatibilityAnalyzer:
     """Oyuncu uyumluluğu analizi."""
@@ -47,28 +51,110 @@ class CompatibilityAnalyzer:
     
     def __init__(self, squad_df: pd.DataFrame):
         self.squad_df = squad_df
+        self._features = self._pair_features(squad_df)
+        # Tüm çift sorguları bu tek matristen okunur
+        self._components = self._pair_components(self._features, self._features)
+        self._scores = self._pair_scores(self._features, self._features, self._components)
+        # Oyuncunun kendisiyle uyumu (suggest_swap'ın eski ortalamasında yer alır)
+        self._self_scores = np.diag(self._scores).copy()
+        np.fill_diagonal(self._scores, 0.0)
         self.compatibility_matrix = self._build_compatibility_matrix()
     
-    def _build_compatibility_matrix(self) -> pd.DataFrame:
-        """Kadroda tüm oyuncu çiftlerinin uyumluluğu matrisini oluştur."""
-        n_players = len(self.squad_df)
-        player_names = self.squad_df['Oyuncu_Adi'].tolist() if 'Oyuncu_Adi' in self.squad_df.columns else self.squad_df['Oyuncu'].tolist()
+    @staticmethod
+    def _pair_features(df: pd.DataFrame) -> Dict[str, np.ndarray]:
+        """
+        Çift uyumluluğu için oyuncu özellik dizileri (calculate_pair_compatibility
+        ile aynı sütun öncelikleri ve varsayılanlar).
+        """
+        n = len(df)
+        
+        def column(names: List[str], default) -> np.ndarray:
+            for name in names:
+                if name in df.columns:
+                    return df[name].to_numpy()
+            return np.full(n, default, dtype=object if isinstance(default, str) else float)
+        
+        if 'Oyuncu_Adi' in df.columns:
+            names = df['Oyuncu_Adi'].to_numpy()
+        elif 'Oyuncu' in df.columns:
+            names = df['Oyuncu'].to_numpy()
+        else:
+            names = np.array([f'Player_{i}' for i in range(n)], dtype=object)
         
-        matrix = pd.DataFrame(
-            np.zeros((n_players, n_players)),
-            index=player_names,
-            columns=player_names
-        )
+        return {
+            'names': names,
+            'position': column(['Alt_Pozisyon', 'Atanan_Pozisyon'], ''),
+            'team': column(['Takim', 'Team'], ''),
+            'rating': column(['Rating'], 75).astype(float),
+            'form': column(['Form'], 6).astype(float),
+        }
+    
+    @classmethod
+    def _synergy_lookup(cls, pos1: np.ndarray, pos2: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Pozisyon kodları ve sinerji tablosu.
         
-        for i, (_, p1) in enumerate(self.squad_df.iterrows()):
-            for j, (_, p2) in enumerate(self.squad_df.iterrows()):
-                if i != j:
-                    compatibility = self.calculate_pair_compatibility(p1, p2)
-                    p1_name = p1.get('Oyuncu_Adi', p1.get('Oyuncu', f'Player_{i}'))
-                    p2_name = p2.get('Oyuncu_Adi', p2.get('Oyuncu', f'Player_{j}'))
-                    matrix.loc[p1_name, p2_name] = compatibility
+        Returns:
+            Tuple: (pos1 kodları, pos2 kodları, kod x kod sinerji tablosu)
+        """
+        codes, uniques = pd.factorize(np.concatenate([pos1, pos2]), use_na_sentinel=False)
+        index = {position: k for k, position in enumerate(uniques)}
+        table = np.full((len(uniques), len(uniques)), 0.60)
+        # Önce ters yön, sonra asıl yön yazılır: _get_position_synergy ile aynı öncelik
+        for (a, b), value in cls.POSITION_SYNERGIES.items():
+            if a in index and b in index:
+                table[index[b], index[a]] = value
+        for (a, b), value in cls.POSITION_SYNERGIES.items():
+            if a in index and b in index:
+                table[index[a], index[b]] = value
+        return codes[:len(pos1)], codes[len(pos1):], table
+    
+    @classmethod
+    def _pair_components(cls, a: Dict[str, np.ndarray], b: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        """a x b tüm çiftler için sinerji, takım eşitliği, rating ve form farkı matrisleri."""
+        codes_a, codes_b, table = cls._synergy_lookup(a['position'], b['position'])
+        
+        team_codes, _ = pd.factorize(np.concatenate([a['team'], b['team']]))
+        team_a, team_b = team_codes[:len(a['team'])], team_codes[len(a['team']):]
+        
+        return {
+            'synergy': table[codes_a[:, np.newaxis], codes_b[np.newaxis, :]],
+            # Eksik (NaN) takım hiçbir takımla eşit değildir
+            'same_team': (team_a[:, np.newaxis] == team_b[np.newaxis, :]) & (team_a[:, np.newaxis] >= 0),
+            'rating_diff': np.abs(a['rating'][:, np.newaxis] - b['rating'][np.newaxis, :]),
+            'form_diff': np.abs(a['form'][:, np.newaxis] - b['form'][np.newaxis, :]),
+        }
+    
+    @classmethod
+    def _pair_scores(cls, a: Dict[str, np.ndarray], b: Dict[str, np.ndarray],
+                     components: Optional[Dict[str, np.ndarray]] = None) -> np.ndarray:
+        """
+        a x b tüm çiftlerin uyumluluğu (calculate_pair_compatibility'nin vektörize hali).
+        """
+        c = components if components is not None else cls._pair_components(a, b)
+        
+        position_bonus = c['synergy'] * 20
+        team_bonus = np.where(c['same_team'], cls.SAME_TEAM_BONUS * 100, 0)
+        rating_bonus = np.where(c['rating_diff'] <= 5, 10, np.where(c['rating_diff'] <= 10, 5, -5))
+        form_bonus = np.where(c['form_diff'] <= 1, 8, np.where(c['form_diff'] <= 2, 4, 0))
         
-        return matrix
+        total_score = 50.0 + position_bonus + team_bonus + rating_bonus + form_bonus
+        return np.round(np.clip(total_score, 0, 100), 1)
+    
+    def _build_compatibility_matrix(self) -> pd.DataFrame:
+        """Kadroda tüm oyuncu çiftlerinin uyumluluğu matrisini oluştur."""
+        names = self._features['names']
+        return pd.DataFrame(self._scores.copy(), index=names, columns=names)
+    
+    def _upper_pairs(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Her çift bir kez (i < j), iterrows döngüsüyle aynı sırada."""
+        return np.triu_indices(len(self.squad_df), k=1)
+    
+    def _pair_names(self) -> np.ndarray:
+        """Çift listelerinde gösterilen isimler (isim sütunu yoksa 'Unknown')."""
+        if {'Oyuncu_Adi', 'Oyuncu'} & set(self.squad_df.columns):
+            return self._features['names']
+        return np.full(len(self.squad_df), 'Unknown', dtype=object)
     
     def calculate_pair_compatibility(self, player1: pd.Series, player2: pd.Series) -> float:
         """
@@ -138,34 +224,23 @@ class CompatibilityAnalyzer:
         Returns:
             List: En iyi uyumlu çiftler
         """
-        pairs = []
-        
-        for i, (_, p1) in enumerate(self.squad_df.iterrows()):
-            for _, p2 in self.squad_df.iloc[i+1:].iterrows():
-                p1_name = p1.get('Oyuncu_Adi', p1.get('Oyuncu', 'Unknown'))
-                p2_name = p2.get('Oyuncu_Adi', p2.get('Oyuncu', 'Unknown'))
-                
-                compatibility = self.calculate_pair_compatibility(p1, p2)
-                
-                pos1 = p1.get('Alt_Pozisyon', p1.get('Atanan_Pozisyon', ''))
-                pos2 = p2.get('Alt_Pozisyon', p2.get('Atanan_Pozisyon', ''))
-                
-                team1 = p1.get('Takim', p1.get('Team', ''))
-                team2 = p2.get('Takim', p2.get('Team', ''))
-                same_team = "✓ Aynı Takım" if team1 == team2 else "✗ Farklı Takım"
-                
-                pairs.append({
-                    'Oyuncu 1': p1_name,
-                    'Oyuncu 2': p2_name,
-                    'Pozisyon 1': pos1,
-                    'Pozisyon 2': pos2,
-                    'Uyumluluk': compatibility,
-                    'Takım': same_team,
-                    'Ortalama Rating': round((p1.get('Rating', 75) + p2.get('Rating', 75)) / 2, 1)
-                })
+        i, j = self._upper_pairs()
+        f = self._features
+        names = self._pair_names()
+        same_team = self._components['same_team'][i, j]
+        
+        pairs_df = pd.DataFrame({
+            'Oyuncu 1': names[i],
+            'Oyuncu 2': names[j],
+            'Pozisyon 1': f['position'][i],
+            'Pozisyon 2': f['position'][j],
+            'Uyumluluk': self._scores[i, j],
+            'Takım': np.where(same_team, "✓ Aynı Takım", "✗ Farklı Takım"),
+            'Ortalama Rating': np.round((f['rating'][i] + f['rating'][j]) / 2, 1)
+        })
         
         # Uyumluluğa göre sırala
-        pairs_df = pd.DataFrame(pairs).sort_values('Uyumluluk', ascending=False)
+        pairs_df = pairs_df.sort_values('Uyumluluk', ascending=False)
         
         return pairs_df.head(top_n).to_dict('records')
     
@@ -176,31 +251,32 @@ class CompatibilityAnalyzer:
         Returns:
             List: Zayıf uyumlu çiftler (muhtemelen problem olabilir)
         """
-        pairs = []
-        
-        for i, (_, p1) in enumerate(self.squad_df.iterrows()):
-            for _, p2 in self.squad_df.iloc[i+1:].iterrows():
-                p1_name = p1.get('Oyuncu_Adi', p1.get('Oyuncu', 'Unknown'))
-                p2_name = p2.get('Oyuncu_Adi', p2.get('Oyuncu', 'Unknown'))
-                
-                compatibility = self.calculate_pair_compatibility(p1, p2)
-                
-                pos1 = p1.get('Alt_Pozisyon', p1.get('Atanan_Pozisyon', ''))
-                pos2 = p2.get('Alt_Pozisyon', p2.get('Atanan_Pozisyon', ''))
-                
-                pairs.append({
-                    'Oyuncu 1': p1_name,
-                    'Oyuncu 2': p2_name,
-                    'Pozisyon 1': pos1,
-                    'Pozisyon 2': pos2,
-                    'Uyumluluk': compatibility,
-                    'Problem': self._identify_compatibility_issue(p1, p2)
-                })
+        i, j = self._upper_pairs()
+        f = self._features
+        names = self._pair_names()
+        
+        pairs_df = pd.DataFrame({
+            'Oyuncu 1': names[i],
+            'Oyuncu 2': names[j],
+            'Pozisyon 1': f['position'][i],
+            'Pozisyon 2': f['position'][j],
+            'Uyumluluk': self._scores[i, j],
+            '_i': i,
+            '_j': j
+        })
         
         # Uyumluluğa göre sırala (en düşük önce)
-        pairs_df = pd.DataFrame(pairs).sort_values('Uyumluluk', ascending=True)
+        pairs_df = pairs_df.sort_values('Uyumluluk', ascending=True)
+        pairs_df = pairs_df[pairs_df['Uyumluluk'] < 60].head(top_n)
+        
+        # Sebep yalnızca döndürülen çiftler için hesaplanır
+        pairs_df['Problem'] = [
+            self._identify_compatibility_issue(self.squad_df.iloc[a], self.squad_df.iloc[b])
+            for a, b in zip(pairs_df['_i'], pairs_df['_j'])
+        ]
+        pairs_df = pairs_df.drop(columns=['_i', '_j'])
         
-        return pairs_df[pairs_df['Uyumluluk'] < 60].head(top_n).to_dict('records')
+        return pairs_df.to_dict('records')
     
     def _identify_compatibility_issue(self, p1: pd.Series, p2: pd.Series) -> str:
         """Uyumsuzluğun sebebi nedir?"""
@@ -231,14 +307,8 @@ class CompatibilityAnalyzer:
             Dict: Genel takım kimyası metrikleri
         """
         # Tüm çiftlerin ortalama uyumluluğu
-        all_scores = []
-        
-        for i, (_, p1) in enumerate(self.squad_df.iterrows()):
-            for _, p2 in self.squad_df.iloc[i+1:].iterrows():
-                score = self.calculate_pair_compatibility(p1, p2)
-                all_scores.append(score)
-        
-        avg_compatibility = np.mean(all_scores) if all_scores else 0
+        i, j = self._upper_pairs()
+        avg_compatibility = self._scores[i, j].mean() if len(i) else 0
         
         # Same-team oyuncu sayısı
         pos_col = 'Alt_Pozisyon' if 'Alt_Pozisyon' in self.squad_df.columns else 'Atanan_Pozisyon'
@@ -287,6 +357,101 @@ class CompatibilityAnalyzer:
         
         return "✓ Takım kimyası iyi dengeli"
     
+    def rank_swaps(self, all_players: pd.DataFrame, player_ids: Optional[List] = None,
+                   strategy: str = 'Dengeli', exact_position: bool = False,
+                   max_cost_delta: Optional[float] = None, sort_by: str = 'Kimya_Farkı',
+                   top_n: Optional[int] = 20) -> pd.DataFrame:
+        """
+        Kadrodaki oyuncular için tüm olası takasları tek seferde puanla.
+        
+        Aday x kadro uyumluluk matrisi bir kez hesaplanır; her (çıkan, giren)
+        çifti için farklar satır toplamlarından türetilir, aday başına yeni
+        analizör kurulmaz:
+        - Uyum: Girenin kalan 10 oyuncuyla ortalama uyumluluğu
+        - Kimya_Farkı: Takımın ortalama çift uyumluluğundaki değişim
+        - Skor_Farkı: Çıkanın pozisyonundaki pozisyon skoru farkı (build_score_matrix)
+        - Fiyat_Farkı: Giren - çıkan fiyatı
+        
+        Args:
+            all_players: Aday havuzu (kadrodaki oyuncular elenir)
+            player_ids: Değiştirilecek oyuncular (varsayılan: tüm kadro)
+            strategy: Pozisyon skoru stratejisi
+            exact_position: True ise yalnızca aynı Alt_Pozisyon'daki adaylar,
+                aksi halde pozisyonu oynayabilen (POSITION_CAN_BE_FILLED_BY) tüm adaylar
+            max_cost_delta: Fiyat artışı üst sınırı (Milyon £)
+            sort_by: Sıralama sütunu (büyükten küçüğe)
+            top_n: Döndürülecek takas sayısı (None: tümü)
+            
+        Returns:
+            pd.DataFrame: Sıralı takas listesi
+        """
+        columns = ['Çıkan_ID', 'Çıkan_Oyuncu', 'Giren_ID', 'Giren_Oyuncu', 'Pozisyon',
+                   'Uyum', 'Uyum_Farkı', 'Kimya_Farkı', 'Skor_Farkı', 'Fiyat_Farkı']
+        if sort_by not in columns[5:]:
+            raise ValueError(f"Geçersiz sıralama sütunu: {sort_by}")
+        
+        squad = self.squad_df
+        n = len(squad)
+        starters = np.arange(n) if player_ids is None else np.flatnonzero(squad['ID'].isin(player_ids).to_numpy())
+        candidates = all_players[~all_players['ID'].isin(squad['ID'])]
+        if n < 2 or len(starters) == 0 or candidates.empty:
+            return pd.DataFrame(columns=columns)
+        
+        # Aday x kadro uyumlulukları ve satır toplamları
+        cand_features = self._pair_features(candidates)
+        cross = self._pair_scores(cand_features, self._features)
+        cross_sum = cross.sum(axis=1)
+        squad_sum = self._scores.sum(axis=1)
+        total_pairs = n * (n - 1) / 2
+        
+        cross = cross[:, starters]
+        rest_sum = cross_sum[:, np.newaxis] - cross
+        new_avg = rest_sum / (n - 1)
+        old_avg = squad_sum[starters] / (n - 1)
+        chemistry_delta = (rest_sum - squad_sum[starters]) / total_pairs
+        
+        # Çıkanın pozisyonunda pozisyon skorları
+        slot_col = 'Atanan_Pozisyon' if 'Atanan_Pozisyon' in squad.columns else 'Alt_Pozisyon'
+        slots = squad[slot_col].to_numpy()[starters]
+        positions = list(dict.fromkeys(slots))
+        slot_idx = np.array([positions.index(p) for p in slots])
+        cand_scores = build_score_matrix(candidates, strategy, positions).to_numpy()[:, slot_idx]
+        squad_scores = build_score_matrix(squad.iloc[starters], strategy, positions).to_numpy()
+        squad_scores = squad_scores[np.arange(len(starters)), slot_idx]
+        
+        if exact_position:
+            eligible = candidates['Alt_Pozisyon'].to_numpy()[:, np.newaxis] == self._features['position'][starters]
+        else:
+            eligible = cand_scores > INELIGIBLE_SCORE
+        
+        cand_prices = candidates['Fiyat_M'].to_numpy(dtype=float)
+        squad_prices = squad['Fiyat_M'].to_numpy(dtype=float)[starters]
+        cost_delta = cand_prices[:, np.newaxis] - squad_prices
+        if max_cost_delta is not None:
+            eligible &= cost_delta <= max_cost_delta + 1e-9
+        
+        # Uygun (giren, çıkan) çiftleri; sıra: çıkan, sonra aday havuzu sırası
+        s_idx, c_idx = np.nonzero(eligible.T)
+        out_rows = starters[s_idx]
+        names = self._pair_names()
+        cand_names = (cand_features['names'] if {'Oyuncu_Adi', 'Oyuncu'} & set(candidates.columns)
+                      else np.full(len(candidates), 'Unknown', dtype=object))
+        swaps = pd.DataFrame({
+            'Çıkan_ID': squad['ID'].to_numpy()[out_rows],
+            'Çıkan_Oyuncu': names[out_rows],
+            'Giren_ID': candidates['ID'].to_numpy()[c_idx],
+            'Giren_Oyuncu': cand_names[c_idx],
+            'Pozisyon': slots[s_idx],
+            'Uyum': np.round(new_avg[c_idx, s_idx], 1),
+            'Uyum_Farkı': np.round(new_avg[c_idx, s_idx] - old_avg[s_idx], 1),
+            'Kimya_Farkı': np.round(chemistry_delta[c_idx, s_idx], 2),
+            'Skor_Farkı': np.round(cand_scores[c_idx, s_idx] - squad_scores[s_idx], 2),
+            'Fiyat_Farkı': np.round(cost_delta[c_idx, s_idx], 1),
+        })
+        
+        swaps = swaps.sort_values(sort_by, ascending=False, kind='stable').reset_index(drop=True)
+        return swaps if top_n is None else swaps.head(top_n)
+    
     def suggest_swap(self, problem_player_id: str, all_players: pd.DataFrame) -> Optional[Dict]:
         """
         Problemli oyuncu için en iyi alternatifi öner.
@@ -298,59 +463,50 @@ class CompatibilityAnalyzer:
         Returns:
             Dict: Önerilen takas
         """
-        problem_player = self.squad_df[self.squad_df['ID'] == problem_player_id]
+        problem_mask = (self.squad_df['ID'] == problem_player_id).to_numpy()
         
-        if problem_player.empty:
+        if not problem_mask.any():
             return None
         
-        problem_player = problem_player.iloc[0]
-        problem_pos = problem_player.get('Alt_Pozisyon', problem_player.get('Atanan_Pozisyon', ''))
-        
-        # Aynı pozisyonda diğer oyuncuları ara
-        pos_col = 'Alt_Pozisyon' if 'Alt_Pozisyon' in all_players.columns else 'Atanan_Pozisyon'
-        candidates = all_players[
-            (all_players[pos_col] == problem_pos) &
-            (all_players['ID'] != problem_player_id)
-        ].copy()
+        # Aynı pozisyondaki adaylar, kalan kadroyla ortalama uyuma göre
+        swaps = self.rank_swaps(all_players, [problem_player_id], exact_position=True,
+                                sort_by='Uyum', top_n=1)
         
-        if candidates.empty:
-            return None
-        
-        # En iyi adayları score'la
-        best_candidates = []
-        for _, candidate in candidates.iterrows():
-            # Bu adayın kadraya katkısı ne olur?
-            temp_squad = self.squad_df.copy()
-            temp_squad = temp_squad[temp_squad['ID'] != problem_player_id]
-            
-            compat_score = 0
-            for _, existing in temp_squad.iterrows():
-                compat = CompatibilityAnalyzer(pd.DataFrame([candidate])).calculate_pair_compatibility(candidate, existing)
-                compat_score += compat
-            
-            avg_compat = compat_score / len(temp_squad) if len(temp_squad) > 0 else 0
-            
-            best_candidates.append({
-                'candidate_name': candidate.get('Oyuncu_Adi', candidate.get('Oyuncu', 'Unknown')),
-                'rating': candidate.get('Rating', 0),
-                'avg_compatibility': round(avg_compat, 1),
-                'price': candidate.get('Fiyat_M', 0),
-                'form': candidate.get('Form', 0)
-            })
-        
-        if not best_candidates:
+        if swaps.empty:
             return None
         
-        best = sorted(best_candidates, key=lambda x: x['avg_compatibility'], reverse=True)[0]
+        best = swaps.iloc[0]
+        i = np.flatnonzero(problem_mask)[0]
+        problem_compat = (self._scores[i].sum() + self._self_scores[i]) / len(self.squad_df)
         
         return {
-            'problem_oyuncu': problem_player.get('Oyuncu_Adi', problem_player.get('Oyuncu', 'Unknown')),
-            'problem_uyumluluk': round(
-                sum([self.calculate_pair_compatibility(problem_player, p) for _, p in self.squad_df.iterrows()]) / len(self.squad_df),
-                1
-            ),
-            'önerilen_oyuncu': best['candidate_name'],
-            'önerilen_uyumluluk': best['avg_compatibility'],
-            'fiyat_farkı': round(best['price'] - problem_player.get('Fiyat_M', 0), 1),
-            'neden': f"Kadraya daha iyi uyum sağlar ({best['avg_compatibility']} uyumluluk)"
+            'problem_oyuncu': self._pair_names()[i],
+            'problem_uyumluluk': round(float(problem_compat), 1),
+            'önerilen_oyuncu': best['Giren_Oyuncu'],
+            'önerilen_uyumluluk': float(best['Uyum']),
+            'fiyat_farkı': float(best['Fiyat_Farkı']),
+            'neden': f"Kadraya daha iyi uyum sağlar ({best['Uyum']} uyumluluk)"
         }
+
+
+def pair_compatibility_matrix(df_a: pd.DataFrame, df_b: Optional[pd.DataFrame] = None) -> np.ndarray:
+    """
+    İki oyuncu kümesi arasındaki tüm çiftlerin uyumluluğu (0-100).
+    
+    Optimizasyon ve takas motorları için CompatibilityAnalyzer ile aynı
+    skorlamayı DataFrame kurmadan döndürür.
+    
+    Args:
+        df_a: Satır oyuncuları
+        df_b: Sütun oyuncuları (verilmezse df_a; köşegen 0 olur)
+        
+    Returns:
+        np.ndarray: (len(df_a), len(df_b)) uyumluluk matrisi
+    """
+    features_a = CompatibilityAnalyzer._pair_features(df_a)
+    if df_b is None:
+        scores = CompatibilityAnalyzer._pair_scores(features_a, features_a)
+        np.fill_diagonal(scores, 0.0)
+        return scores
+    features_b = CompatibilityAnalyzer._pair_features(df_b)
+    return CompatibilityAnalyzer._pair_scores(features_a, features_b)
@@ -296,6 +296,22 @@ POSITION_PRICE_MULTIPLIER = {
     'LW': 1.2, 'RW': 1.2, 'ST': 1.3
 }
 
+# Pozisyon bazlı ofansif eğilim (0-1 arası) - Ofans_Gucu hesabında kullanılır
+OFFENSE_TENDENCY = {
+    'GK': 0.1,
+    'CB': 0.25, 'LB': 0.4, 'RB': 0.4,
+    'DM': 0.45, 'CM': 0.55, 'CAM': 0.8, 'LM': 0.65, 'RM': 0.65,
+    'LW': 0.85, 'RW': 0.85, 'ST': 0.95
+}
+
+# Pozisyon bazlı defansif eğilim (0-1 arası) - Defans_Gucu hesabında kullanılır
+DEFENSE_TENDENCY = {
+    'GK': 0.95,
+    'CB': 0.9, 'LB': 0.75, 'RB': 0.75,
+    'DM': 0.7, 'CM': 0.5, 'CAM': 0.3, 'LM': 0.4, 'RM': 0.4,
+    'LW': 0.2, 'RW': 0.2, 'ST': 0.15
+}
+
 # =============================================================================
 # UI AYARLARI
 # =============================================================================
@@ -341,6 +357,59 @@ PREMIER_LEAGUE_TEAMS = [
 # Sakatlık oranı (rastgele atama için)
 INJURY_PROBABILITY = 0.08
 
+# FPL oyuncu durumu -> oynama olasılığı (chance_of_playing_next_round boşsa)
+# a: müsait, d: şüpheli, i: sakat, s: cezalı, u: kadro dışı, n: uygun değil (kiralık)
+AVAILABILITY_STATUS_PROBABILITY = {
+    'a': 1.0, 'd': 0.5, 'i': 0.0, 's': 0.0, 'u': 0.0, 'n': 0.0
+}
+
+# =============================================================================
+# SENTETİK VERİ AYARLARI (ÖLÇEK TESTLERİ İÇİN)
+# =============================================================================
+
+# Alt pozisyon dağılımı - FC26 Premier League verisindeki oranlardan alınmıştır
+SYNTHETIC_POSITION_DISTRIBUTION = {
+    'GK': 0.117,
+    'CB': 0.187, 'LB': 0.079, 'RB': 0.086,
+    'DM': 0.115, 'CM': 0.083, 'CAM': 0.058, 'LM': 0.045, 'RM': 0.050,
+    'LW': 0.029, 'RW': 0.041, 'ST': 0.110
+}
+
+# Bir kulübün ortalama kadro büyüklüğü (sentetik takım sayısı buna göre belirlenir)
+SYNTHETIC_SQUAD_SIZE = 28
+
+# Ana grup bazında 90 dakika başına ortalama istatistikler
+# (playerstats_2025.csv'deki sezon toplamlarından türetilmiştir)
+# Anahtarlar CSV_COLUMN_MAPPING'deki iç isimlerdir -> stat_<isim> sütunları
+SYNTHETIC_STAT_RATES_PER_90 = {
+    'xG':               {'GK': 0.0,   'DEF': 0.055, 'MID': 0.13,  'FWD': 0.32},
+    'xA':               {'GK': 0.003, 'DEF': 0.06,  'MID': 0.11,  'FWD': 0.09},
+    'goals':            {'GK': 0.0,   'DEF': 0.045, 'MID': 0.15,  'FWD': 0.30},
+    'assists':          {'GK': 0.006, 'DEF': 0.085, 'MID': 0.17,  'FWD': 0.13},
+    'clean_sheets':     {'GK': 0.26,  'DEF': 0.28,  'MID': 0.29,  'FWD': 0.36},
+    'goals_conceded':   {'GK': 1.4,   'DEF': 1.5,   'MID': 1.36,  'FWD': 1.25},
+    'own_goals':        {'GK': 0.006, 'DEF': 0.011, 'MID': 0.002, 'FWD': 0.0},
+    'penalties_saved':  {'GK': 0.025, 'DEF': 0.0,   'MID': 0.0,   'FWD': 0.0},
+    'penalties_missed': {'GK': 0.0,   'DEF': 0.0,   'MID': 0.004, 'FWD': 0.005},
+    'yellow_cards':     {'GK': 0.07,  'DEF': 0.18,  'MID': 0.21,  'FWD': 0.11},
+    'red_cards':        {'GK': 0.006, 'DEF': 0.01,  'MID': 0.005, 'FWD': 0.003},
+    'saves':            {'GK': 2.8,   'DEF': 0.0,   'MID': 0.0,   'FWD': 0.0},
+    'bonus':            {'GK': 0.16,  'DEF': 0.23,  'MID': 0.30,  'FWD': 0.47},
+    'bps':              {'GK': 14.5,  'DEF': 14.5,  'MID': 18.0,  'FWD': 17.6},
+    'influence':        {'GK': 23.0,  'DEF': 21.0,  'MID': 18.8,  'FWD': 18.8},
+    'creativity':       {'GK': 0.6,   'DEF': 9.0,   'MID': 18.4,  'FWD': 16.5},
+    'threat':           {'GK': 0.0,   'DEF': 7.0,   'MID': 13.2,  'FWD': 25.7},
+    'tackles':          {'GK': 0.04,  'DEF': 1.8,   'MID': 1.9,   'FWD': 1.0},
+    'recoveries':       {'GK': 8.4,   'DEF': 3.7,   'MID': 4.3,   'FWD': 2.8},
+}
+
+# Tam sayı olarak üretilecek (Poisson) istatistikler; diğerleri sürekli değerdir
+SYNTHETIC_COUNT_STATS = [
+    'goals', 'assists', 'clean_sheets', 'goals_conceded', 'own_goals',
+    'penalties_saved', 'penalties_missed', 'yellow_cards', 'red_cards',
+    'saves', 'bonus', 'bps', 'tackles', 'recoveries'
+]
+
 # =============================================================================
 # YENİ İSTATİSTİK VERİSİ AYARLARI
 # =============================================================================
@@ -9,6 +9,8 @@ Bu modül, oyundan çekilen veriyi işler:
 - Alt pozisyonları (Sub_Pos) kullanır
 - Min-Max Normalizasyon uygular
 - GitHub'dan alınan GERÇEK İSTATİSTİKLERİ (xG, xA, vb.) entegre eder
+- FPL durum verisinden (status, chance_of_playing_next_round, news)
+  oynama olasılığı ve sakatlık bilgisini türetir
 
 ALT POZİSYONLAR:
 - GK: Kaleci
@@ -30,7 +32,14 @@ from .config import (
     PREMIER_LEAGUE_TEAMS,
     MARKET_VALUE_FILE,
     CSV_COLUMN_MAPPING,
-    POSITIONAL_WEIGHTS
+    AVAILABILITY_STATUS_PROBABILITY,
+    POSITIONAL_WEIGHTS,
+    OFFENSE_TENDENCY,
+    DEFENSE_TENDENCY,
+    SYNTHETIC_POSITION_DISTRIBUTION,
+    SYNTHETIC_SQUAD_SIZE,
+    SYNTHETIC_STAT_RATES_PER_90,
+    SYNTHETIC_COUNT_STATS
 )
 
 
@@ -342,12 +351,7 @@ def load_fc26_data(csv_path: str = None) -> pd.DataFrame:
         sub_pos = row['Alt_Pozisyon']
         
         # Pozisyon bazlı ofansif eğilim (0-1 arası)
-        offense_tendency = {
-            'GK': 0.1,
-            'CB': 0.25, 'LB': 0.4, 'RB': 0.4,
-            'DM': 0.45, 'CM': 0.55, 'CAM': 0.8, 'LM': 0.65, 'RM': 0.65,
-            'LW': 0.85, 'RW': 0.85, 'ST': 0.95
-        }.get(sub_pos, 0.5)
+        offense_tendency = OFFENSE_TENDENCY.get(sub_pos, 0.5)
         
         # Rating'den baz ofans puanı
         base_offense = (rating - 60) * (100 / 31) * offense_tendency
@@ -378,12 +382,7 @@ def load_fc26_data(csv_path: str = None) -> pd.DataFrame:
         sub_pos = row['Alt_Pozisyon']
         
         # Pozisyon bazlı defansif eğilim (0-1 arası)
-        defense_tendency = {
-            'GK': 0.95,
-            'CB': 0.9, 'LB': 0.75, 'RB': 0.75,
-            'DM': 0.7, 'CM': 0.5, 'CAM': 0.3, 'LM': 0.4, 'RM': 0.4,
-            'LW': 0.2, 'RW': 0.2, 'ST': 0.15
-        }.get(sub_pos, 0.5)
+        defense_tendency = DEFENSE_TENDENCY.get(sub_pos, 0.5)
         
         # Rating'den baz defans puanı
         base_defense = (rating - 60) * (100 / 31) * defense_tendency
@@ -405,9 +404,12 @@ def load_fc26_data(csv_path: str = None) -> pd.DataFrame:
     # SAKATLIK DURUMU
     # ==========================================================================
     
-    # Rastgele sakatlık ataması kaldırıldı - tüm oyuncular sağlıklı kabul edilir
-    # İleride gerçek sakatlık verisi eklenirse burası güncellenebilir
+    # Rastgele sakatlık ataması kaldırıldı - varsayılan olarak herkes müsait;
+    # gerçek durum verisi istatistik birleştirmesinde yazılır
     df['Sakatlik'] = 0
+    df['Durum_Kodu'] = 'a'
+    df['Oynama_Olasiligi'] = 1.0
+    df['Haber'] = ''
     
     # ==========================================================================
     # GERÇEK SEZON İSTATİSTİKLERİNİ YÜKLE VE BİRLEŞTİR
@@ -418,6 +420,9 @@ def load_fc26_data(csv_path: str = None) -> pd.DataFrame:
     if stats_df is not None:
         df = merge_stats_data(df, stats_df)
         
+    # Yalnızca sakat ('i') oyuncular kadro dışı; diğer belirsizlikler olasılıkta
+    df['Sakatlik'] = (df['Durum_Kodu'] == 'i').astype(int)
+        
     # ==========================================================================
     # GERÇEK PİYASA DEĞERLERİNİ YÜKLE VE BİRLEŞTİR
     # ==========================================================================
@@ -438,7 +443,8 @@ def load_fc26_data(csv_path: str = None) -> pd.DataFrame:
     # Gerekli ana sütunları seç (stat sütunlarını koru)
     core_columns = [
         'ID', 'Oyuncu', 'Alt_Pozisyon', 'Mevki', 'Takim', 
-        'Rating', 'Fiyat_M', 'Form', 'Ofans_Gucu', 'Defans_Gucu', 'Sakatlik'
+        'Rating', 'Fiyat_M', 'Form', 'Ofans_Gucu', 'Defans_Gucu', 'Sakatlik',
+        'Durum_Kodu', 'Oynama_Olasiligi', 'Haber'
     ]
     
     # Stat sütunları: "stat_" ile başlayanlar
@@ -468,6 +474,19 @@ def load_real_stats_data() -> Optional[pd.DataFrame]:
         return None
 
 
+def availability_probability(status, chance) -> float:
+    """
+    FPL durum kodu ve chance_of_playing_next_round (0-100) değerinden
+    bir sonraki maçta oynama olasılığı (0-1).
+    
+    chance doluysa doğrudan kullanılır; boşsa (haber yok) durum koduna göre
+    AVAILABILITY_STATUS_PROBABILITY tablosundan alınır.
+    """
+    if pd.notna(chance):
+        return float(np.clip(float(chance) / 100.0, 0.0, 1.0))
+    return AVAILABILITY_STATUS_PROBABILITY.get(str(status), 1.0)
+
+
 def merge_stats_data(fc26_df: pd.DataFrame, stats_df: pd.DataFrame) -> pd.DataFrame:
     """
     Oyun veri seti ile gerçek istatistikleri oyuncu ismine göre birleştirir.
@@ -607,6 +626,15 @@ def merge_stats_data(fc26_df: pd.DataFrame, stats_df: pd.DataFrame) -> pd.DataFr
     # Eşleşen verileri yeni sütunlara yaz
     for internal_name in mapped_stats.keys():
         fc26_df[f'stat_{internal_name}'] = 0.0
+    
+    # Müsaitlik: oyuncunun (FPL id) en son haftadaki durum satırı
+    has_availability = {'id', 'status'} <= set(stats_df.columns)
+    if has_availability:
+        ordered = stats_df.sort_values('gw', kind='stable') if 'gw' in stats_df.columns else stats_df
+        latest = ordered.groupby('id').tail(1).set_index('id')
+        for col, default in [('Durum_Kodu', 'a'), ('Oynama_Olasiligi', 1.0), ('Haber', '')]:
+            if col not in fc26_df.columns:
+                fc26_df[col] = default
 
     matches_found = 0
     
@@ -618,6 +646,15 @@ def merge_stats_data(fc26_df: pd.DataFrame, stats_df: pd.DataFrame) -> pd.DataFr
             for internal_name, csv_col in mapped_stats.items():
                 if csv_col in match_row:
                     fc26_df.at[idx, f'stat_{internal_name}'] = float(match_row[csv_col])
+            
+            if has_availability and match_row['id'] in latest.index:
+                current = latest.loc[match_row['id']]
+                fc26_df.at[idx, 'Durum_Kodu'] = str(current['status'])
+                fc26_df.at[idx, 'Oynama_Olasiligi'] = availability_probability(
+                    current['status'], current.get('chance_of_playing_next_round')
+                )
+                news = current.get('news')
+                fc26_df.at[idx, 'Haber'] = '' if pd.isna(news) else str(news)
     
     print(f"Toplam {len(fc26_df)} oyuncudan {matches_found} tanesi gerçek verilerle eşleştirildi.")
     
@@ -759,6 +796,168 @@ def load_premier_league_data(csv_path: str = None) -> pd.DataFrame:
     return load_fc26_data(csv_path)
 
 
-def create_dummy_dataset(n_players: int = 60) -> pd.DataFrame:
-    """Eski fonksiyon - geriye uyumluluk için"""
-    return load_fc26_data()
+def create_dummy_dataset(n_players: int = 60, seed: int = 42) -> pd.DataFrame:
+    """Eski fonksiyon - artık gerçekten n_players boyutunda sentetik veri üretir"""
+    return generate_synthetic_players(n_players, seed=seed)
+
+
+def generate_synthetic_players(
+    n_players: int = 1000,
+    seed: int = 42,
+    n_teams: Optional[int] = None,
+    injury_rate: float = 0.0
+) -> pd.DataFrame:
+    """
+    load_fc26_data() ile aynı şemada sentetik oyuncu tablosu üretir.
+    
+    Ölçek testleri (optimizer, analizörler, UI) için 100 - 1.000.000 oyuncu
+    arası boyutlarda kullanılır. Tüm hesaplamalar vektörizedir; satır bazlı
+    apply/iterrows yoktur.
+    
+    - Alt pozisyonlar SYNTHETIC_POSITION_DISTRIBUTION oranlarıyla dağıtılır
+      ve her pozisyon takımlara sırayla (round-robin) paylaştırılır; böylece
+      her kulüp benzer bir pozisyon dengesine sahip olur.
+    - Fiyat, Form, Ofans ve Defans, load_fc26_data() içindeki Rating bazlı
+      formüllerin vektörize karşılıklarıyla hesaplanır.
+    - stat_* sütunları dakika ve ana gruba göre SYNTHETIC_STAT_RATES_PER_90
+      değerlerinden üretilir.
+    
+    Args:
+        n_players: Üretilecek oyuncu sayısı
+        seed: Rastgelelik tohumu (aynı tohum = aynı veri)
+        n_teams: Takım sayısı (varsayılan: n_players / SYNTHETIC_SQUAD_SIZE,
+            en az Premier League takım sayısı kadar)
+        injury_rate: Sakat işaretlenecek oyuncu oranı (varsayılan 0)
+        
+    Returns:
+        pd.DataFrame: ID, Oyuncu, Alt_Pozisyon, Mevki, Takim, Rating, Fiyat_M,
+        Form, Ofans_Gucu, Defans_Gucu, Sakatlik, Durum_Kodu, Oynama_Olasiligi,
+        Haber ve stat_* sütunları
+    """
+    if n_players < 1:
+        raise ValueError(f"Geçersiz oyuncu sayısı: {n_players}")
+    
+    rng = np.random.default_rng(seed)
+    
+    # ==========================================================================
+    # POZİSYON VE TAKIM ATAMASI
+    # ==========================================================================
+    
+    positions = np.array(list(SYNTHETIC_POSITION_DISTRIBUTION.keys()))
+    probs = np.array(list(SYNTHETIC_POSITION_DISTRIBUTION.values()))
+    probs = probs / probs.sum()
+    
+    pos_idx = np.sort(rng.choice(len(positions), size=n_players, p=probs))
+    
+    if n_teams is None:
+        n_teams = max(len(PREMIER_LEAGUE_TEAMS), int(np.ceil(n_players / SYNTHETIC_SQUAD_SIZE)))
+    team_names = PREMIER_LEAGUE_TEAMS[:n_teams] + [
+        f"Sentetik Kulüp {i:05d}" for i in range(1, n_teams - len(PREMIER_LEAGUE_TEAMS) + 1)
+    ]
+    
+    # Pozisyona göre sıralı oyuncuları takımlara sırayla dağıt
+    team_idx = np.arange(n_players) % n_teams
+    
+    # Satırları karıştır (pozisyon sıralaması veri setinde görünmesin)
+    order = rng.permutation(n_players)
+    pos_idx = pos_idx[order]
+    team_idx = team_idx[order]
+    
+    sub_pos = positions[pos_idx]
+    groups = np.array([SUB_POS_TO_GROUP[p] for p in positions])[pos_idx]
+    
+    # ==========================================================================
+    # RATING VE TÜRETİLMİŞ METRİKLER
+    # ==========================================================================
+    
+    rating = np.clip(np.rint(rng.normal(76.0, 6.25, n_players)), 50, 94)
+    
+    # Fiyat: load_fc26_data() içindeki kademeli formül
+    base_price = np.select(
+        [rating >= 90, rating >= 85, rating >= 80, rating >= 75, rating >= 70],
+        [80 + (rating - 90) * 15, 45 + (rating - 85) * 7, 20 + (rating - 80) * 5,
+         8 + (rating - 75) * 2.4, 3 + (rating - 70) * 1],
+        default=1 + (rating - 60) * 0.2
+    )
+    price_mult = np.array([POSITION_PRICE_MULTIPLIER.get(p, 1.0) for p in positions])[pos_idx]
+    price = base_price * price_mult * rng.uniform(0.9, 1.1, n_players)
+    price = np.round(np.clip(price, 1.0, 200.0), 1)
+    
+    # Form: Rating 60-91 -> 50-100, ±10 varyasyon
+    form = 50 + (rating - 60) * (50 / 31) + rng.integers(-10, 10, n_players)
+    form = np.round(np.clip(form, 40, 100), 0)
+    
+    # Ofans / Defans: pozisyon eğilimi + Rating, ±8 varyasyon
+    off_t = np.array([OFFENSE_TENDENCY.get(p, 0.5) for p in positions])[pos_idx]
+    offense = np.maximum(15 + off_t * 20, (rating - 60) * (100 / 31) * off_t)
+    offense = np.round(np.clip(offense + rng.integers(-8, 8, n_players), 10, 98), 0)
+    
+    def_t = np.array([DEFENSE_TENDENCY.get(p, 0.5) for p in positions])[pos_idx]
+    defense = np.maximum(10 + def_t * 25, (rating - 60) * (100 / 31) * def_t)
+    defense = np.round(np.clip(defense + rng.integers(-8, 8, n_players), 10, 95), 0)
+    
+    injured = (rng.random(n_players) < injury_rate).astype(int)
+    
+    df = pd.DataFrame({
+        'ID': np.arange(1, n_players + 1),
+        'Oyuncu': pd.Series(np.arange(1, n_players + 1)).map('Oyuncu {:07d}'.format),
+        'Alt_Pozisyon': sub_pos,
+        'Mevki': groups,
+        'Takim': np.array(team_names)[team_idx],
+        'Rating': rating.astype(int),
+        'Fiyat_M': price,
+        'Form': form,
+        'Ofans_Gucu': offense,
+        'Defans_Gucu': defense,
+        'Sakatlik': injured,
+        'Durum_Kodu': np.where(injured == 1, 'i', 'a'),
+        'Oynama_Olasiligi': 1.0 - injured,
+        'Haber': ''
+    })
+    
+    # ==========================================================================
+    # İSTATİSTİK SÜTUNLARI (stat_*)
+    # ==========================================================================
+    
+    # Oynanan dakika: yüksek rating = daha çok süre, %10 hiç oynamamış
+    minutes = rng.uniform(0, 900, n_players) * (0.5 + (rating - 50) / 88)
+    minutes[rng.random(n_players) < 0.10] = 0
+    minutes = np.round(minutes)
+    nineties = minutes / 90
+    
+    # Kalite çarpanı: Rating 60 -> 0.6, Rating 90 -> 1.4
+    quality = np.clip(0.6 + (rating - 60) / 30 * 0.8, 0.3, 1.6)
+    group_names = ['GK', 'DEF', 'MID', 'FWD']
+    group_idx = pd.Categorical(groups, categories=group_names).codes
+    
+    for stat in CSV_COLUMN_MAPPING:
+        if stat in ['Player', 'Team']:
+            continue
+        
+        if stat == 'minutes':
+            values = minutes
+        elif stat == 'starts':
+            values = np.floor(minutes / 85)
+        elif stat == 'ict_index':
+            continue  # influence/creativity/threat'ten türetilir (aşağıda)
+        else:
+            rates = np.array([SYNTHETIC_STAT_RATES_PER_90[stat][g] for g in group_names])[group_idx]
+            # Takım bazlı metrikler (yenilen gol, gol yememe) oyuncu kalitesiyle ölçeklenmez
+            scale = 1.0 if stat in ['goals_conceded', 'clean_sheets'] else quality
+            expected = rates * nineties * scale
+            
+            if stat in SYNTHETIC_COUNT_STATS:
+                values = rng.poisson(expected)
+            else:
+                values = np.round(expected * rng.lognormal(0.0, 0.3, n_players), 2)
+        
+        df[f'stat_{stat}'] = values.astype(np.float32)
+    
+    if 'ict_index' in CSV_COLUMN_MAPPING:
+        df['stat_ict_index'] = np.round(
+            (df['stat_influence'] + df['stat_creativity'] + df['stat_threat']) / 10, 1
+        ).astype(np.float32)
+    
+    # load_fc26_data() ile aynı sütun sırası
+    stat_cols = [f'stat_{k}' for k in CSV_COLUMN_MAPPING if k not in ['Player', 'Team']]
+    return df[[c for c in df.columns if not c.startswith('stat_')] + stat_cols]
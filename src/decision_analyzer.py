@@ -17,7 +17,89 @@ Bu modül:
 
 import pandas as pd
 import numpy as np
-from typing import Dict, List, Tuple
+from typing import Dict, Iterable, List, Tuple, Union
+
+
+# Ağırlıklı skor parametreleri ve sözlükte eksikse kullanılan varsayılanlar
+SCORE_WEIGHT_KEYS = ['rating', 'form', 'offense', 'defense', 'cost_penalty']
+DEFAULT_SCORE_WEIGHTS = {'rating': 0.25, 'form': 0.20, 'offense': 0.20, 'defense': 0.20, 'cost_penalty': 0.15}
+
+
+def squad_aggregates(squad_df: pd.DataFrame) -> np.ndarray:
+    """
+    Ağırlıklı skor için kadro özetleri (ağırlıktan bağımsız, bir kez hesaplanır).
+    
+    Returns:
+        np.ndarray: [ort. rating/100, ort. form/100, ort. ofans/100, ort. defans/100, toplam maliyet]
+    """
+    return np.array([
+        squad_df['Rating'].mean() / 100,
+        squad_df['Form'].mean() / 100,
+        squad_df['Ofans_Gucu'].mean() / 100,
+        squad_df['Defans_Gucu'].mean() / 100,
+        squad_df['Fiyat_M'].sum(),
+    ])
+
+
+def weights_to_matrix(weights: Union[Dict[str, float], Iterable[Dict[str, float]], pd.DataFrame]) -> np.ndarray:
+    """
+    Ağırlık sözlük(ler)ini (n, 5) matrise çevirir (sütunlar SCORE_WEIGHT_KEYS sırasında).
+    Eksik anahtarlar için DEFAULT_SCORE_WEIGHTS kullanılır.
+    """
+    if isinstance(weights, pd.DataFrame):
+        return np.column_stack([
+            weights[key].to_numpy(dtype=float) if key in weights.columns
+            else np.full(len(weights), DEFAULT_SCORE_WEIGHTS[key])
+            for key in SCORE_WEIGHT_KEYS
+        ])
+    if isinstance(weights, dict):
+        weights = [weights]
+    return np.array([
+        [w.get(key, DEFAULT_SCORE_WEIGHTS[key]) for key in SCORE_WEIGHT_KEYS]
+        for w in weights
+    ], dtype=float).reshape(-1, len(SCORE_WEIGHT_KEYS))
+
+
+def calculate_weighted_scores(
+    squads: Union[pd.DataFrame, List[pd.DataFrame], np.ndarray],
+    weight_matrix: Union[np.ndarray, Iterable[Dict[str, float]], pd.DataFrame]
+) -> np.ndarray:
+    """
+    calculate_weighted_score'un toplu (vektörize) hali.
+    
+    Kadro özetleri bir kez hesaplanır; tüm ağırlık vektörleri tek bir
+    matris çarpımıyla skorlanır.
+    
+    Args:
+        squads: Tek kadro DataFrame'i, kadro listesi veya squad_aggregates()
+            satırlarından oluşan (m, 5) matris
+        weight_matrix: (k, 5) ağırlık matrisi (SCORE_WEIGHT_KEYS sırası),
+            ağırlık sözlükleri listesi veya ağırlık sütunlu DataFrame
+        
+    Returns:
+        np.ndarray: Tek kadro için (k,), çoklu kadro için (m, k) skorlar (0-100)
+    """
+    single = isinstance(squads, pd.DataFrame)
+    if single:
+        aggregates = squad_aggregates(squads)[np.newaxis, :]
+    elif isinstance(squads, np.ndarray):
+        aggregates = np.atleast_2d(squads)
+    else:
+        aggregates = np.array([squad_aggregates(squad) for squad in squads]).reshape(-1, len(SCORE_WEIGHT_KEYS))
+    
+    if not isinstance(weight_matrix, np.ndarray):
+        weight_matrix = weights_to_matrix(weight_matrix)
+    weight_matrix = np.atleast_2d(weight_matrix)
+    
+    # (m, 4) @ (4, k) -> (m, k)
+    subtotal = aggregates[:, :4] @ weight_matrix[:, :4].T
+    
+    # Maliyeti düşün (daha az maliyet = daha iyi), referans 1000M, minimum çarpan 0.85
+    cost_factor = np.maximum(0.85, 1 - np.outer(aggregates[:, 4] / 1000, weight_matrix[:, 4]))
+    
+    # Boş kadronun ortalamaları NaN'dır; bu durumda skor 0 kabul edilir
+    scores = np.clip(np.nan_to_num((subtotal / 0.85) * 100 * cost_factor, nan=0.0), 0, 100)
+    return scores[0] if single else scores
 
 
 def calculate_weighted_score(squad_df: pd.DataFrame, 
@@ -32,23 +114,7 @@ def calculate_weighted_score(squad_df: pd.DataFrame,
     Returns:
         float: 0-100 arası skor
     """
-    score_components = {
-        'rating': (squad_df['Rating'].mean() / 100) * weights.get('rating', 0.25),
-        'form': (squad_df['Form'].mean() / 100) * weights.get('form', 0.20),
-        'offense': (squad_df['Ofans_Gucu'].mean() / 100) * weights.get('offense', 0.20),
-        'defense': (squad_df['Defans_Gucu'].mean() / 100) * weights.get('defense', 0.20),
-    }
-    
-    subtotal = sum(score_components.values())
-    
-    # Maliyeti düşün (daha az maliyet = daha iyi)
-    total_cost = squad_df['Fiyat_M'].sum()
-    # Toplam kadro maliyeti için referans değer artırıldı (200M -> 1000M)
-    cost_factor = 1 - (total_cost / 1000) * weights.get('cost_penalty', 0.15)
-    cost_factor = max(0.85, cost_factor)  # Minimum çarpan yükseltildi (0.5 -> 0.85)
-    
-    final_score = (subtotal / 0.85) * 100 * cost_factor
-    return min(100, max(0, final_score))
+    return float(calculate_weighted_scores(squad_df, weights_to_matrix(weights))[0])
 
 
 def calculate_squad_metrics(squad_df: pd.DataFrame) -> Dict:
@@ -14,20 +14,51 @@ Bu modül:
 2. SHAP benzeri katkı analizi
 3. Feature importance per oyuncu
 4. Alternatif açıklamalar (neden o değil, bu?)
+5. Optimizer dual değerleri (bütçe gölge fiyatı, pozisyon marjinal
+   değerleri, indirgenmiş maliyetler - LineupModel.lp_duals)
+6. Karşı-olgusal sorgular: bir oyuncunun kadroya girmesi için gereken en
+   küçük skor artışı / fiyat indirimi (CounterfactualExplainer)
+7. Kadro farkları: çıkan-giren oyuncuların pozisyona göre optimal
+   eşleştirilmesi ve skor/maliyet farkının takaslara dağıtılması
+   (LineupDiffEngine - ID dizileri üzerinde, toplu senaryo desteğiyle)
 =============================================================================
 """
 
+import os
+from concurrent.futures import ThreadPoolExecutor
+
 import pandas as pd
 import numpy as np
 from typing import Dict, List, Tuple, Optional
 
+from scipy.optimize import linear_sum_assignment
+
+from .config import POSITION_CAN_BE_FILLED_BY, SUB_POS_TO_GROUP
+from .optimizer import LineupModel, build_score_matrix
+
+
+# Oyuncuyu kadroya zorlamak için skor bonusu (skorlar 0-100 aralığında)
+FORCE_BONUS = 1e4
+
 
 class SquadExplainer:
     """Kadroya ilişkin kararları açıklar."""
     
-    def __init__(self, squad_df: pd.DataFrame, all_players: pd.DataFrame):
+    def __init__(self, squad_df: pd.DataFrame, all_players: pd.DataFrame,
+                 duals: Optional[Dict] = None):
+        """
+        Args:
+            squad_df: Seçilen kadro
+            all_players: Oyuncu havuzu
+            duals: LineupModel.lp_duals / lineup_duals çıktısı (opsiyonel);
+                verilirse açıklamalar optimizer'ın amaç fonksiyonuna dayanır
+        """
         self.squad_df = squad_df
         self.all_players = all_players
+        self.duals = duals
+        self._dual_rows = (
+            duals['oyuncular'].drop_duplicates('ID').set_index('ID') if duals is not None else None
+        )
         
         # Oyuncu çiftleri
         self.player_pairs = self._analyze_player_pairs()
@@ -57,15 +88,89 @@ class SquadExplainer:
             'metrikleri': self._get_player_metrics(player),
             'rakipleri': self._get_alternatives(player, pos, top_n=3),
             'puan_katkisi': self._calculate_player_contribution(player),
-            'risk_faktoru': self._assess_player_risk(player)
+            'risk_faktoru': self._assess_player_risk(player),
+            'optimizer': self._get_optimizer_values(player)
         }
         
         return explanation
     
+    def _get_optimizer_values(self, player: pd.Series) -> Optional[Dict]:
+        """Oyuncunun LP dual değerleri (duals verilmemişse None)."""
+        if self._dual_rows is None or player.get('ID') not in self._dual_rows.index:
+            return None
+        row = self._dual_rows.loc[player.get('ID')]
+        position = player.get('Atanan_Pozisyon', row['Pozisyon'])
+        if position not in self.duals['pozisyon_marjinal']:
+            position = row['Pozisyon']
+        return {
+            'marjinal_deger': round(float(row['Marjinal_Değer']), 3),
+            'pozisyon': position,
+            'pozisyon_marjinal': round(float(self.duals['pozisyon_marjinal'][position]), 3),
+            'indirgenmis_maliyet': round(float(row['İndirgenmiş_Maliyet']), 3),
+            'butce_golge_fiyati': round(self.duals['butce_golge_fiyati'], 4)
+        }
+    
+    def optimizer_summary(self) -> Optional[Dict]:
+        """
+        Modelin dual değerlerinden kadro geneli özet.
+        
+        Returns:
+            Dict: lp_skoru, tam_sayi, butce_golge_fiyati, butce_bagliyor,
+                pozisyon_marjinal (azalan sırada) - duals yoksa None
+        """
+        if self.duals is None:
+            return None
+        shadow = self.duals['butce_golge_fiyati']
+        return {
+            'lp_skoru': round(self.duals['lp_skoru'], 3),
+            'tam_sayi': self.duals['tam_sayi'],
+            'butce_golge_fiyati': round(shadow, 4),
+            'butce_bagliyor': shadow > 1e-6,
+            'pozisyon_marjinal': dict(sorted(
+                ((p, round(v, 3)) for p, v in self.duals['pozisyon_marjinal'].items()),
+                key=lambda item: item[1], reverse=True
+            ))
+        }
+    
+    def optimizer_margins(self) -> Optional[pd.DataFrame]:
+        """
+        Havuzdaki her oyuncu için dual tabanlı değerler.
+        
+        Kadrodakiler Marjinal_Değer'e, dışarıdakiler İndirgenmiş_Maliyet'e
+        (kadroya aday olmak için gereken skor artışının alt sınırı) göre sıralanır.
+        """
+        if self.duals is None:
+            return None
+        table = self.duals['oyuncular'].copy()
+        table['Kadroda'] = table['ID'].isin(self.squad_df['ID'])
+        table = table.sort_values(
+            ['Kadroda', 'Marjinal_Değer', 'İndirgenmiş_Maliyet'], ascending=[False, False, True]
+        )
+        return table.round({'Seçim_Oranı': 3, 'Marjinal_Değer': 3, 'İndirgenmiş_Maliyet': 3}).reset_index(drop=True)
+    
     def _get_selection_reasons(self, player: pd.Series) -> List[str]:
         """Oyuncu neden seçildi?"""
         reasons = []
         
+        # Optimizer'ın kendi gerekçesi (dual değerler)
+        values = self._get_optimizer_values(player)
+        if values is not None:
+            if values['marjinal_deger'] > 1e-6:
+                reasons.append(
+                    f"🧮 Optimizer Değeri ({values['marjinal_deger']:.1f}) - "
+                    f"en iyi alternatifine göre kadroya kattığı skor (LP duali)"
+                )
+            else:
+                reasons.append("🧮 Eşdeğer alternatifi var - optimizer açısından yerine başkası da seçilebilirdi")
+            reasons.append(
+                f"📍 {values['pozisyon']} Pozisyon Değeri ({values['pozisyon_marjinal']:.1f}) - "
+                "bu pozisyondaki bir oyuncunun amaç fonksiyonuna marjinal katkısı"
+            )
+            if values['butce_golge_fiyati'] > 1e-6:
+                reasons.append(
+                    f"💰 Bütçe Bağlayıcı - +£1M bütçe ≈ +{values['butce_golge_fiyati']:.2f} skor"
+                )
+        
         rating = player.get('Rating', 0)
         if rating > 85:
             reasons.append(f"⭐ Yüksek Rating ({rating:.0f}) - En iyi performans")
@@ -120,12 +225,16 @@ class SquadExplainer:
         for _, alt in alternatives.head(top_n).iterrows():
             reason = self._compare_with_alternative(player, alt)
             
-            results.append({
+            alternative = {
                 'oyuncu': alt.get('Oyuncu_Adi', alt.get('Oyuncu', 'Unknown')),
                 'rating': round(alt.get('Rating', 0), 1),
                 'fiyat': round(alt.get('Fiyat_M', 0), 1),
                 'neden_reddedildi': reason
-            })
+            }
+            values = self._get_optimizer_values(alt)
+            if values is not None:
+                alternative['indirgenmis_maliyet'] = values['indirgenmis_maliyet']
+            results.append(alternative)
         
         return results
     
@@ -263,35 +372,354 @@ class SquadExplainer:
         return narrative
 
 
-def explain_squad_changes(old_squad: pd.DataFrame, new_squad: pd.DataFrame, all_players: pd.DataFrame) -> List[Dict]:
+class CounterfactualExplainer:
+    """
+    "Ne gerekirdi?" sorguları: oyuncunun optimal kadroya girmesi (ya da
+    kadrodan düşmesi) için gereken en küçük değişiklik.
+    
+    Eşikler bisection yerine kesin yeniden çözümlerle bulunur; model bir kez
+    kurulur, her sorgu yalnızca amaç/sınır değiştirir:
+    - Gereken skor artışı: oyuncunun uygun hücrelerine büyük bir bonus
+      (FORCE_BONUS) eklenerek kadroya zorlanır; solve_fast ile bulunan en iyi
+      zorlanmış kadro Z ise gereken artış OPT - Z'dir (en iyi pozisyonunda).
+    - Gereken fiyat indirimi: oyuncu kadrodayken fiyatını Δ düşürmek bütçeyi
+      Δ arttırmakla aynıdır. Skoru en az OPT olan zorlanmış kadroların en
+      ucuzu (min_cost_fast) C ise Δ = C - bütçe; Δ oyuncunun fiyatını
+      aşıyorsa fiyat indirimi tek başına yetmez.
+    - Kadrodaki oyuncular için çıkış marjı: OPT - OPT(oyuncu hariç), yani
+      skoru ne kadar düşerse yerini kaybeder.
+    Eşik değerlerinde oyuncu mevcut kadroyla eşit skorludur (beraberlik).
+    """
+    
+    def __init__(self, pool_df: pd.DataFrame, formation: str, budget: float,
+                 strategy: str = 'Dengeli', score_matrix: Optional[pd.DataFrame] = None):
+        self.pool_df = pool_df
+        self.budget = budget
+        self.model = LineupModel(pool_df, formation)
+        if score_matrix is None:
+            score_matrix = build_score_matrix(self.model.df, strategy, self.model.positions)
+        self.values = self.model._score_values(score_matrix)
+        self.row_of = {player_id: row for row, player_id in enumerate(self.model.df['ID'])}
+        self.prices = self.model.df['Fiyat_M'].to_numpy(dtype=float)
+        
+        selection, self.base_score, self.status = self.model.solve_fast(self.values, budget)
+        index_row = {index: row for row, index in enumerate(self.model.players)}
+        self.base_rows = {index_row[i]: p for i, p in selection}
+    
+    def _forced_values(self, row: int) -> np.ndarray:
+        values = self.values.copy()
+        values[row] = np.where(self.model.eligible[row], values[row] + FORCE_BONUS, values[row])
+        return values
+    
+    def query(self, player_id) -> Dict:
+        """
+        Tek oyuncu için karşı-olgusal eşikler.
+        
+        Returns:
+            Dict: ID, Oyuncu, Kadroda, Pozisyon, Gereken_Skor_Artışı,
+                Gereken_Fiyat_İndirimi, Yeni_Fiyat, Çıkış_Marjı, Durum
+                (oyuncu modelde yoksa {'error': ...})
+        """
+        if self.status != 'Optimal':
+            return {'error': 'Mevcut parametrelerle optimal kadro yok'}
+        if player_id not in self.row_of:
+            return {'error': 'Oyuncu havuzda değil ya da sakat'}
+        
+        row = self.row_of[player_id]
+        price = float(self.prices[row])
+        result = {
+            'ID': player_id,
+            'Oyuncu': self.model.df['Oyuncu'].iat[row] if 'Oyuncu' in self.model.df.columns else '',
+            'Kadroda': row in self.base_rows,
+            'Pozisyon': self.base_rows.get(row),
+            'Fiyat_M': price,
+            'Gereken_Skor_Artışı': 0.0,
+            'Gereken_Fiyat_İndirimi': 0.0,
+            'Yeni_Fiyat': price,
+            'Çıkış_Marjı': None
+        }
+        
+        if result['Kadroda']:
+            excluded = np.zeros(len(self.model.players), dtype=bool)
+            excluded[row] = True
+            _, without, status = self.model.solve_fast(self.values, self.budget, excluded=excluded)
+            result['Çıkış_Marjı'] = self.base_score - without if status == 'Optimal' else np.inf
+            result['Durum'] = 'Kadroda'
+            return result
+        
+        if not self.model.eligible[row].any():
+            result.update({'Gereken_Skor_Artışı': np.inf, 'Gereken_Fiyat_İndirimi': np.inf,
+                           'Yeni_Fiyat': None, 'Durum': 'Formasyonda uygun pozisyon yok'})
+            return result
+        
+        forced = self._forced_values(row)
+        target = self.base_score + FORCE_BONUS - 1e-6
+        
+        # Skor artışı: bütçe içinde en iyi zorlanmış kadro
+        selection, forced_score, status = self.model.solve_fast(forced, self.budget)
+        if status == 'Optimal':
+            result['Pozisyon'] = next(p for i, p in selection if i == self.model.players[row])
+            result['Gereken_Skor_Artışı'] = max(0.0, self.base_score - (forced_score - FORCE_BONUS))
+        else:
+            result['Gereken_Skor_Artışı'] = np.inf
+        
+        # Fiyat indirimi: skoru OPT'a ulaşan en ucuz zorlanmış kadro
+        selection, cost, status = self.model.min_cost_fast(forced, target)
+        if status != 'Optimal':
+            cut = np.inf
+        else:
+            cut = max(0.0, cost - self.budget)
+            if result['Pozisyon'] is None:
+                result['Pozisyon'] = next(p for i, p in selection if i == self.model.players[row])
+        
+        if cut > price + 1e-9:
+            result['Gereken_Fiyat_İndirimi'] = np.inf
+            result['Yeni_Fiyat'] = None
+        else:
+            result['Gereken_Fiyat_İndirimi'] = cut
+            result['Yeni_Fiyat'] = max(0.0, price - cut)
+        
+        if np.isfinite(result['Gereken_Fiyat_İndirimi']) and result['Gereken_Fiyat_İndirimi'] > 0:
+            result['Durum'] = 'Fiyat ya da skor'
+        elif np.isfinite(result['Gereken_Skor_Artışı']):
+            result['Durum'] = 'Skor artışı gerekli'
+        else:
+            result['Durum'] = 'Bütçeye sığmıyor'
+        return result
+    
+    def batch(self, player_ids=None, club: Optional[str] = None,
+              workers: Optional[int] = None) -> pd.DataFrame:
+        """
+        Birden çok oyuncu için karşı-olgusal eşikler (thread havuzunda).
+        
+        Args:
+            player_ids: Oyuncu ID'leri (varsayılan: havuzdaki tüm sağlıklı oyuncular)
+            club: Verilirse yalnızca bu kulübün oyuncuları
+            workers: Thread sayısı (varsayılan: CPU sayısı, en fazla 4)
+            
+        Returns:
+            pd.DataFrame: Oyuncu başına bir satır; dışarıdakiler gereken skor
+                artışına göre artan sırada
+        """
+        if player_ids is None:
+            players = self.model.df
+            if club is not None and 'Takim' in players.columns:
+                players = players[players['Takim'] == club]
+            player_ids = players['ID'].tolist()
+        
+        if self.model._highs is None:
+            self.model._highs = self.model._build_highs()
+        if workers is None:
+            workers = min(4, os.cpu_count() or 1)
+        
+        if workers <= 1:
+            rows = [self.query(player_id) for player_id in player_ids]
+        else:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                rows = list(pool.map(self.query, player_ids))
+        
+        table = pd.DataFrame([r for r in rows if 'error' not in r])
+        if table.empty:
+            return table
+        return table.sort_values(['Kadroda', 'Gereken_Skor_Artışı', 'Gereken_Fiyat_İndirimi'],
+                                 ascending=[False, True, True]).reset_index(drop=True)
+
+
+class LineupDiffEngine:
+    """
+    ID dizileri üzerinde atama-duyarlı kadro farkı.
+    
+    Oyuncu öznitelikleri (isim, fiyat, pozisyon skorları) bir kez dizilere
+    alınır; kadrolar (ID, atanan pozisyon) dizileri olarak verilir, satır
+    bazlı DataFrame filtrelemesi yapılmaz. Çıkan ve giren oyuncular küçük bir
+    atama problemiyle (linear_sum_assignment) eşleştirilir:
+    
+        maliyet = pozisyon uzaklığı (aynı pozisyon 0, aynı hat 1, farklı hat 2)
+                  + 0.001 x |skor farkı|  (eşitlikte benzer oyuncular eşleşir)
+    
+    Her takasın skor farkı, girenin yeni pozisyonundaki skoru ile çıkanın eski
+    pozisyonundaki skoru arasındaki farktır; kadroda kalıp pozisyonu değişen
+    oyuncular ayrı satır olarak verilir. Böylece satırların toplamı iki
+    kadronun toplam skor (ve maliyet) farkına eşittir.
+    """
+    
+    COLUMNS = ['Tip', 'Çıkan_ID', 'Çıkan', 'Çıkan_Pozisyon', 'Giren_ID', 'Giren',
+               'Giren_Pozisyon', 'Skor_Farkı', 'Fiyat_Farkı']
+    
+    def __init__(self, players: pd.DataFrame, strategy: str = 'Dengeli',
+                 score_matrix: Optional[pd.DataFrame] = None):
+        """
+        Args:
+            players: Kadroların seçildiği oyuncu havuzu (ID sütunu tekil)
+            strategy: Skor matrisi verilmezse kullanılacak strateji
+            score_matrix: build_score_matrix() çıktısı (opsiyonel)
+        """
+        self.positions = list(POSITION_CAN_BE_FILLED_BY.keys())
+        self._position_index = pd.Index(self.positions)
+        groups = pd.Index(sorted(set(SUB_POS_TO_GROUP.values())))
+        group_codes = groups.get_indexer([SUB_POS_TO_GROUP[p] for p in self.positions])
+        same_group = group_codes[:, np.newaxis] == group_codes[np.newaxis, :]
+        self.position_distance = np.where(same_group, 1.0, 2.0)
+        np.fill_diagonal(self.position_distance, 0.0)
+        
+        ids = players['ID'].to_numpy()
+        self._order = np.argsort(ids, kind='stable')
+        self._sorted_ids = ids[self._order]
+        self.ids = ids
+        self.names = players['Oyuncu'].to_numpy() if 'Oyuncu' in players.columns else ids.astype(str)
+        self.prices = players['Fiyat_M'].to_numpy(dtype=float)
+        
+        if score_matrix is None:
+            score_matrix = build_score_matrix(players, strategy, self.positions)
+        self.scores = score_matrix.loc[players.index, self.positions].to_numpy(dtype=float)
+    
+    def rows(self, ids) -> np.ndarray:
+        """ID dizisini oyuncu satırlarına çevirir (aynı şekilde)."""
+        ids = np.asarray(ids)
+        pos = np.searchsorted(self._sorted_ids, ids.ravel())
+        pos = np.minimum(pos, len(self._sorted_ids) - 1)
+        missing = self._sorted_ids[pos] != ids.ravel()
+        if missing.any():
+            raise KeyError(f"Havuzda olmayan oyuncu ID'leri: {ids.ravel()[missing][:5].tolist()}")
+        return self._order[pos].reshape(ids.shape)
+    
+    def position_codes(self, positions) -> np.ndarray:
+        """Pozisyon adı dizisini sütun indekslerine çevirir (aynı şekilde)."""
+        positions = np.asarray(positions)
+        codes = self._position_index.get_indexer(positions.ravel())
+        if (codes < 0).any():
+            raise ValueError(f"Bilinmeyen pozisyon: {positions.ravel()[codes < 0][:5].tolist()}")
+        return codes.reshape(positions.shape)
+    
+    def _pair(self, out_rows, out_pos, in_rows, in_pos) -> Tuple[np.ndarray, np.ndarray]:
+        """Çıkan-giren eşleştirmesi: (çıkan sırası, giren sırası)."""
+        k = len(out_rows)
+        if k <= 1:
+            return np.arange(k), np.arange(k)
+        out_scores = self.scores[out_rows, out_pos]
+        in_scores = self.scores[in_rows, in_pos]
+        cost = (self.position_distance[np.ix_(out_pos, in_pos)]
+                + 0.001 * np.abs(out_scores[:, np.newaxis] - in_scores[np.newaxis, :]))
+        return linear_sum_assignment(cost)
+    
+    def batch(self, base_ids, base_positions, scenario_ids, scenario_positions) -> pd.DataFrame:
+        """
+        Bir temel kadroyu çok sayıda senaryo kadrosuyla karşılaştırır.
+        
+        Args:
+            base_ids, base_positions: Temel kadro (uzunluk n)
+            scenario_ids, scenario_positions: Senaryo kadroları (S x n)
+            
+        Returns:
+            pd.DataFrame: Senaryo + COLUMNS; her senaryo için takaslar ve
+                pozisyon değişiklikleri (farksız senaryolar satır üretmez)
+        """
+        base_rows = self.rows(base_ids)
+        base_pos = self.position_codes(base_positions)
+        scen_rows = np.atleast_2d(self.rows(scenario_ids))
+        scen_pos = np.atleast_2d(self.position_codes(scenario_positions))
+        
+        # Üyelik: (S x n x n) eşitlik tensörü
+        match = scen_rows[:, :, np.newaxis] == base_rows[np.newaxis, np.newaxis, :]
+        entering = ~match.any(axis=2)                        # S x n (senaryoda yeni)
+        leaving = ~match.any(axis=1)                         # S x n (temelden çıkan)
+        
+        # Kalıp pozisyonu değişenler
+        stay_s, stay_j, stay_b = np.nonzero(match)
+        moved = scen_pos[stay_s, stay_j] != base_pos[stay_b]
+        stay_s, stay_j, stay_b = stay_s[moved], stay_j[moved], stay_b[moved]
+        
+        # Takaslar: tek değişiklikli senaryolar vektörize, diğerleri küçük atama problemi
+        counts = entering.sum(axis=1)
+        out_idx = [np.flatnonzero(row) for row in leaving] if (counts > 1).any() else None
+        swap_s, swap_out, swap_in = [], [], []
+        single = np.flatnonzero(counts == 1)
+        swap_s.append(single)
+        swap_out.append(leaving[single].argmax(axis=1))
+        swap_in.append(entering[single].argmax(axis=1))
+        for s_id in np.flatnonzero(counts > 1):
+            outs = out_idx[s_id]
+            ins = np.flatnonzero(entering[s_id])
+            r, c = self._pair(base_rows[outs], base_pos[outs], scen_rows[s_id, ins], scen_pos[s_id, ins])
+            swap_s.append(np.full(len(r), s_id))
+            swap_out.append(outs[r])
+            swap_in.append(ins[c])
+        swap_s = np.concatenate(swap_s).astype(int)
+        swap_out = np.concatenate(swap_out).astype(int)
+        swap_in = np.concatenate(swap_in).astype(int)
+        
+        # Satırlar: takaslar + pozisyon değişiklikleri
+        out_rows = np.concatenate([base_rows[swap_out], base_rows[stay_b]])
+        out_pos = np.concatenate([base_pos[swap_out], base_pos[stay_b]])
+        in_rows = np.concatenate([scen_rows[swap_s, swap_in], scen_rows[stay_s, stay_j]])
+        in_pos = np.concatenate([scen_pos[swap_s, swap_in], scen_pos[stay_s, stay_j]])
+        scenario = np.concatenate([swap_s, stay_s])
+        kind = np.repeat(['Değişiklik', 'Pozisyon Değişikliği'], [len(swap_s), len(stay_s)])
+        
+        table = pd.DataFrame({
+            'Senaryo': scenario,
+            'Tip': kind,
+            'Çıkan_ID': self.ids[out_rows],
+            'Çıkan': self.names[out_rows],
+            'Çıkan_Pozisyon': np.asarray(self.positions, dtype=object)[out_pos],
+            'Giren_ID': self.ids[in_rows],
+            'Giren': self.names[in_rows],
+            'Giren_Pozisyon': np.asarray(self.positions, dtype=object)[in_pos],
+            'Skor_Farkı': self.scores[in_rows, in_pos] - self.scores[out_rows, out_pos],
+            'Fiyat_Farkı': self.prices[in_rows] - self.prices[out_rows]
+        })
+        return table.sort_values(['Senaryo', 'Tip'], kind='stable').reset_index(drop=True)
+    
+    def diff(self, old_ids, old_positions, new_ids, new_positions) -> pd.DataFrame:
+        """İki kadro arasındaki takaslar ve pozisyon değişiklikleri (COLUMNS)."""
+        table = self.batch(old_ids, old_positions, [new_ids], [new_positions])
+        return table[self.COLUMNS]
+    
+    def diff_frames(self, old_squad: pd.DataFrame, new_squad: pd.DataFrame) -> pd.DataFrame:
+        """diff() için kadro DataFrame'leri (Atanan_Pozisyon, yoksa Alt_Pozisyon)."""
+        def columns(squad: pd.DataFrame):
+            pos_col = 'Atanan_Pozisyon' if 'Atanan_Pozisyon' in squad.columns else 'Alt_Pozisyon'
+            return squad['ID'].to_numpy(), squad[pos_col].to_numpy()
+        return self.diff(*columns(old_squad), *columns(new_squad))
+
+
+def explain_squad_changes(old_squad: pd.DataFrame, new_squad: pd.DataFrame, all_players: pd.DataFrame,
+                          strategy: str = 'Dengeli') -> List[Dict]:
     """
     Kadro değişikliklerini açıkla.
     
+    Çıkan ve giren oyuncular pozisyona göre optimal eşleştirilir
+    (LineupDiffEngine); her takasın skor ve maliyet farkı ayrıca verilir.
+    
     Args:
         old_squad: Eski kadro
         new_squad: Yeni kadro
-        all_players: Tüm oyuncular
+        all_players: Tüm oyuncular (iki kadronun oyuncularını içermeli)
+        strategy: Pozisyon skorları için strateji
         
     Returns:
         List: Değişikliklerin açıklaması
     """
-    changes = []
+    engine = LineupDiffEngine(all_players, strategy)
+    table = engine.diff_frames(old_squad, new_squad)
     
-    old_ids = set(old_squad['ID'].tolist())
-    new_ids = set(new_squad['ID'].tolist())
-    
-    # Çıkanlar
-    removed_ids = old_ids - new_ids
-    for rid in removed_ids:
-        old_player = old_squad[old_squad['ID'] == rid].iloc[0]
-        replacement = new_squad[~new_squad['ID'].isin(old_ids)].iloc[0] if len(new_squad[~new_squad['ID'].isin(old_ids)]) > 0 else None
-        
-        if replacement is not None:
-            changes.append({
-                'tip': 'Değişiklik',
-                'çıkan': old_player.get('Oyuncu_Adi', old_player.get('Oyuncu', 'Unknown')),
-                'gelen': replacement.get('Oyuncu_Adi', replacement.get('Oyuncu', 'Unknown')),
-                'neden': f"Rating: {old_player.get('Rating', 0):.0f} → {replacement.get('Rating', 0):.0f}"
-            })
+    rating_of = dict(zip(all_players['ID'], all_players['Rating'])) if 'Rating' in all_players.columns else {}
+    
+    changes = []
+    for row in table.itertuples(index=False):
+        changes.append({
+            'tip': row.Tip,
+            'çıkan': row.Çıkan,
+            'gelen': row.Giren,
+            'çıkan_pozisyon': row.Çıkan_Pozisyon,
+            'gelen_pozisyon': row.Giren_Pozisyon,
+            'skor_farkı': round(float(row.Skor_Farkı), 3),
+            'fiyat_farkı': round(float(row.Fiyat_Farkı), 1),
+            'neden': (
+                f"{row.Çıkan_Pozisyon} → {row.Giren_Pozisyon} | "
+                f"Rating: {rating_of.get(row.Çıkan_ID, 0):.0f} → {rating_of.get(row.Giren_ID, 0):.0f} | "
+                f"Skor {row.Skor_Farkı:+.2f}"
+            )
+        })
     
     return changes
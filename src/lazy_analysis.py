@@ -0,0 +1,144 @@
+"""
+=============================================================================
+LAZY_ANALYSIS.PY - ERTELENMİŞ (LAZY) ANALİZ KATMANI
+=============================================================================
+
+Arayüzdeki sekmelerin analizleri (karar raporu, duyarlılık, uyumluluk,
+Pareto, rapor, bench) her yeniden çalıştırmada değil, yalnızca gerektiğinde
+hesaplanır:
+
+- Her analiz, kadro parmak izine (lineup fingerprint) bağlı ertelenmiş bir
+  görev olarak kaydedilir
+- Sonuç ilk istendiğinde hesaplanır ve önbellekte tutulur
+- İstenirse kayıtlı görevler, ilk 11 çizildikten sonra arka plan
+  thread'inde önceden hesaplanır (prefetch)
+
+Modül Streamlit'ten bağımsızdır; main.py kayıt defterini session_state
+içinde saklar.
+=============================================================================
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, Hashable, Iterable, Optional, Tuple
+
+import pandas as pd
+
+
+def lineup_fingerprint(selected_df: pd.DataFrame, *context) -> str:
+    """
+    Kadro ve bağlam parametreleri için kararlı bir parmak izi üretir.
+
+    Args:
+        selected_df: Seçilen kadro
+        *context: Analizi etkileyen diğer parametreler (takım, formasyon, bütçe...)
+
+    Returns:
+        str: Kısa hex özet
+    """
+    pos_col = 'Atanan_Pozisyon' if 'Atanan_Pozisyon' in selected_df.columns else 'Alt_Pozisyon'
+    players = sorted(zip(selected_df['ID'].astype(str), selected_df[pos_col].astype(str)))
+    payload = repr((players, context)).encode('utf-8')
+    return hashlib.sha1(payload).hexdigest()[:16]
+
+
+class LazyAnalysisRegistry:
+    """
+    Parmak izine bağlı ertelenmiş analiz görevleri ve sonuç önbelleği.
+
+    Kullanım:
+        registry.activate(fingerprint)
+        registry.register('decision', lambda: generate_decision_report(...))
+        registry.prefetch()                 # arka planda hesapla (opsiyonel)
+        report = registry.get('decision')   # hazırsa önbellekten, değilse şimdi
+    """
+
+    def __init__(self, max_workers: int = 1, max_entries: int = 64):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='kds-lazy')
+        self._lock = threading.Lock()
+        self._tasks: Dict[str, Callable[[], object]] = {}
+        self._results: 'OrderedDict[Tuple[str, Hashable], object]' = OrderedDict()
+        self._pending: Dict[Tuple[str, Hashable], Future] = {}
+        self._max_entries = max_entries
+        self.fingerprint: Optional[str] = None
+
+    def activate(self, fingerprint: str) -> None:
+        """Aktif kadroyu değiştirir; eski görev tanımları bırakılır, sonuçlar önbellekte kalır."""
+        with self._lock:
+            if fingerprint != self.fingerprint:
+                self._tasks = {}
+            self.fingerprint = fingerprint
+
+    def register(self, name: str, func: Callable[[], object]) -> None:
+        """Aktif kadro için ertelenmiş bir analiz görevi kaydeder (hesaplamaz)."""
+        with self._lock:
+            self._tasks[name] = func
+
+    def _key(self, name: str) -> Tuple[str, Hashable]:
+        return (self.fingerprint, name)
+
+    def is_ready(self, name: str) -> bool:
+        """Analiz sonucu önbellekte mi?"""
+        with self._lock:
+            return self._key(name) in self._results
+
+    def _store(self, key: Tuple[str, Hashable], value: object) -> None:
+        self._results[key] = value
+        self._results.move_to_end(key)
+        while len(self._results) > self._max_entries:
+            self._results.popitem(last=False)
+
+    def _on_done(self, key: Tuple[str, Hashable], future: Future) -> None:
+        with self._lock:
+            self._pending.pop(key, None)
+            if future.exception() is None:
+                self._store(key, future.result())
+
+    def prefetch(self, names: Optional[Iterable[str]] = None) -> None:
+        """
+        Kayıtlı (veya verilen) görevleri arka plan thread'inde hesaplatır.
+        Hazır ya da hesaplanmakta olan görevler tekrar gönderilmez.
+        """
+        submitted = []
+        with self._lock:
+            for name in (list(names) if names is not None else list(self._tasks)):
+                key = self._key(name)
+                if name not in self._tasks or key in self._results or key in self._pending:
+                    continue
+                future = self._executor.submit(self._tasks[name])
+                self._pending[key] = future
+                submitted.append((key, future))
+
+        # Kilit dışında: iş çoktan bittiyse _on_done aynı thread'de hemen çalışır
+        for key, future in submitted:
+            future.add_done_callback(lambda f, k=key: self._on_done(k, f))
+
+    def get(self, name: str, func: Optional[Callable[[], object]] = None) -> object:
+        """
+        Analiz sonucunu döndürür.
+
+        Önbellekte varsa hemen döner; arka planda hesaplanıyorsa bekler;
+        aksi halde kayıtlı görevi (ya da verilen func'ı) şimdi çalıştırır.
+        Hatalar önbelleğe alınmaz, çağırana iletilir.
+        """
+        with self._lock:
+            key = self._key(name)
+            if key in self._results:
+                self._results.move_to_end(key)
+                return self._results[key]
+            future = self._pending.get(key)
+            if func is not None:
+                self._tasks.setdefault(name, func)
+            task = self._tasks.get(name)
+
+        if future is not None:
+            return future.result()
+        if task is None:
+            raise KeyError(f"Kayıtlı analiz yok: {name}")
+
+        value = task()
+        with self._lock:
+            self._store(key, value)
+        return value
@@ -24,13 +24,19 @@ Kısıtlar:
     3. Toplam 11 oyuncu: ΣΣ y[i,p] = 11
     4. Bütçe: Σ (Fiyat_i × Σ y[i,p]) <= Budget
     5. Uyumluluk: y[i,p] = 0 eğer oyuncu i, pozisyon p'ye uygun değilse
+       (uyumsuz çiftler için değişken oluşturulmaz)
 =============================================================================
 """
 
+import time
+
 import pandas as pd
+import numpy as np
+from scipy.optimize import Bounds, LinearConstraint, linear_sum_assignment, linprog, milp
+from scipy.sparse import csr_matrix, vstack
 from typing import Tuple, Optional, Dict, List
 from pulp import (
-    LpProblem, LpMaximize, LpVariable, 
+    LpProblem, LpMaximize, LpMinimize, LpVariable, 
     lpSum, LpBinary, LpStatus, PULP_CBC_CMD
 )
 
@@ -41,33 +47,24 @@ from .config import (
     POSITIONAL_WEIGHTS
 )
 
+# Pozisyona uygun olmayan oyuncu-pozisyon çiftleri için cezalı skor
+INELIGIBLE_SCORE = -1000
 
-def calculate_position_score(row: pd.Series, position: str, strategy: str = 'Dengeli') -> float:
+
+def position_weight_split(position: str, strategy_weights: Dict[str, float]) -> Tuple[float, float, float]:
     """
-    Bir oyuncunun belirli bir pozisyon için uygunluk skorunu hesaplar.
+    Strateji ağırlıklarını pozisyona göre ayarlar ve normalize eder.
     
-    YENİ MANTIK: Hibrit Skor + Strateji Ağırlıkları
-    Score = (Base_Rating_Score * 0.7) + (Data_Score * 0.3)
+    Defansif pozisyonlarda (CB, LB, RB, GK, DM) defans ağırlığı x1.4, ofans x0.6;
+    ofansif pozisyonlarda (ST, LW, RW, CAM) tersi uygulanır. Sonuç toplamı 1'dir.
     
-    Strateji ağırlıkları:
-    - Ofansif: ofans %50, defans %20, form %30
-    - Defansif: ofans %20, defans %50, form %30
-    - Dengeli: ofans %35, defans %35, form %30
-    
-    Args:
-        row: Oyuncu verisi
-        position: Atanacak pozisyon
-        strategy: Takım stratejisi (Dengeli/Ofansif/Defansif)
+    Returns:
+        Tuple: (ofans_ağırlığı, defans_ağırlığı, form_ağırlığı)
     """
-    
-    # 1. Strateji ağırlıklarını al
-    strategy_weights = STRATEGY_WEIGHTS.get(strategy, STRATEGY_WEIGHTS['Dengeli'])
     base_offense = strategy_weights['ofans']
     base_defense = strategy_weights['defans']
     form_weight = strategy_weights['form']
     
-    # 2. Pozisyona göre ağırlıkları ayarla
-    # Strateji ağırlıklarını pozisyona göre modifiye et
     if position in ['CB', 'LB', 'RB', 'GK', 'DM']:
         # Defansif pozisyonlar - defans ağırlığını artır
         offense_weight = base_offense * 0.6
@@ -83,9 +80,30 @@ def calculate_position_score(row: pd.Series, position: str, strategy: str = 'Den
     
     # Ağırlıkları normalize et (toplam ~1 olsun)
     total = offense_weight + defense_weight + form_weight
-    offense_weight /= total
-    defense_weight /= total
-    form_weight /= total
+    return offense_weight / total, defense_weight / total, form_weight / total
+
+
+def calculate_position_score(row: pd.Series, position: str, strategy: str = 'Dengeli') -> float:
+    """
+    Bir oyuncunun belirli bir pozisyon için uygunluk skorunu hesaplar.
+    
+    YENİ MANTIK: Hibrit Skor + Strateji Ağırlıkları
+    Score = (Base_Rating_Score * 0.7) + (Data_Score * 0.3)
+    
+    Strateji ağırlıkları:
+    - Ofansif: ofans %50, defans %20, form %30
+    - Defansif: ofans %20, defans %50, form %30
+    - Dengeli: ofans %35, defans %35, form %30
+    
+    Args:
+        row: Oyuncu verisi
+        position: Atanacak pozisyon
+        strategy: Takım stratejisi (Dengeli/Ofansif/Defansif)
+    """
+    
+    # 1-2. Strateji ağırlıklarını al ve pozisyona göre ayarla
+    strategy_weights = STRATEGY_WEIGHTS.get(strategy, STRATEGY_WEIGHTS['Dengeli'])
+    offense_weight, defense_weight, form_weight = position_weight_split(position, strategy_weights)
         
     # Rating skoru (0-100 arası olması bekleniyor ama normalizasyona bağlı)
     # Norm değerler 0-1 arasında.
@@ -128,15 +146,505 @@ def calculate_position_score(row: pd.Series, position: str, strategy: str = 'Den
         return base_score * 0.3
 
 
+def build_score_matrix(
+    df: pd.DataFrame,
+    strategy: str = 'Dengeli',
+    positions: Optional[List[str]] = None,
+    strategy_weights: Optional[Dict[str, float]] = None,
+    stat_blend: float = 0.7
+) -> pd.DataFrame:
+    """
+    Tüm oyuncular x pozisyonlar için skor matrisini tek seferde hesaplar.
+    
+    calculate_position_score() ile birebir aynı sonucu verir, ancak satır
+    bazlı döngü yerine sütun işlemleri kullanır. Oyuncunun Alt_Pozisyon'u
+    pozisyona uygun değilse (POSITION_CAN_BE_FILLED_BY) skor INELIGIBLE_SCORE olur.
+    
+    Args:
+        df: Normalize edilmiş oyuncu verileri
+        strategy: Takım stratejisi (strategy_weights verilmezse kullanılır)
+        positions: Pozisyon listesi (varsayılan: tüm alt pozisyonlar)
+        strategy_weights: {'ofans', 'defans', 'form'} - özel ağırlıklar
+        stat_blend: İstatistik skorunun hibrit skordaki payı (varsayılan %70)
+        
+    Returns:
+        pd.DataFrame: index=df.index, sütunlar=pozisyonlar
+    """
+    if strategy_weights is None:
+        strategy_weights = STRATEGY_WEIGHTS.get(strategy, STRATEGY_WEIGHTS['Dengeli'])
+    if positions is None:
+        positions = list(POSITION_CAN_BE_FILLED_BY.keys())
+    
+    n = len(df)
+    
+    def column(name: str, default: float) -> np.ndarray:
+        if name in df.columns:
+            return df[name].to_numpy(dtype=float)
+        return np.full(n, default)
+    
+    offense = column('Ofans_Gucu_Norm', 0.5)
+    defense = column('Defans_Gucu_Norm', 0.5)
+    form = column('Form_Norm', 0.5)
+    sub_pos = df['Alt_Pozisyon'].to_numpy()
+    
+    scores = np.empty((n, len(positions)))
+    
+    for j, position in enumerate(positions):
+        ow, dw, fw = position_weight_split(position, strategy_weights)
+        base_score = (ow * offense + dw * defense + fw * form) * 100
+        
+        data_score = np.zeros(n)
+        used_stats = np.zeros(n, dtype=bool)
+        for metric, weight in POSITIONAL_WEIGHTS.get(position, {}).items():
+            col_name = f"stat_{metric}_Norm"
+            if col_name in df.columns:
+                val = df[col_name].to_numpy(dtype=float)
+                data_score = data_score + val * weight
+                used_stats |= val > 0
+        
+        position_score = np.where(
+            used_stats & (data_score > 0),
+            base_score * (1 - stat_blend) + data_score * 100 * stat_blend,
+            base_score * (1 - stat_blend)
+        )
+        
+        eligible = np.isin(sub_pos, POSITION_CAN_BE_FILLED_BY.get(position, [position]))
+        scores[:, j] = np.where(eligible, position_score, INELIGIBLE_SCORE)
+    
+    return pd.DataFrame(scores, index=df.index, columns=positions)
+
+
+class LineupModel:
+    """
+    Aynı oyuncu havuzu ve formasyon için tekrar tekrar çözülebilen atama modeli.
+    
+    Değişkenler ve kısıtlar (Kısıt 1-5) bir kez kurulur; her solve() çağrısında
+    yalnızca amaç katsayıları (skor matrisi) ve bütçe sağ tarafı güncellenir.
+    Bir önceki çözüm CBC'ye başlangıç çözümü (warm start) olarak verilir.
+    Duyarlılık taramaları gibi aynı modeli onlarca kez çözen analizler içindir.
+    """
+    
+    def __init__(self, df: pd.DataFrame, formation: str):
+        if formation not in FORMATIONS:
+            raise ValueError(f"Geçersiz formasyon: {formation}")
+        
+        self.formation = formation
+        self.formation_req = FORMATIONS[formation]
+        self.positions = list(self.formation_req.keys())
+        
+        # Sadece sağlıklı oyuncuları al
+        self.df = df[df['Sakatlik'] == 0]
+        self.players = self.df.index.tolist()
+        self.prices = dict(zip(self.players, self.df['Fiyat_M'].to_numpy(dtype=float)))
+        self.feasible = len(self.df) >= 11
+        self._last_solution: Optional[List[Tuple]] = None
+        
+        # Kısıt 5 (UYUMLULUK): uyumsuz çiftler için değişken hiç oluşturulmaz
+        sub_pos = self.df['Alt_Pozisyon'].to_numpy()
+        self.eligible = np.column_stack([
+            np.isin(sub_pos, POSITION_CAN_BE_FILLED_BY.get(p, [p])) for p in self.positions
+        ]) if self.players else np.zeros((0, len(self.positions)), dtype=bool)
+        
+        self.model = LpProblem(name="Squad_Assignment", sense=LpMaximize)
+        
+        # Karar değişkenleri: y[i,p] = oyuncu i, pozisyon p'ye atandı mı?
+        self.cells = {}
+        self.y = {}
+        for row, i in enumerate(self.players):
+            for col, p in enumerate(self.positions):
+                if self.eligible[row, col]:
+                    self.y[(i, p)] = LpVariable(name=f"y_{i}_{p}", cat=LpBinary)
+                    self.cells[(i, p)] = (row, col)
+        
+        player_vars = {i: [] for i in self.players}
+        position_vars = {p: [] for p in self.positions}
+        for (i, p), var in self.y.items():
+            player_vars[i].append(var)
+            position_vars[p].append(var)
+        
+        # Kısıt 1: Her oyuncu EN FAZLA 1 pozisyona atanabilir
+        for i in self.players:
+            if player_vars[i]:
+                self.model += lpSum(player_vars[i]) <= 1, f"Player_{i}_Max_One_Position"
+        
+        # Kısıt 2: Her pozisyon için TAM gereken sayıda oyuncu
+        for p, required in self.formation_req.items():
+            if len(position_vars[p]) < required:
+                self.feasible = False
+            self.model += lpSum(position_vars[p]) == required, f"Position_{p}_Exact"
+        
+        # Kısıt 3: Toplam 11 oyuncu
+        self.model += lpSum(self.y.values()) == 11, "Total_11"
+        
+        # Kısıt 4: Bütçe (sağ taraf solve() içinde güncellenir)
+        self.model += lpSum(self.prices[i] * var for (i, p), var in self.y.items()) <= 0, "Budget"
+        
+        # Minimum maliyet modeli (solve_min_cost için, ilk kullanımda kurulur)
+        self._cost_model: Optional[LpProblem] = None
+        # HiGHS formülasyonu (solve_fast için, ilk kullanımda kurulur)
+        self._highs: Optional[Dict] = None
+    
+    def _score_values(self, score_matrix) -> np.ndarray:
+        if isinstance(score_matrix, pd.DataFrame):
+            return score_matrix.loc[self.df.index, self.positions].to_numpy()
+        return np.asarray(score_matrix)
+    
+    def _set_warm_start(self, warm_start: bool) -> bool:
+        use_warm_start = warm_start and self._last_solution is not None
+        if use_warm_start:
+            chosen = set(self._last_solution)
+            for key, var in self.y.items():
+                var.setInitialValue(1 if key in chosen else 0)
+        return use_warm_start
+    
+    def _extract(self, scores: Dict) -> Tuple[Optional[pd.DataFrame], float, float, str]:
+        """Çözülmüş değişkenlerden kadroyu çıkarır."""
+        selected_data = []
+        selected_keys = []
+        total_score = 0
+        
+        for (i, p), var in self.y.items():
+            if var.varValue is not None and var.varValue > 0.5:
+                row_data = self.df.loc[i].to_dict()
+                row_data['Atanan_Pozisyon'] = p
+                # Hesaplanan skoru da kaydet (görselleştirme için)
+                row_data['Pozisyon_Skoru'] = scores[(i, p)]
+                selected_data.append(row_data)
+                selected_keys.append((i, p))
+                total_score += scores[(i, p)]
+        
+        if len(selected_data) != 11:
+            return None, 0, 0, 'Infeasible'
+        
+        self._last_solution = selected_keys
+        selected_df = pd.DataFrame(selected_data)
+        total_cost = selected_df['Fiyat_M'].sum()
+        
+        return selected_df, total_score, total_cost, 'Optimal'
+    
+    def solve(
+        self,
+        score_matrix,
+        budget: float,
+        warm_start: bool = True
+    ) -> Tuple[Optional[pd.DataFrame], float, float, str]:
+        """
+        Modeli verilen skorlar ve bütçe ile çözer.
+        
+        Args:
+            score_matrix: build_score_matrix() çıktısı (DataFrame, df index'lerini
+                içermeli) veya self.df satırları x self.positions sırasında ndarray
+            budget: Bütçe üst limiti
+            warm_start: Önceki çözüm başlangıç çözümü olarak verilsin mi
+            
+        Returns:
+            Tuple: (selected_df, total_score, total_cost, status)
+        """
+        if not self.feasible:
+            return None, 0, 0, 'Infeasible'
+        
+        score_values = self._score_values(score_matrix)
+        
+        # AMAÇ FONKSİYONU: Toplam skoru maksimize et
+        scores = {key: score_values[cell] for key, cell in self.cells.items()}
+        self.model.setObjective(lpSum(scores[key] * var for key, var in self.y.items()))
+        self.model.constraints['Budget'].constant = -budget
+        
+        solver = PULP_CBC_CMD(msg=0, warmStart=self._set_warm_start(warm_start))
+        self.model.solve(solver)
+        
+        status = LpStatus[self.model.status]
+        
+        if status != 'Optimal':
+            return None, 0, 0, status
+        
+        return self._extract(scores)
+    
+    def solve_fast(self, score_values: np.ndarray, budget: float,
+                   excluded: Optional[np.ndarray] = None) -> Tuple[List[Tuple], float, str]:
+        """
+        Aynı modeli CBC süreci başlatmadan, süreç içinde çözer.
+        
+        Önce bütçesiz atama problemi Macar algoritmasıyla (linear_sum_assignment)
+        çözülür; bulunan kadro bütçeye sığıyorsa bütçe kısıtı aktif değildir ve
+        çözüm optimaldir. Sığmıyorsa tam model scipy/HiGHS MILP ile çözülür.
+        
+        Binlerce çözüm gerektiren Monte Carlo gibi analizler içindir; kadro
+        DataFrame'i oluşturulmaz, yalnızca seçilen (oyuncu, pozisyon) çiftleri döner.
+        
+        Args:
+            score_values: self.df satırları x self.positions sırasında skor matrisi
+            budget: Bütçe üst limiti
+            excluded: self.df satırları için maske - True olan oyuncular seçilemez
+                (sakatlık senaryoları; model yeniden kurulmaz)
+            
+        Returns:
+            Tuple: (seçilen [(index, pozisyon)] listesi, toplam skor, durum)
+        """
+        if not self.feasible:
+            return [], 0.0, 'Infeasible'
+        
+        if self._highs is None:
+            self._highs = self._build_highs()
+        highs = self._highs
+        score_values = np.asarray(score_values, dtype=float)
+        
+        # 1) Bütçesiz atama: her pozisyon gereken sayıda slota açılır
+        eligible = self.eligible if excluded is None else self.eligible & ~excluded[:, np.newaxis]
+        slot_scores = np.where(eligible, score_values, -np.inf)[:, highs['slot_cols']]
+        cost = np.where(np.isfinite(slot_scores), -slot_scores, highs['big_m'])
+        player_rows, slots = linear_sum_assignment(cost)
+        if np.isfinite(slot_scores[player_rows, slots]).all():
+            chosen_cost = highs['price_array'][player_rows].sum()
+            if chosen_cost <= budget + 1e-9:
+                selection = [
+                    (self.players[r], self.positions[highs['slot_cols'][c]])
+                    for r, c in zip(player_rows, slots)
+                ]
+                return selection, float(slot_scores[player_rows, slots].sum()), 'Optimal'
+        
+        # 2) Bütçe aktif: tam model HiGHS ile
+        ub = highs['ub'].copy()
+        ub[-1] = budget
+        constraints = LinearConstraint(highs['matrix'], highs['lb'], ub)
+        
+        scores = score_values[highs['rows'], highs['cols']]
+        bounds = (0, 1) if excluded is None else Bounds(0, np.where(excluded[highs['rows']], 0.0, 1.0))
+        result = milp(-scores, constraints=constraints,
+                      integrality=highs['integrality'], bounds=bounds)
+        
+        if result.status != 0 or result.x is None:
+            return [], 0.0, 'Infeasible'
+        
+        chosen = np.flatnonzero(result.x > 0.5)
+        keys = highs['keys']
+        return [keys[k] for k in chosen], float(scores[chosen].sum()), 'Optimal'
+    
+    def min_cost_fast(self, score_values: np.ndarray, min_score: float,
+                      excluded: Optional[np.ndarray] = None) -> Tuple[List[Tuple], float, str]:
+        """
+        solve_min_cost'un süreç içi (scipy/HiGHS) hali: toplam skoru en az
+        min_score olan en ucuz kadro. Bütçe satırı yerine skor satırı kullanılır;
+        model yeniden kurulmaz.
+        
+        Returns:
+            Tuple: (seçilen [(index, pozisyon)] listesi, toplam maliyet, durum)
+        """
+        if not self.feasible:
+            return [], 0.0, 'Infeasible'
+        
+        if self._highs is None:
+            self._highs = self._build_highs()
+        highs = self._highs
+        
+        scores = np.asarray(score_values, dtype=float)[highs['rows'], highs['cols']]
+        prices = highs['matrix'][-1].toarray().ravel()
+        constraints = [
+            LinearConstraint(highs['matrix'][:-1], highs['lb'][:-1], highs['ub'][:-1]),
+            LinearConstraint(scores[np.newaxis, :], min_score, np.inf)
+        ]
+        bounds = (0, 1) if excluded is None else Bounds(0, np.where(excluded[highs['rows']], 0.0, 1.0))
+        result = milp(prices, constraints=constraints,
+                      integrality=highs['integrality'], bounds=bounds,
+                      options={'mip_rel_gap': 0})
+        
+        if result.status != 0 or result.x is None:
+            return [], 0.0, 'Infeasible'
+        
+        chosen = np.flatnonzero(result.x > 0.5)
+        keys = highs['keys']
+        return [keys[k] for k in chosen], float(prices[chosen].sum()), 'Optimal'
+    
+    def _build_highs(self) -> Dict:
+        """solve_fast için seyrek kısıt matrisini bir kez kurar."""
+        keys = list(self.cells.keys())
+        rows = np.array([cell[0] for cell in self.cells.values()])
+        cols = np.array([cell[1] for cell in self.cells.values()])
+        n_vars = len(keys)
+        var_idx = np.arange(n_vars)
+        
+        # Satırlar: oyuncu başına <= 1, pozisyon başına == gereken, toplam == 11, bütçe <= B
+        player_rows = csr_matrix((np.ones(n_vars), (rows, var_idx)), shape=(len(self.players), n_vars))
+        position_rows = csr_matrix((np.ones(n_vars), (cols, var_idx)), shape=(len(self.positions), n_vars))
+        total_row = csr_matrix(np.ones((1, n_vars)))
+        budget_row = csr_matrix(np.array([[self.prices[i] for i, _ in keys]]))
+        
+        required = np.array([self.formation_req[p] for p in self.positions], dtype=float)
+        price_array = self.df['Fiyat_M'].to_numpy(dtype=float)
+        return {
+            'slot_cols': np.repeat(np.arange(len(self.positions)), required.astype(int)),
+            'price_array': price_array,
+            'big_m': 1e6,
+            'keys': keys,
+            'rows': rows,
+            'cols': cols,
+            'matrix': vstack([player_rows, position_rows, total_row, budget_row]).tocsr(),
+            'lb': np.concatenate([np.zeros(len(self.players)), required, [11.0], [-np.inf]]),
+            'ub': np.concatenate([np.ones(len(self.players)), required, [11.0], [0.0]]),
+            'integrality': np.ones(n_vars)
+        }
+    
+    def lp_duals(self, score_values: np.ndarray, budget: float) -> Optional[Dict]:
+        """
+        Modelin LP gevşetmesinden dual değerler ve indirgenmiş maliyetler.
+        
+        solve_fast'in seyrek kısıt matrisi (_build_highs) aynen kullanılır;
+        HiGHS tek bir LP çözer. Bütçe bağlayıcı değilse atama politopu tam
+        sayılıdır ve LP kadrosu MILP kadrosuyla aynıdır; bağlayıcıysa değerler
+        LP yaklaşımıdır ('tam_sayi' False döner).
+        
+        Tüm değerler maksimizasyon yönündedir:
+        - butce_golge_fiyati: +£1M bütçenin skor getirisi
+        - pozisyon_marjinal: pozisyona bir oyuncu daha gerekseydi skor değişimi
+          (toplam 11 kısıtının duali dahil)
+        - Marjinal_Değer: oyuncu kısıtının duali (kadrodaki oyuncunun değeri)
+        - Pozisyon: LP'de atandığı (seçilmeyenler için en yakın) pozisyon
+        - İndirgenmiş_Maliyet: seçilmeyen oyuncunun bu pozisyonda kadroya
+          girmeye aday olması için gereken skor artışı
+        
+        Atama LP'leri dejeneredir; dualler tek değildir ve indirgenmiş maliyet
+        gereken artışın alt sınırıdır (yedek oyuncularda sıkça 0). Kesin eşikler
+        için karşı-olgusal yeniden çözümler gerekir.
+        
+        Args:
+            score_values: self.df satırları x self.positions sırasında skor matrisi
+            budget: Bütçe üst limiti
+            
+        Returns:
+            Dict veya None (model/LP çözümsüzse)
+        """
+        if not self.feasible:
+            return None
+        
+        if self._highs is None:
+            self._highs = self._build_highs()
+        highs = self._highs
+        n_players, n_positions = len(self.players), len(self.positions)
+        
+        matrix = highs['matrix']
+        ub_rows = np.r_[np.arange(n_players), matrix.shape[0] - 1]
+        eq_rows = np.arange(n_players, n_players + n_positions + 1)
+        b_ub = np.r_[np.ones(n_players), budget]
+        b_eq = highs['ub'][eq_rows]
+        
+        scores = np.asarray(score_values, dtype=float)[highs['rows'], highs['cols']]
+        result = linprog(-scores, A_ub=matrix[ub_rows], b_ub=b_ub,
+                         A_eq=matrix[eq_rows], b_eq=b_eq, bounds=(0, None), method='highs')
+        if result.status != 0:
+            return None
+        
+        # HiGHS marjinalleri min(-skor) içindir: işaret çevrilerek maksimizasyona
+        player_dual = -result.ineqlin.marginals[:n_players]
+        budget_dual = -result.ineqlin.marginals[-1]
+        position_dual = -result.eqlin.marginals[:n_positions] - result.eqlin.marginals[-1]
+        reduced = np.maximum(result.lower.marginals, 0.0)
+        
+        # Oyuncu başına: LP'deki seçim oranı ve en küçük indirgenmiş maliyet
+        selected = np.zeros(n_players)
+        np.add.at(selected, highs['rows'], result.x)
+        gap = np.full((n_players, n_positions), np.inf)
+        gap[highs['rows'], highs['cols']] = reduced
+        share = np.zeros((n_players, n_positions))
+        share[highs['rows'], highs['cols']] = result.x
+        # LP'de seçilen oyuncu için atandığı pozisyon, diğerleri için en yakın pozisyon
+        nearest = np.where(selected > 1e-6, share.argmax(axis=1), gap.argmin(axis=1))
+        
+        players = pd.DataFrame({
+            'ID': self.df['ID'].to_numpy() if 'ID' in self.df.columns else self.players,
+            'Oyuncu': self.df['Oyuncu'].to_numpy() if 'Oyuncu' in self.df.columns else '',
+            'Seçim_Oranı': np.round(selected, 6),
+            'Marjinal_Değer': player_dual,
+            'Pozisyon': [self.positions[c] for c in nearest],
+            'İndirgenmiş_Maliyet': gap[np.arange(n_players), nearest]
+        }, index=self.df.index)
+        
+        return {
+            'lp_skoru': float(-result.fun),
+            'tam_sayi': bool(np.all(np.isclose(result.x, np.round(result.x), atol=1e-6))),
+            'butce_golge_fiyati': float(budget_dual),
+            'pozisyon_marjinal': dict(zip(self.positions, position_dual.tolist())),
+            'oyuncular': players
+        }
+    
+    def lineup_frame(self, selection: List[Tuple], score_values: np.ndarray) -> Tuple[pd.DataFrame, float, float]:
+        """
+        solve_fast / yerel arama seçiminden kadro DataFrame'i üretir (_extract ile aynı biçim).
+        
+        Returns:
+            Tuple: (selected_df, total_score, total_cost)
+        """
+        row_of = {index: row for row, index in enumerate(self.players)}
+        col_of = {p: col for col, p in enumerate(self.positions)}
+        order = sorted(selection, key=lambda key: (row_of[key[0]], col_of[key[1]]))
+        
+        selected_df = self.df.loc[[i for i, _ in order]].reset_index(drop=True)
+        selected_df['Atanan_Pozisyon'] = [p for _, p in order]
+        selected_df['Pozisyon_Skoru'] = [score_values[row_of[i], col_of[p]] for i, p in order]
+        
+        self._last_solution = order
+        return selected_df, float(selected_df['Pozisyon_Skoru'].sum()), float(selected_df['Fiyat_M'].sum())
+    
+    def solve_min_cost(
+        self,
+        score_matrix,
+        min_score: float,
+        warm_start: bool = False
+    ) -> Tuple[Optional[pd.DataFrame], float, float, str]:
+        """
+        Toplam skoru en az min_score olan EN UCUZ kadroyu bulur (bütçe kısıtı yok).
+        
+        Kısıt 1-3 ve uyumluluk aynen geçerlidir; amaç Σ Fiyat_i y[i,p] minimizasyonu,
+        ek kısıt Σ Skor[i,p] y[i,p] >= min_score. Bütçe kararlılık aralığı ve
+        epsilon-kısıt yöntemleri için kullanılır.
+        
+        Returns:
+            Tuple: (selected_df, total_score, total_cost, status)
+        """
+        if not self.feasible:
+            return None, 0, 0, 'Infeasible'
+        
+        if self._cost_model is None:
+            self._cost_model = LpProblem(name="Squad_Min_Cost", sense=LpMinimize)
+            self._cost_model.setObjective(
+                lpSum(self.prices[i] * var for (i, p), var in self.y.items())
+            )
+            for name, constraint in self.model.constraints.items():
+                if name != 'Budget':
+                    self._cost_model.addConstraint(constraint.copy(), name)
+        
+        score_values = self._score_values(score_matrix)
+        scores = {key: score_values[cell] for key, cell in self.cells.items()}
+        
+        if 'Min_Score' in self._cost_model.constraints:
+            del self._cost_model.constraints['Min_Score']
+        self._cost_model += lpSum(scores[key] * var for key, var in self.y.items()) >= min_score, "Min_Score"
+        
+        solver = PULP_CBC_CMD(msg=0, warmStart=self._set_warm_start(warm_start))
+        self._cost_model.solve(solver)
+        
+        status = LpStatus[self._cost_model.status]
+        
+        if status != 'Optimal':
+            return None, 0, 0, status
+        
+        return self._extract(scores)
+
+
 def solve_optimal_lineup(
     df: pd.DataFrame,
     formation: str,
     budget: float,
     strategy: str,
-    use_flexible_positions: bool = True
+    use_flexible_positions: bool = True,
+    score_matrix: Optional[pd.DataFrame] = None
 ) -> Tuple[Optional[pd.DataFrame], float, float, str]:
     """
     PuLP ile POZİSYON-OYUNCU ATAMA modeli kurarak optimal kadroyu belirler.
+    
+    Args:
+        score_matrix: Önceden hesaplanmış build_score_matrix() çıktısı.
+            Verilirse (ve df'in tüm index'lerini içeriyorsa) skorlar yeniden
+            hesaplanmaz; servis ve toplu analizler bunu önbellekten geçirir.
     """
     
     # =========================================================================
@@ -150,124 +658,197 @@ def solve_optimal_lineup(
         raise ValueError(f"Geçersiz strateji: {strategy}")
     
     # =========================================================================
-    # HAZIRLIK
+    # LP MODELİ - POZİSYON ATAMA (bkz. LineupModel)
     # =========================================================================
     
-    formation_req = FORMATIONS[formation]
-    
-    # Sadece sağlıklı oyuncuları al
-    df = df.copy()
-    df = df[df['Sakatlik'] == 0].copy()
+    lineup_model = LineupModel(df, formation)
     
-    if len(df) < 11:
+    if not lineup_model.feasible:
         return None, 0, 0, 'Infeasible'
     
-    players = df.index.tolist()
-    positions = list(formation_req.keys())
+    # SKOR MATRİSİNİ HESAPLA: Scores[i, p] (vektörize)
+    if score_matrix is None:
+        score_matrix = build_score_matrix(lineup_model.df, strategy, lineup_model.positions)
     
-    # SKOR MATRİSİNİ HESAPLA: Scores[i, p]
-    # Bu işlem biraz maliyetli olabilir ama 600 oyuncu x 11 pozisyon = 6600 işlem (hızlı)
-    scores = {}
-    for i in players:
-        row = df.loc[i]
-        for p in positions:
-            # Oyuncunun bu pozisyona uygun olup olmadığını kontrol et
-            # Eğer uygun değilse skor hesaplamaya bile gerek yok (veya 0 ver)
-            eligible_positions = POSITION_CAN_BE_FILLED_BY.get(p, [p])
-            if row['Alt_Pozisyon'] in eligible_positions:
-                scores[(i, p)] = calculate_position_score(row, p, strategy)
-            else:
-                scores[(i, p)] = -1000 # Cezalı puan (veya constraint ile engellenecek)
-
     # =========================================================================
-    # LP MODELİ - POZİSYON ATAMA
+    # ÇÖZÜM
     # =========================================================================
     
-    model = LpProblem(name="Squad_Assignment", sense=LpMaximize)
+    return lineup_model.solve(score_matrix, budget)
+
+
+def lineup_duals(
+    df: pd.DataFrame,
+    formation: str,
+    budget: float,
+    strategy: str,
+    score_matrix: Optional[pd.DataFrame] = None
+) -> Optional[Dict]:
+    """
+    solve_optimal_lineup ile aynı model için LP dual değerleri (LineupModel.lp_duals).
     
-    # Karar değişkenleri: y[i,p] = oyuncu i, pozisyon p'ye atandı mı?
-    y = {}
-    for i in players:
-        for p in positions:
-            y[(i, p)] = LpVariable(name=f"y_{i}_{p}", cat=LpBinary)
+    Args:
+        score_matrix: Önceden hesaplanmış build_score_matrix() çıktısı (opsiyonel)
+    """
+    lineup_model = LineupModel(df, formation)
+    if not lineup_model.feasible:
+        return None
+    if score_matrix is None:
+        score_matrix = build_score_matrix(lineup_model.df, strategy, lineup_model.positions)
+    return lineup_model.lp_duals(lineup_model._score_values(score_matrix), budget)
+
+
+def _lineup_objective(rows: np.ndarray, cols: np.ndarray, scores: np.ndarray,
+                      chemistry: np.ndarray, pair_weight: float) -> float:
+    sub = chemistry[np.ix_(rows, rows)]
+    return float(scores[rows, cols].sum() + pair_weight * sub.sum() / 2)
+
+
+def solve_chemistry_lineup(
+    df: pd.DataFrame,
+    formation: str,
+    budget: float,
+    strategy: str,
+    chemistry_weight: float = 5.0,
+    time_limit: float = 2.0,
+    max_restarts: int = 50,
+    candidates_per_position: int = 8,
+    seed: int = 42,
+    score_matrix: Optional[pd.DataFrame] = None
+) -> Tuple[Optional[pd.DataFrame], float, float, str]:
+    """
+    Oyuncu kimyasını (CompatibilityAnalyzer çift uyumluluğu) amaca katan optimizasyon.
     
-    # =========================================================================
-    # AMAÇ FONKSİYONU
-    # =========================================================================
+    Amaç: Σ Skor[i,p] y[i,p] + chemistry_weight × (kadronun ortalama çift uyumluluğu)
     
-    # Toplam skoru maksimize et
-    # Uyumsuz atamalar (score < 0) zaten elenecek
-    model += lpSum(
-        scores[(i, p)] * y[(i, p)] 
-        for i in players 
-        for p in positions
-        if scores[(i, p)] > -500 # Sadece geçerli skorları topla
-    ), "Total_Score"
+    Çift terimleri modeli karesel yapar; bunun yerine MILP çözümünden
+    (LineupModel.solve_fast) başlayan yinelemeli yerel arama kullanılır:
+    - Aday budama: pozisyon başına skora göre en iyi ve en ucuz
+      candidates_per_position oyuncu (+ başlangıç kadrosu); çift matrisi
+      yalnızca bu küme için kurulur
+    - Her adımda tüm (ilk 11 oyuncusu, aday) değişimleri tek seferde
+      vektörize puanlanır, bütçeyi aşanlar elenir, en iyi iyileştirme uygulanır
+    - Her değişimden sonra 11 oyuncunun pozisyonları Macar algoritmasıyla yeniden atanır
+    - Yerel optimumda rastgele 1-2 oyuncu değiştirilerek (pertürbasyon) arama yeniden başlar
     
-    # =========================================================================
-    # KISITLAR
-    # =========================================================================
+    time_limit ve max_restarts kalite-süre dengesini belirler; çalışma süresi
+    time_limit ile sınırlıdır. Dönen total_score yalnızca pozisyon skorlarıdır.
+    Sonuç optimal olduğu kanıtlanmış bir çözüm değildir; status 'Heuristic' döner.
     
-    # Kısıt 1: Her oyuncu EN FAZLA 1 pozisyona atanabilir
-    for i in players:
-        model += lpSum(y[(i, p)] for p in positions) <= 1, f"Player_{i}_Max_One_Position"
+    Returns:
+        Tuple: (selected_df, total_score, total_cost, status)
+    """
+    from .compatibility import pair_compatibility_matrix
     
-    # Kısıt 2: Her pozisyon için TAM gereken sayıda oyuncu
-    for p, required in formation_req.items():
-        model += lpSum(y[(i, p)] for i in players) == required, f"Position_{p}_Exact"
+    if formation not in FORMATIONS:
+        raise ValueError(f"Geçersiz formasyon: {formation}")
     
-    # Kısıt 3: Toplam 11 oyuncu
-    model += lpSum(y[(i, p)] for i in players for p in positions) == 11, "Total_11"
+    if strategy not in STRATEGY_WEIGHTS:
+        raise ValueError(f"Geçersiz strateji: {strategy}")
     
-    # Kısıt 4: Bütçe
-    model += lpSum(
-        df.loc[i, 'Fiyat_M'] * lpSum(y[(i, p)] for p in positions)
-        for i in players
-    ) <= budget, "Budget"
+    start = time.perf_counter()
+    lineup_model = LineupModel(df, formation)
+    if not lineup_model.feasible:
+        return None, 0, 0, 'Infeasible'
     
-    # Kısıt 5: UYUMLULUK
-    for i in players:
-        for p in positions:
-            if scores[(i, p)] < -500:
-                model += y[(i, p)] == 0, f"Compat_{i}_{p}"
+    if score_matrix is None:
+        score_matrix = build_score_matrix(lineup_model.df, strategy, lineup_model.positions)
+    score_values = lineup_model._score_values(score_matrix)
     
-    # =========================================================================
-    # ÇÖZÜM
-    # =========================================================================
+    # Başlangıç: kimyasız MILP optimumu
+    selection, _, status = lineup_model.solve_fast(score_values, budget)
+    if status != 'Optimal':
+        return None, 0, 0, status
     
-    solver = PULP_CBC_CMD(msg=0)
-    model.solve(solver)
+    row_of = {index: row for row, index in enumerate(lineup_model.players)}
+    col_of = {p: col for col, p in enumerate(lineup_model.positions)}
+    eligible_all = lineup_model.eligible
+    prices_all = lineup_model.df['Fiyat_M'].to_numpy(dtype=float)
     
-    status = LpStatus[model.status]
+    # ---- Aday budama ----
+    keep = {row_of[i] for i, _ in selection}
+    for col in range(len(lineup_model.positions)):
+        rows = np.flatnonzero(eligible_all[:, col])
+        keep.update(rows[np.argsort(-score_values[rows, col], kind='stable')[:candidates_per_position]].tolist())
+        keep.update(rows[np.argsort(prices_all[rows], kind='stable')[:max(1, candidates_per_position // 2)]].tolist())
+    pool = np.array(sorted(keep))
     
-    if status != 'Optimal':
-        return None, 0, 0, status
+    scores = score_values[pool]
+    eligible = eligible_all[pool]
+    prices = prices_all[pool]
+    chemistry = pair_compatibility_matrix(lineup_model.df.iloc[pool])
+    pair_weight = chemistry_weight / 55.0  # 11 oyuncu → 55 çift: ortalama uyumluluk
     
-    # =========================================================================
-    # SONUÇLARI ÇIKAR
-    # =========================================================================
+    slot_cols = np.repeat(
+        np.arange(len(lineup_model.positions)),
+        [lineup_model.formation_req[p] for p in lineup_model.positions]
+    )
     
-    selected_data = []
-    total_score = 0
+    def reassign(rows: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Seçili 11 oyuncunun pozisyonlarını en iyi şekilde dağıtır."""
+        slot_scores = np.where(eligible[np.ix_(rows, slot_cols)], scores[np.ix_(rows, slot_cols)], -1e6)
+        r, c = linear_sum_assignment(-slot_scores)
+        return rows[r], slot_cols[c]
     
-    for i in players:
-        for p in positions:
-            if y[(i, p)].varValue == 1:
-                row_data = df.loc[i].to_dict()
-                row_data['Atanan_Pozisyon'] = p
-                # Hesaplanan skoru da kaydet (görselleştirme için)
-                row_data['Pozisyon_Skoru'] = scores[(i, p)]
-                selected_data.append(row_data)
-                total_score += scores[(i, p)]
+    def local_search(rows: np.ndarray, cols: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        rows, cols = rows.copy(), cols.copy()
+        while time.perf_counter() - start < time_limit:
+            in_lineup = np.zeros(len(pool), dtype=bool)
+            in_lineup[rows] = True
+            chem_sum = chemistry[:, rows].sum(axis=1)
+            cost = prices[rows].sum()
+            
+            # Δ[c, k]: k. slottaki oyuncunun yerine c adayı
+            delta = (
+                scores[:, cols] - scores[rows, cols]
+                + pair_weight * (chem_sum[:, np.newaxis] - chemistry[:, rows] - chem_sum[rows])
+            )
+            feasible = (
+                eligible[:, cols] & ~in_lineup[:, np.newaxis]
+                & (cost - prices[rows] + prices[:, np.newaxis] <= budget + 1e-9)
+            )
+            delta = np.where(feasible, delta, -np.inf)
+            
+            cand, slot = np.unravel_index(np.argmax(delta), delta.shape)
+            if not delta[cand, slot] > 1e-9:
                 break
+            rows[slot] = cand
+            rows, cols = reassign(rows)
+        return rows, cols
     
-    if len(selected_data) != 11:
-        return None, 0, 0, 'Infeasible'
+    rng = np.random.default_rng(seed)
+    pool_pos = {row: k for k, row in enumerate(pool)}
+    rows = np.array([pool_pos[row_of[i]] for i, _ in selection])
+    cols = np.array([col_of[p] for _, p in selection])
     
-    selected_df = pd.DataFrame(selected_data)
-    total_cost = selected_df['Fiyat_M'].sum()
+    rows, cols = local_search(rows, cols)
+    best = (rows, cols, _lineup_objective(rows, cols, scores, chemistry, pair_weight))
+    
+    for _ in range(max_restarts):
+        if time.perf_counter() - start >= time_limit:
+            break
+        # Pertürbasyon: en iyi kadrodan 1-2 oyuncuyu uygun rastgele adaylarla değiştir
+        rows, cols = best[0].copy(), best[1].copy()
+        for slot in rng.choice(11, size=rng.integers(1, 3), replace=False):
+            in_lineup = np.zeros(len(pool), dtype=bool)
+            in_lineup[rows] = True
+            cost = prices[rows].sum() - prices[rows[slot]]
+            options = np.flatnonzero(eligible[:, cols[slot]] & ~in_lineup & (cost + prices <= budget + 1e-9))
+            if len(options):
+                rows[slot] = rng.choice(options)
+        rows, cols = local_search(*reassign(rows))
+        objective = _lineup_objective(rows, cols, scores, chemistry, pair_weight)
+        if objective > best[2] + 1e-9:
+            best = (rows, cols, objective)
     
-    return selected_df, total_score, total_cost, status
+    rows, cols = best[0], best[1]
+    selection = [(lineup_model.players[pool[r]], lineup_model.positions[c]) for r, c in zip(rows, cols)]
+    selected_df, total_score, total_cost = lineup_model.lineup_frame(selection, score_values)
+    
+    # Oyuncunun diğer 10 oyuncuyla ortalama uyumluluğu
+    selected_df['Kimya_Katkısı'] = np.round(pair_compatibility_matrix(selected_df).sum(axis=1) / 10, 1)
+    
+    return selected_df, total_score, total_cost, 'Heuristic'
 
 
 def solve_with_fallback(
@@ -328,6 +909,64 @@ def check_formation_availability(df: pd.DataFrame, formation: str) -> dict:
     return result
 
 
+def formation_availability_sweep(
+    df: pd.DataFrame,
+    formation: str,
+    thresholds,
+    column: str = 'Rating'
+) -> Dict:
+    """
+    check_formation_availability'nin eşik taraması için vektörize hali.
+    
+    Sağlıklı oyuncular x eşikler maskesi bir kez kurulur; her pozisyon için
+    uygun (esnek dahil) oyuncu sayıları ve bütçe alt sınırı tüm eşiklerde
+    tek seferde hesaplanır. Alt sınır, her pozisyonun gereken sayıdaki en
+    ucuz uygun oyuncularının toplamıdır (gerçek kadro bundan ucuz olamaz).
+    
+    Args:
+        df: Oyuncu verileri
+        formation: Formasyon adı
+        thresholds: column için minimum değerler
+        column: Eşik uygulanan sütun (varsayılan Rating)
+        
+    Returns:
+        dict: esikler, pozisyonlar, gerekli, mevcut (eşik x pozisyon),
+            uygun (eşik), min_maliyet (eşik), oyuncu_sayisi (eşik)
+    """
+    formation_req = FORMATIONS[formation]
+    positions = list(formation_req.keys())
+    healthy_df = df[df['Sakatlik'] == 0] if 'Sakatlik' in df.columns else df
+    thresholds = np.asarray(thresholds, dtype=float)
+    required = np.array([formation_req[p] for p in positions])
+    
+    # Fiyata göre sırala: kümülatif sayımla en ucuz k oyuncu seçilir
+    order = np.argsort(healthy_df['Fiyat_M'].to_numpy(dtype=float), kind='stable')
+    prices = healthy_df['Fiyat_M'].to_numpy(dtype=float)[order]
+    values = healthy_df[column].to_numpy(dtype=float)[order]
+    sub_pos = healthy_df['Alt_Pozisyon'].to_numpy()[order]
+    
+    passes = values[np.newaxis, :] >= thresholds[:, np.newaxis]          # eşik x oyuncu
+    eligible = np.column_stack([
+        np.isin(sub_pos, POSITION_CAN_BE_FILLED_BY.get(p, [p])) for p in positions
+    ])                                                                    # oyuncu x pozisyon
+    mask = passes[:, :, np.newaxis] & eligible[np.newaxis, :, :]          # eşik x oyuncu x pozisyon
+    
+    available = mask.sum(axis=1)
+    cheapest = mask & (np.cumsum(mask, axis=1) <= required[np.newaxis, np.newaxis, :])
+    min_cost = (cheapest * prices[np.newaxis, :, np.newaxis]).sum(axis=(1, 2))
+    player_count = passes.sum(axis=1)
+    
+    return {
+        'esikler': thresholds,
+        'pozisyonlar': positions,
+        'gerekli': required,
+        'mevcut': available,
+        'uygun': (available >= required).all(axis=1) & (player_count >= 11),
+        'min_maliyet': min_cost,
+        'oyuncu_sayisi': player_count
+    }
+
+
 def get_optimization_summary(
     selected_df: pd.DataFrame, 
     total_score: float, 
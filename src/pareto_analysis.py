@@ -10,98 +10,399 @@ Multi-Objective Optimization:
 - Trade-off analizi
 
 Bu modül:
-1. Pareto optimal çözümleri üret
+1. Pareto optimal çözümleri üret (ε-kısıt yöntemi, formasyon/pozisyon kısıtlı)
 2. Trade-off eğrilerini çiz
 3. Efficient frontier'i göster
 4. Karar vericiye en iyi seçenekleri sun
+5. N amaçlı (kalite, maliyet, derinlik riski) baskın olunmayan kadro arşivi
 =============================================================================
 """
 
+from concurrent.futures import ThreadPoolExecutor
+
 import pandas as pd
 import numpy as np
 from typing import Dict, List, Tuple, Optional
+from .optimizer import INELIGIBLE_SCORE, LineupModel, build_score_matrix
+
+
+# Pareto amaçları: kalite (maksimize) - maliyet (minimize)
+# rating: kadro Rating toplamı, skor: strateji bazlı pozisyon skoru (build_score_matrix)
+PARETO_OBJECTIVES = ['rating', 'skor']
+
+# ε-kısıt adımında maliyetteki en küçük anlamlı fark (Milyon £)
+COST_RESOLUTION = 1e-3
+
+
+def _top_k_positions(values: np.ndarray, k: int) -> np.ndarray:
+    """
+    DataFrame.nlargest(k) eşdeğeri pozisyonel indeksler (büyükten küçüğe).
+    
+    argpartition ile O(n) seçim yapılır; sınırdaki eşitliklerde nlargest gibi
+    önce gelen satır tercih edilir. NaN değerler seçilmez.
+    """
+    values = np.where(np.isnan(values), -np.inf, values)
+    k = min(k, len(values))
+    if k <= 0:
+        return np.array([], dtype=int)
+    kth_value = values[np.argpartition(values, len(values) - k)[len(values) - k]]
+    candidates = np.flatnonzero(values >= kth_value)
+    order = np.lexsort((candidates, -values[candidates]))
+    return candidates[order[:k]]
+
+
+def nondominated_mask(points: np.ndarray, block_size: int = 256) -> np.ndarray:
+    """
+    Baskın olunmayan noktaların maskesi (tüm amaçlar MİNİMİZE edilir).
+    
+    Noktalar sözlük sırasına dizilir; bir noktayı baskılayabilecek her nokta
+    sıralamada ondan önce gelir. Noktalar bloklar halinde, o ana kadarki
+    cephe ve bloktaki önceki noktalarla vektörize karşılaştırılır:
+    O(n x cephe boyutu) - ikili O(n²) taramaya gerek kalmaz. Aynı noktalardan
+    yalnızca ilki tutulur.
+    
+    Args:
+        points: (n, amaç sayısı) dizi
+        block_size: Vektörize karşılaştırma blok boyutu
+        
+    Returns:
+        np.ndarray: (n,) bool maske
+    """
+    points = np.asarray(points, dtype=float)
+    mask = np.zeros(len(points), dtype=bool)
+    if len(points) == 0:
+        return mask
+    
+    order = np.lexsort(points.T[::-1])
+    ordered = points[order]
+    front = np.empty((0, points.shape[1]))
+    
+    for start in range(0, len(ordered), block_size):
+        block = ordered[start:start + block_size]
+        # j, i'yi zayıf baskılıyor: tüm amaçlarda <= (eşitlik = tekrar)
+        dominated = (front[np.newaxis, :, :] <= block[:, np.newaxis, :]).all(axis=2).any(axis=1)
+        within = (block[np.newaxis, :, :] <= block[:, np.newaxis, :]).all(axis=2)
+        dominated |= (within & np.tri(len(block), k=-1, dtype=bool)).any(axis=1)
+        
+        front = np.vstack([front, block[~dominated]])
+        mask[order[start:start + len(block)][~dominated]] = True
+    
+    return mask
+
+
+class ParetoArchive:
+    """
+    N amaçlı baskın olunmayan çözüm arşivi.
+    
+    Amaçlar {'ad': 'max' | 'min'} olarak verilir. Yeni adaylar toplu eklenir;
+    arşive baskın olunan adaylar alınmaz, yeni adayların baskıladığı eski
+    çözümler arşivden çıkarılır. Binlerce aday için nondominated_mask kullanılır.
+    """
+    
+    def __init__(self, objectives: Dict[str, str]):
+        self.objectives = dict(objectives)
+        self.names = list(self.objectives)
+        self._sign = np.array([-1.0 if sense == 'max' else 1.0 for sense in self.objectives.values()])
+        self._points = np.empty((0, len(self.names)))
+        self._payloads: List[Dict] = []
+    
+    def __len__(self) -> int:
+        return len(self._payloads)
+    
+    def add(self, values: np.ndarray, payloads: Optional[List[Dict]] = None) -> int:
+        """
+        Adayları arşive ekler.
+        
+        Args:
+            values: (m, amaç sayısı) amaç değerleri (orijinal yönleriyle)
+            payloads: Her aday için ek bilgi (kadro vb.)
+            
+        Returns:
+            int: Arşive giren yeni aday sayısı
+        """
+        values = np.atleast_2d(np.asarray(values, dtype=float))
+        if len(values) == 0:
+            return 0
+        payloads = list(payloads) if payloads is not None else [{} for _ in range(len(values))]
+        
+        # Mevcut arşiv önce gelir: eşit noktalarda eski çözüm tutulur
+        combined = np.vstack([self._points, values * self._sign])
+        mask = nondominated_mask(combined)
+        n_old = len(self._points)
+        
+        self._points = combined[mask]
+        self._payloads = [p for p, keep in zip(self._payloads + payloads, mask) if keep]
+        return int(mask[n_old:].sum())
+    
+    def values(self) -> np.ndarray:
+        """Arşivdeki amaç değerleri (orijinal yönleriyle)."""
+        return self._points * self._sign
+    
+    def to_frame(self) -> pd.DataFrame:
+        """Arşivi amaç sütunları ve ek bilgilerle DataFrame olarak döndürür."""
+        frame = pd.DataFrame(self.values(), columns=self.names)
+        extras = pd.DataFrame(self._payloads, index=frame.index)
+        return pd.concat([frame, extras], axis=1)
+
+
+# Çok amaçlı arşivin amaçları: kalite, maliyet, derinlik riski
+ARCHIVE_OBJECTIVES = {'Kalite': 'max', 'Maliyet': 'min', 'Derinlik_Riski': 'min'}
 
 
 class ParetoAnalyzer:
     """Multi-objective optimizasyon ve Pareto analizi."""
     
-    def __init__(self, all_players: pd.DataFrame, budget: float = 100.0):
+    def __init__(self, all_players: pd.DataFrame, budget: float = 100.0,
+                 formation: str = '4-3-3', strategy: str = 'Dengeli',
+                 objective: str = 'rating'):
+        if objective not in PARETO_OBJECTIVES:
+            raise ValueError(f"Geçersiz amaç: {objective}")
+        
+        # Paylaşılan (önbellekteki) tablo salt okunur kullanılır; skorlar dizilerde hesaplanır
         self.all_players = all_players
         self.budget = budget
+        self.formation = formation
+        self.strategy = strategy
+        self.objective = objective
+        self._ratings = all_players['Rating'].to_numpy(dtype=float)
+        self._prices = all_players['Fiyat_M'].to_numpy(dtype=float)
+    
+    def _quality_matrix(self, model: LineupModel) -> np.ndarray:
+        """Kalite amacının oyuncu x pozisyon matrisi."""
+        if self.objective == 'skor':
+            return build_score_matrix(model.df, self.strategy, model.positions).to_numpy()
+        rating = model.df['Rating'].to_numpy(dtype=float)
+        return np.repeat(rating[:, np.newaxis], len(model.positions), axis=1)
     
-    def generate_pareto_frontier(self, num_solutions: int = 20) -> pd.DataFrame:
+    def _frontier_point(self, model: LineupModel, quality: np.ndarray, epsilon: float) -> Optional[Dict]:
         """
-        Pareto frontier'ını oluştur.
+        ε-kısıt adımı: maliyet <= ε altında en yüksek kalite, ardından aynı
+        kaliteyi veren en ucuz kadro (zayıf baskın noktalar elenir).
+        """
+        squad, best_quality, cost, status = model.solve(quality, epsilon)
+        if status != 'Optimal':
+            return None
+        
+        # İlk çözüm, minimum maliyet modeli için uygun bir warm start'tır
+        cheaper, cheaper_quality, cheaper_cost, cheaper_status = model.solve_min_cost(
+            quality, best_quality - 1e-6, warm_start=True
+        )
+        if cheaper_status == 'Optimal' and cheaper_cost < cost:
+            squad, best_quality, cost = cheaper, cheaper_quality, cheaper_cost
+        
+        return {'squad': squad, 'quality': float(best_quality), 'cost': float(cost)}
+    
+    def _walk_segment(self, upper: float, lower: float, step: float) -> List[Dict]:
+        """
+        [lower, upper] maliyet aralığındaki sınır noktalarını yukarıdan aşağı gezer.
+        
+        Her adımda ε, bulunan noktanın maliyetinin hemen altına iner (adaptif
+        adım); nokta aralığın altına düşerse aralıkta yeni baskın olmayan
+        nokta kalmamıştır ve o nokta komşu aralığa bırakılır.
+        """
+        model = LineupModel(self.all_players, self.formation)
+        if not model.feasible:
+            return []
+        quality = self._quality_matrix(model)
+        
+        points = []
+        epsilon = upper
+        while epsilon >= lower:
+            point = self._frontier_point(model, quality, epsilon)
+            if point is None or (point['cost'] < lower and points):
+                break
+            points.append(point)
+            if point['cost'] < lower:
+                break
+            epsilon = point['cost'] - max(step, COST_RESOLUTION)
+        return points
+    
+    def generate_pareto_frontier(self, num_solutions: Optional[int] = 20,
+                                 max_workers: int = 4) -> pd.DataFrame:
+        """
+        Pareto frontier'ını oluştur (kesin, ε-kısıt yöntemi).
         
         Hedefler:
-        - Maksimize: Ortalama Rating
+        - Maksimize: Kalite (Rating toplamı ya da pozisyon skoru)
         - Minimize: Toplam Maliyet
         
+        Her nokta formasyon ve pozisyon uygunluğu kısıtlarıyla optimizer'ın
+        atama modelinde (LineupModel) çözülür. Maliyet ekseni bağımsız
+        aralıklara bölünür ve aralıklar paralel gezilir.
+        
+        Args:
+            num_solutions: Yaklaşık nokta sayısı; ardışık noktalar arasındaki
+                en küçük maliyet farkını belirler. None ise tüm sınır bulunur.
+            max_workers: Paralel gezilen aralık (thread) sayısı
+            
         Returns:
             DataFrame: Pareto optimal kadrolar
         """
-        pareto_solutions = []
+        base_model = LineupModel(self.all_players, self.formation)
+        if not base_model.feasible:
+            return pd.DataFrame()
         
-        # Farklı ağırlık kombinasyonları ile çözüm bul
-        for i in range(num_solutions):
-            weight_rating = i / (num_solutions - 1) if num_solutions > 1 else 0.5
-            weight_cost = 1 - weight_rating
-            
-            # Oyunculara skor ver
-            self.all_players['_pareto_score'] = (
-                (self.all_players['Rating'] / 100) * weight_rating -
-                (self.all_players['Fiyat_M'] / self.budget) * weight_cost
-            )
-            
-            # En iyi 11'i seç (basit seçim)
-            selected = self.all_players.nlargest(11, '_pareto_score').copy()
-            
-            total_cost = selected['Fiyat_M'].sum()
-            
-            # Bütçe içinde mi?
-            if total_cost <= self.budget:
-                avg_rating = selected['Rating'].mean()
-                
-                # Bu çözüm zaten bulundu mu?
-                is_dominated = False
-                for sol in pareto_solutions:
-                    if (sol['avg_rating'] >= avg_rating and sol['total_cost'] <= total_cost):
-                        is_dominated = True
-                        break
-                
-                if not is_dominated:
-                    # Eski çözümleri kontrol et (bu yeni çözüm onları dominate ediyor mu?)
-                    pareto_solutions = [
-                        sol for sol in pareto_solutions
-                        if not (avg_rating >= sol['avg_rating'] and total_cost <= sol['total_cost'])
-                    ]
-                    
-                    pareto_solutions.append({
-                        'avg_rating': round(avg_rating, 1),
-                        'total_cost': round(total_cost, 1),
-                        'squad': selected,
-                        'budget_utilization': round((total_cost / self.budget) * 100, 1),
-                        'solution_id': i
-                    })
+        # Alt uç: en ucuz geçerli kadronun maliyeti
+        _, _, min_cost, status = base_model.solve_min_cost(self._quality_matrix(base_model), -1e9)
+        if status != 'Optimal' or min_cost > self.budget:
+            return pd.DataFrame()
+        
+        span = self.budget - min_cost
+        step = span / (num_solutions - 1) if num_solutions and num_solutions > 1 else 0.0
+        n_segments = max(1, min(max_workers, num_solutions or max_workers))
+        bounds = np.linspace(self.budget, min_cost, n_segments + 1)
+        segments = [(bounds[k], bounds[k + 1]) for k in range(n_segments)]
+        
+        with ThreadPoolExecutor(max_workers=n_segments) as executor:
+            walked = list(executor.map(lambda seg: self._walk_segment(seg[0], seg[1], step), segments))
+        
+        # Aralık sınırlarında tekrar bulunan ve baskın olunan noktaları ele
+        candidates = sorted(
+            (point for points in walked for point in points),
+            key=lambda point: (point['cost'], -point['quality'])
+        )
+        pareto_solutions = []
+        for point in candidates:
+            if not pareto_solutions or point['quality'] > pareto_solutions[-1]['quality'] + 1e-6:
+                pareto_solutions.append(point)
         
         # Sırala
-        pareto_solutions = sorted(pareto_solutions, key=lambda x: x['avg_rating'], reverse=True)
+        pareto_solutions = sorted(pareto_solutions, key=lambda x: x['quality'], reverse=True)
         
         # DataFrame'e dönüştür
         results = []
         for i, sol in enumerate(pareto_solutions):
-            results.append({
+            total_cost = sol['cost']
+            row = {
                 'Sıra': i + 1,
-                'Ortalama Rating': sol['avg_rating'],
-                'Toplam Maliyet': f"£{sol['total_cost']:.1f}M",
-                'Bütçe Kullanımı': f"{sol['budget_utilization']:.1f}%",
-                'Kalan Bütçe': f"£{self.budget - sol['total_cost']:.1f}M",
+                'Ortalama Rating': round(sol['squad']['Rating'].mean(), 1),
+                'Toplam Maliyet': f"£{total_cost:.1f}M",
+                'Bütçe Kullanımı': f"{(total_cost / self.budget) * 100:.1f}%",
+                'Kalan Bütçe': f"£{self.budget - total_cost:.1f}M",
                 'Kadro': sol['squad'],
-                '_raw_cost': sol['total_cost']
-            })
+                '_raw_cost': round(total_cost, 1)
+            }
+            if self.objective == 'skor':
+                row['Toplam Skor'] = round(sol['quality'], 2)
+            results.append(row)
         
         return pd.DataFrame(results)
     
+    def _depth_tables(self, model: LineupModel) -> Tuple[np.ndarray, List[np.ndarray]]:
+        """
+        Pozisyon bazlı yedek tabloları.
+        
+        Returns:
+            Tuple: (oyuncu x pozisyon yedek farkı, pozisyon başına Rating'e göre
+            sıralı uygun oyuncu satırları)
+        """
+        ratings = model.df['Rating'].to_numpy(dtype=float)
+        gaps = np.zeros(model.eligible.shape)
+        ranked = []
+        for col in range(len(model.positions)):
+            rows = np.flatnonzero(model.eligible[:, col])
+            rows = rows[np.argsort(-ratings[rows], kind='stable')]
+            ranked.append(rows)
+            if len(rows) == 0:
+                continue
+            # Oyuncu yokken bu pozisyondaki en iyi alternatif
+            best_other = np.full(len(rows), ratings[rows[0]])
+            best_other[0] = ratings[rows[1]] if len(rows) > 1 else 0.0
+            gaps[rows, col] = np.maximum(ratings[rows] - best_other, 0.0)
+        return gaps, ranked
+    
+    @staticmethod
+    def _lineup_depth_risk(rows: List[int], cols: List[int], ratings: np.ndarray,
+                           ranked: List[np.ndarray]) -> float:
+        """
+        Kadronun derinlik riski: bir ilk 11 oyuncusu eksildiğinde, pozisyonuna
+        girebilecek en iyi kadro dışı oyuncuya göre ortalama Rating kaybı.
+        Yedeği olmayan oyuncu için kayıp Rating'in tamamıdır.
+        """
+        in_lineup = set(rows)
+        losses = []
+        for row, col in zip(rows, cols):
+            backup = next((r for r in ranked[col] if r not in in_lineup), None)
+            backup_rating = ratings[backup] if backup is not None else 0.0
+            losses.append(max(ratings[row] - backup_rating, 0.0))
+        return float(np.mean(losses))
+    
+    def generate_objective_archive(self, n_candidates: int = 2000, seed: int = 42,
+                                   batch_size: int = 200,
+                                   archive: Optional[ParetoArchive] = None) -> ParetoArchive:
+        """
+        Kalite - Maliyet - Derinlik riski için baskın olunmayan kadro arşivi.
+        
+        Adaylar optimizer'ın atama modeliyle farklı koşullar altında üretilir:
+        maliyet cezası (μ), yedek farkı cezası (λ) ve rastgele dışlanan güçlü
+        oyuncular. Her aday hızlı motorla (LineupModel.solve_fast) çözülür,
+        bütçeyi aşanlar elenir ve adaylar batch'ler halinde arşive eklenir.
+        
+        Args:
+            n_candidates: Üretilecek aday kadro sayısı
+            seed: Rastgelelik tohumu
+            batch_size: Arşive toplu ekleme boyutu
+            archive: Genişletilecek mevcut arşiv (varsayılan: yeni arşiv)
+            
+        Returns:
+            ParetoArchive: Kalite (max), Maliyet (min), Derinlik_Riski (min)
+        """
+        archive = archive or ParetoArchive(ARCHIVE_OBJECTIVES)
+        model = LineupModel(self.all_players, self.formation)
+        if not model.feasible:
+            return archive
+        
+        rng = np.random.default_rng(seed)
+        quality = build_score_matrix(model.df, self.strategy, model.positions).to_numpy()
+        prices = model.df['Fiyat_M'].to_numpy(dtype=float)
+        ratings = model.df['Rating'].to_numpy(dtype=float)
+        names = model.df['Oyuncu'].to_numpy()
+        gaps, ranked = self._depth_tables(model)
+        row_of = {index: row for row, index in enumerate(model.players)}
+        col_of = {p: col for col, p in enumerate(model.positions)}
+        
+        # Dışlama adayları: Rating'e göre en güçlü 22 oyuncu
+        strongest = np.argsort(-ratings, kind='stable')[:22]
+        # Ceza ölçeği: oyuncu başına ortalama skorun pahalı oyuncu fiyatına oranı
+        cost_scale = np.nanmean(np.where(model.eligible, quality, np.nan)) / max(prices.max(), 1e-9)
+        
+        seen = set()
+        values, payloads = [], []
+        for k in range(n_candidates):
+            mu = 10 ** rng.uniform(-2.0, 1.0) * cost_scale
+            lam = rng.uniform(0.0, 2.0)
+            scores = quality - mu * prices[:, np.newaxis] - lam * gaps
+            n_excluded = rng.integers(0, 3)
+            if n_excluded:
+                scores[rng.choice(strongest, n_excluded, replace=False)] = INELIGIBLE_SCORE
+            
+            # Bütçe cezayla yönlendirilir: bütçesiz atama (Macar) yeterli, aşanlar elenir
+            selection, _, status = model.solve_fast(scores, np.inf)
+            rows = [row_of[i] for i, _ in selection]
+            cols = [col_of[p] for _, p in selection]
+            key = frozenset(zip(rows, cols))
+            cost = prices[rows].sum() if rows else np.inf
+            
+            if status == 'Optimal' and key not in seen and cost <= self.budget \
+                    and scores[rows, cols].min() > INELIGIBLE_SCORE:
+                seen.add(key)
+                values.append([
+                    quality[rows, cols].sum(),
+                    cost,
+                    self._lineup_depth_risk(rows, cols, ratings, ranked)
+                ])
+                payloads.append({
+                    'Ortalama Rating': round(ratings[rows].mean(), 1),
+                    'Oyuncular': ', '.join(names[rows]),
+                    'Atama': tuple((model.players[r], model.positions[c]) for r, c in zip(rows, cols)),
+                })
+            
+            if len(values) >= batch_size or (k == n_candidates - 1 and values):
+                archive.add(np.array(values), payloads)
+                values, payloads = [], []
+        
+        return archive
+    
     def analyze_trade_offs(self, solution1: pd.DataFrame, solution2: pd.DataFrame) -> Dict:
         """
         İki çözüm arasındaki trade-off analizi.
@@ -212,6 +513,12 @@ class ParetoAnalyzer:
         target_rating = target_squad['Rating'].mean()
         target_cost = target_squad['Fiyat_M'].sum()
         
+        if all_players is self.all_players:
+            ratings, prices = self._ratings, self._prices
+        else:
+            ratings = all_players['Rating'].to_numpy(dtype=float)
+            prices = all_players['Fiyat_M'].to_numpy(dtype=float)
+        
         alternatives = []
         
         # Farklı cost levels'te optimal rating ara
@@ -223,14 +530,12 @@ class ParetoAnalyzer:
         
         for cost_target in cost_targets:
             # Oyunculara skor ver (rating maksimum, cost minimize)
-            all_players['_efficiency_score'] = (
-                all_players['Rating'] / 100 -
-                (all_players['Fiyat_M'] / cost_target) * 0.1
-            )
+            efficiency_score = ratings / 100 - (prices / cost_target) * 0.1
             
             # En iyi 11'i seç
-            selected = all_players.nlargest(11, '_efficiency_score').copy()
-            total_cost = selected['Fiyat_M'].sum()
+            top = _top_k_positions(efficiency_score, 11)
+            selected = all_players.iloc[top].copy()
+            total_cost = prices[top].sum()
             
             if total_cost <= self.budget:
                 avg_rating = selected['Rating'].mean()
@@ -268,24 +573,25 @@ class ParetoAnalyzer:
             weight_cost = 1 - weight_rating
             
             # Oyunculara skor ver
-            self.all_players['_weighted_score'] = (
-                (self.all_players['Rating'] / 100) * weight_rating -
-                (self.all_players['Fiyat_M'] / self.budget) * weight_cost
+            weighted_score = (
+                (self._ratings / 100) * weight_rating -
+                (self._prices / self.budget) * weight_cost
             )
             
             # En iyi 11'i seç
-            selected = self.all_players.nlargest(11, '_weighted_score')
+            top = _top_k_positions(weighted_score, 11)
             
-            if len(selected) == 11:
-                total_cost = selected['Fiyat_M'].sum()
+            if len(top) == 11:
+                total_cost = self._prices[top].sum()
+                avg_rating = self._ratings[top].mean()
                 
                 if total_cost <= self.budget:
                     results.append({
                         'Rating Ağırlığı': f"{weight_rating*100:.0f}%",
                         'Maliyet Ağırlığı': f"{weight_cost*100:.0f}%",
-                        'Ortalama Rating': round(selected['Rating'].mean(), 1),
+                        'Ortalama Rating': round(avg_rating, 1),
                         'Toplam Maliyet': round(total_cost, 1),
-                        'Verimlilik': round(selected['Rating'].mean() / (total_cost / 10), 2)
+                        'Verimlilik': round(avg_rating / (total_cost / 10), 2)
                     })
         
         return pd.DataFrame(results)
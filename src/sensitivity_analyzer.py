@@ -13,13 +13,31 @@ Bu modül:
 2. Senaryo karşılaştırması (Conservative, Balanced, Aggressive)
 3. Break-even analizi
 4. Ağırlık optimizasyonu
+5. Yeniden optimizasyonlu duyarlılık (ağırlık/bütçe değişince kadro değişiyor mu?)
+6. Kararlılık aralıkları (kadronun optimal kaldığı kesin ağırlık/bütçe sınırları)
+7. Monte Carlo sağlamlık analizi (Form/Rating/istatistik gürültüsü altında seçilme oranları)
 =============================================================================
 """
 
+import os
+import queue
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
 import pandas as pd
 import numpy as np
-from typing import Dict
-from .decision_analyzer import calculate_weighted_score
+from scipy.optimize import brentq
+from typing import Dict, List, Optional, Tuple
+from .config import STRATEGY_WEIGHTS
+from .decision_analyzer import calculate_weighted_score, calculate_weighted_scores, squad_aggregates
+from .optimizer import LineupModel, build_score_matrix
+
+
+# Yeniden optimizasyonlu duyarlılıkta değiştirilebilen parametreler
+# ofans/defans/form: STRATEGY_WEIGHTS ağırlıkları, istatistik: hibrit skordaki
+# istatistik payı (build_score_matrix stat_blend), butce: bütçe üst limiti
+REOPT_PARAMETERS = ['ofans', 'defans', 'form', 'istatistik', 'butce']
+DEFAULT_STAT_BLEND = 0.7
 
 
 class SensitivityAnalyzer:
@@ -30,6 +48,8 @@ class SensitivityAnalyzer:
         self.budget = budget
         self.base_weights = base_weights.copy()
         self.base_score = calculate_weighted_score(squad_df, base_weights)
+        # Kadro özetleri ağırlıktan bağımsız: tüm taramalarda bir kez hesaplanır
+        self.aggregates = squad_aggregates(squad_df)
     
     def analyze_weight_sensitivity(self, 
                                   parameter: str, 
@@ -47,19 +67,15 @@ class SensitivityAnalyzer:
         results = []
         
         # -50% ile +50% arasında test et
-        for percentage in np.arange(-0.5, 0.55, step):
-            # Ağırlıkları klonla
-            test_weights = self.base_weights.copy()
-            
-            # Parametreyi değiştir
-            original_value = test_weights.get(parameter, 0.20)
-            new_value = original_value * (1 + percentage)
-            new_value = max(0, min(1, new_value))  # Sınırları kontrol et
-            
-            test_weights[parameter] = new_value
-            
-            # Skoru hesapla
-            score = calculate_weighted_score(self.squad_df, test_weights)
+        percentages = np.arange(-0.5, 0.55, step)
+        original_value = self.base_weights.get(parameter, 0.20)
+        new_values = np.clip(original_value * (1 + percentages), 0, 1)  # Sınırları kontrol et
+        
+        # Tüm ağırlık vektörlerini tek seferde skorla
+        weight_sets = [{**self.base_weights, parameter: value} for value in new_values]
+        scores = calculate_weighted_scores(self.aggregates[np.newaxis, :], weight_sets)[0]
+        
+        for percentage, new_value, score in zip(percentages, new_values, scores):
             change = ((score - self.base_score) / self.base_score) * 100 if self.base_score > 0 else 0
             
             results.append({
@@ -81,17 +97,15 @@ class SensitivityAnalyzer:
         tornado_results = []
         parameters = ['rating', 'form', 'offense', 'defense', 'cost_penalty']
         
-        for param in parameters:
-            # En düşük değer (-50%)
-            test_weights_low = self.base_weights.copy()
-            test_weights_low[param] = self.base_weights.get(param, 0.20) * 0.5
-            score_low = calculate_weighted_score(self.squad_df, test_weights_low)
-            
-            # En yüksek değer (+50%)
-            test_weights_high = self.base_weights.copy()
-            test_weights_high[param] = self.base_weights.get(param, 0.20) * 1.5
-            score_high = calculate_weighted_score(self.squad_df, test_weights_high)
-            
+        # Her parametre için -50% ve +50% ağırlık setleri, tek seferde skorlanır
+        weight_sets = [
+            {**self.base_weights, param: self.base_weights.get(param, 0.20) * factor}
+            for param in parameters
+            for factor in (0.5, 1.5)
+        ]
+        scores = calculate_weighted_scores(self.aggregates[np.newaxis, :], weight_sets)[0].reshape(-1, 2)
+        
+        for param, (score_low, score_high) in zip(parameters, scores):
             impact = score_high - score_low
             
             tornado_results.append({
@@ -117,3 +131,734 @@ class SensitivityAnalyzer:
         )
         
         return ranking[['Sıra', 'Parametre', 'Önem_Derecesi', 'Etki_Büyüklüğü', 'Yüzde_Etki']]
+
+
+class ReoptimizingSensitivityAnalyzer:
+    """
+    Ağırlık ve bütçe değiştiğinde kadroyu YENİDEN OPTİMİZE eden duyarlılık analizi.
+    
+    SensitivityAnalyzer seçili kadroyu farklı ağırlıklarla yeniden puanlar;
+    bu sınıf ise her pertürbasyon için atama modelini tekrar çözer ve
+    optimal kadronun hangi noktada değiştiğini raporlar.
+    
+    - Atama modeli (LineupModel) işçi başına bir kez kurulur, her çözümde
+      yalnızca skorlar/bütçe güncellenir ve önceki çözüm warm start olur
+    - Pertürbasyonlar thread havuzunda paralel çözülür (CBC ayrı süreçte çalışır)
+    - Sonuçlar (ağırlıklar, istatistik payı, bütçe) anahtarıyla önbellekte tutulur
+    """
+    
+    def __init__(self, pool_df: pd.DataFrame, formation: str, budget: float,
+                 strategy: str = 'Dengeli', max_workers: int = 4):
+        if strategy not in STRATEGY_WEIGHTS:
+            raise ValueError(f"Geçersiz strateji: {strategy}")
+        
+        self.pool_df = pool_df[pool_df['Sakatlik'] == 0]
+        self.formation = formation
+        self.budget = budget
+        self.strategy = strategy
+        self.max_workers = max_workers
+        self.base_weights = dict(STRATEGY_WEIGHTS[strategy])
+        
+        self._models: 'queue.SimpleQueue[LineupModel]' = queue.SimpleQueue()
+        self._cache: Dict[Tuple, Dict] = {}
+        
+        self.base_result = self._solve(self.base_weights, DEFAULT_STAT_BLEND, budget)
+    
+    # ------------------------------------------------------------------
+    # Çözüm altyapısı
+    # ------------------------------------------------------------------
+    
+    def _borrow_model(self) -> LineupModel:
+        try:
+            return self._models.get_nowait()
+        except queue.Empty:
+            return LineupModel(self.pool_df, self.formation)
+    
+    def _solve(self, weights: Dict[str, float], stat_blend: float, budget: float) -> Dict:
+        """Tek bir parametre seti için modeli çözer (önbellekli)."""
+        key = (
+            tuple(round(weights[k], 6) for k in ('ofans', 'defans', 'form')),
+            round(stat_blend, 6),
+            round(budget, 4)
+        )
+        if key in self._cache:
+            return self._cache[key]
+        
+        model = self._borrow_model()
+        try:
+            scores = build_score_matrix(
+                model.df, positions=model.positions,
+                strategy_weights=weights, stat_blend=stat_blend
+            ).to_numpy()
+            selected_df, total_score, total_cost, status = model.solve(scores, budget)
+        finally:
+            self._models.put(model)
+        
+        result = {
+            'status': status,
+            'score': float(total_score),
+            'cost': float(total_cost),
+            'assignment': frozenset(zip(selected_df['ID'], selected_df['Atanan_Pozisyon']))
+            if selected_df is not None else frozenset(),
+            'names': dict(zip(selected_df['ID'], selected_df['Oyuncu']))
+            if selected_df is not None else {},
+            # Temel kadronun bu parametrelerle skoru (yeniden optimizasyon kazancı için)
+            'scores': pd.DataFrame(scores, index=model.df.index, columns=model.positions),
+        }
+        self._cache[key] = result
+        return result
+    
+    def _base_value(self, parameter: str) -> float:
+        if parameter in self.base_weights:
+            return self.base_weights[parameter]
+        if parameter == 'istatistik':
+            return DEFAULT_STAT_BLEND
+        if parameter == 'butce':
+            return self.budget
+        raise ValueError(f"Bilinmeyen parametre: {parameter}")
+    
+    def _parameters_at(self, parameter: str, value: float) -> Tuple[Dict[str, float], float, float]:
+        """Parametreyi verilen mutlak değere ayarlar: (ağırlıklar, istatistik payı, bütçe)."""
+        weights = dict(self.base_weights)
+        stat_blend = DEFAULT_STAT_BLEND
+        budget = self.budget
+        
+        if parameter in weights:
+            weights[parameter] = value
+        elif parameter == 'istatistik':
+            stat_blend = value
+        elif parameter == 'butce':
+            budget = value
+        else:
+            raise ValueError(f"Bilinmeyen parametre: {parameter}")
+        
+        return weights, stat_blend, budget
+    
+    def _perturb(self, parameter: str, percentage: float) -> Tuple[Dict[str, float], float, float, float]:
+        """Parametreyi yüzde olarak değiştirir: (ağırlıklar, istatistik payı, bütçe, yeni değer)."""
+        value = self._base_value(parameter) * (1 + percentage)
+        if parameter != 'butce':
+            value = max(0.0, value)
+        if parameter == 'istatistik':
+            value = min(1.0, value)
+        
+        return (*self._parameters_at(parameter, value), value)
+    
+    def _base_lineup_score(self, result: Dict, budget: float) -> float:
+        """Temel kadronun verilen sonucun skor matrisiyle skoru (bütçeyi aşıyorsa NaN)."""
+        base = self.base_result
+        if base['status'] != 'Optimal':
+            return np.nan
+        
+        id_to_index = dict(zip(self.pool_df['ID'], self.pool_df.index))
+        base_cost = self.pool_df.loc[[id_to_index[pid] for pid, _ in base['assignment']], 'Fiyat_M'].sum()
+        if base_cost > budget + 1e-6:
+            return np.nan
+        
+        scores = result['scores']
+        return float(sum(scores.at[id_to_index[pid], pos] for pid, pos in base['assignment']))
+    
+    # ------------------------------------------------------------------
+    # Analizler
+    # ------------------------------------------------------------------
+    
+    def sweep(self, parameters: Optional[List[str]] = None,
+              step: float = 0.05, span: float = 0.5) -> pd.DataFrame:
+        """
+        Her parametreyi -span ile +span arasında değiştirip kadroyu yeniden çözer.
+        
+        Args:
+            parameters: REOPT_PARAMETERS alt kümesi (varsayılan: hepsi)
+            step: Yüzde adımı (0.05 = %5 → ±%50 için 21 nokta)
+            span: Maksimum yüzde değişim
+            
+        Returns:
+            DataFrame: Parametre, yüzde değişim, yeni değer, skor, maliyet,
+            kadronun değişip değişmediği ve giren/çıkan oyuncular
+        """
+        parameters = parameters or REOPT_PARAMETERS
+        percentages = np.round(np.arange(-span, span + step / 2, step), 6)
+        tasks = [(param, pct) for param in parameters for pct in percentages]
+        
+        def run(task):
+            param, pct = task
+            weights, stat_blend, budget, value = self._perturb(param, pct)
+            return task, value, budget, self._solve(weights, stat_blend, budget)
+        
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            outcomes = list(pool.map(run, tasks))
+        
+        base = self.base_result
+        base_ids = {pid for pid, _ in base['assignment']}
+        
+        rows = []
+        for (param, pct), value, budget, result in outcomes:
+            ids = {pid for pid, _ in result['assignment']}
+            entered = sorted(result['names'][pid] for pid in ids - base_ids)
+            left = sorted(base['names'][pid] for pid in base_ids - ids)
+            base_lineup_score = self._base_lineup_score(result, budget) if result['status'] == 'Optimal' else np.nan
+            
+            rows.append({
+                'Parametre': param,
+                'Yüzde_Değişim': f"{pct*100:+.0f}%",
+                'Değişim_Oranı': pct,
+                'Değer': round(value, 3),
+                'Durum': result['status'],
+                'Skor': round(result['score'], 2),
+                'Maliyet': round(result['cost'], 1),
+                'Kadro_Değişti': result['status'] == 'Optimal' and ids != base_ids,
+                'Pozisyon_Değişti': result['status'] == 'Optimal' and result['assignment'] != base['assignment'],
+                'Değişen_Oyuncu': len(entered),
+                'Girenler': ', '.join(entered),
+                'Çıkanlar': ', '.join(left),
+                'Yeniden_Optimizasyon_Kazancı': round(result['score'] - base_lineup_score, 2)
+                if not np.isnan(base_lineup_score) else np.nan,
+            })
+        
+        return pd.DataFrame(rows)
+    
+    def analyze_parameter(self, parameter: str, step: float = 0.05, span: float = 0.5) -> pd.DataFrame:
+        """Tek parametre için yeniden optimizasyonlu duyarlılık tablosu."""
+        return self.sweep([parameter], step=step, span=span)
+    
+    def stability_summary(self, sweep_df: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+        """
+        Her parametre için temel kadronun değişmeden kaldığı aralık.
+        
+        Returns:
+            DataFrame: Parametre, kararlı alt/üst yüzde sınırı, farklı kadro sayısı
+            ve maksimum yeniden optimizasyon kazancı (etki büyüklüğüne göre sıralı)
+        """
+        if sweep_df is None:
+            sweep_df = self.sweep()
+        
+        summary = []
+        for param, group in sweep_df.groupby('Parametre', sort=False):
+            group = group.sort_values('Değişim_Oranı')
+            pct = group['Değişim_Oranı'].to_numpy()
+            stable = ~group['Kadro_Değişti'].to_numpy() & (group['Durum'].to_numpy() == 'Optimal')
+            
+            # 0 noktasından iki yöne kadro değişene kadar ilerle
+            zero = int(np.argmin(np.abs(pct)))
+            low = zero
+            while low > 0 and stable[low - 1]:
+                low -= 1
+            high = zero
+            while high < len(pct) - 1 and stable[high + 1]:
+                high += 1
+            
+            optimal = group[group['Durum'] == 'Optimal']
+            distinct = (optimal['Girenler'] + '|' + optimal['Çıkanlar']).nunique()
+            summary.append({
+                'Parametre': param,
+                'Kararlı_Alt_Sınır': f"{pct[low]*100:+.0f}%",
+                'Kararlı_Üst_Sınır': f"{pct[high]*100:+.0f}%",
+                'Kararlı_Aralık_Genişliği': round((pct[high] - pct[low]) * 100, 1),
+                'Farklı_Kadro_Sayısı': int(distinct),
+                'Maks_Değişen_Oyuncu': int(group['Değişen_Oyuncu'].max()),
+                'Maks_Kazanç': round(group['Yeniden_Optimizasyon_Kazancı'].max(), 2) + 0.0,
+            })
+        
+        return pd.DataFrame(summary).sort_values('Kararlı_Aralık_Genişliği').reset_index(drop=True)
+    
+    # ------------------------------------------------------------------
+    # Kesin kararlılık aralıkları
+    # ------------------------------------------------------------------
+    
+    def _assignment_curve(self, assignment: frozenset, parameter: str):
+        """Sabit bir kadronun skorunu parametre değerinin fonksiyonu olarak döndürür."""
+        id_to_index = dict(zip(self.pool_df['ID'], self.pool_df.index))
+        rows = self.pool_df.loc[[id_to_index[pid] for pid, _ in assignment]]
+        positions = [pos for _, pos in assignment]
+        cells = (np.arange(len(rows)), [sorted(set(positions)).index(pos) for pos in positions])
+        
+        def curve(value: float) -> float:
+            weights, stat_blend, _ = self._parameters_at(parameter, value)
+            scores = build_score_matrix(
+                rows, positions=sorted(set(positions)),
+                strategy_weights=weights, stat_blend=stat_blend
+            ).to_numpy()
+            return float(scores[cells].sum())
+        
+        return curve
+    
+    def _weight_boundary(self, parameter: str, end: float, tol: float,
+                         max_solves: int = 20) -> Tuple[float, Optional[Dict], int]:
+        """
+        Temel kadronun base değerden end yönünde optimal kaldığı son noktayı bulur.
+        
+        Uçta çözülen kadro temel kadrodan farklıysa iki kadronun skor eğrilerinin
+        kesişimi (brentq) aday kırılma noktasıdır; orada yapılan doğrulama çözümü
+        temel kadrodan daha iyi üçüncü bir kadro bulursa arama o kadroyla daralır.
+        
+        Returns:
+            Tuple: (sınır değeri, sınırdan sonra optimal olan sonuç veya None, çözüm sayısı)
+        """
+        start = self._base_value(parameter)
+        base = self.base_result
+        base_curve = self._assignment_curve(base['assignment'], parameter)
+        
+        far = end
+        result = self._solve(*self._parameters_at(parameter, far))
+        solves = 1
+        
+        while result['status'] == 'Optimal' and result['assignment'] != base['assignment']:
+            rival_curve = self._assignment_curve(result['assignment'], parameter)
+            gap = lambda v: base_curve(v) - rival_curve(v)
+            
+            if gap(far) >= -1e-9:
+                # Uçta eşitlik: temel kadro hâlâ optimal
+                return end, None, solves
+            if gap(start) <= 1e-9:
+                return start, result, solves
+            
+            crossing = brentq(gap, start, far, xtol=tol)
+            check = self._solve(*self._parameters_at(parameter, crossing))
+            solves += 1
+            
+            # Kesişimde iki kadrodan daha iyi bir kadro yoksa kırılma noktası bulundu
+            best_known = max(base_curve(crossing), rival_curve(crossing))
+            if (check['assignment'] in (base['assignment'], result['assignment'])
+                    or check['score'] <= best_known + 1e-6 or solves >= max_solves):
+                return crossing, result, solves
+            far, result = crossing, check
+        
+        return end, None, solves
+    
+    def _budget_range(self) -> Tuple[float, float, Optional[Dict], int]:
+        """
+        Bütçe aralığı: alt sınır temel kadronun maliyeti (altında kadro bütçeyi aşar),
+        üst sınır temel kadrodan daha yüksek skorlu en ucuz kadronun maliyeti.
+        """
+        base = self.base_result
+        model = self._borrow_model()
+        try:
+            scores = build_score_matrix(
+                model.df, positions=model.positions,
+                strategy_weights=self.base_weights, stat_blend=DEFAULT_STAT_BLEND
+            ).to_numpy()
+            selected_df, total_score, total_cost, status = model.solve_min_cost(scores, base['score'] + 1e-4)
+        finally:
+            self._models.put(model)
+        
+        if status != 'Optimal':
+            return base['cost'], np.inf, None, 1
+        
+        rival = {
+            'assignment': frozenset(zip(selected_df['ID'], selected_df['Atanan_Pozisyon'])),
+            'names': dict(zip(selected_df['ID'], selected_df['Oyuncu'])),
+        }
+        return base['cost'], float(total_cost), rival, 1
+    
+    def _entering(self, rival: Optional[Dict]) -> str:
+        if rival is None:
+            return '-'
+        base_ids = {pid for pid, _ in self.base_result['assignment']}
+        return ', '.join(sorted(rival['names'][pid] for pid, _ in rival['assignment'] if pid not in base_ids)) or 'Pozisyon değişimi'
+    
+    def stability_ranges(self, parameters: Optional[List[str]] = None,
+                         weight_bounds: Tuple[float, float] = (0.0, 1.0),
+                         tol: float = 1e-4) -> pd.DataFrame:
+        """
+        Temel kadronun optimal kaldığı kesin parametre aralıkları.
+        
+        Izgara taraması yerine her parametre ve yön için kırılma noktası
+        aranır: ağırlıklarda kadro skor eğrilerinin kesişimi + doğrulama
+        çözümü, bütçede minimum maliyet modeli kullanılır. Parametre başına
+        genellikle 2-6 çözüm yeterlidir. Diğer parametreler temel değerde sabittir.
+        
+        Args:
+            parameters: REOPT_PARAMETERS alt kümesi (varsayılan: hepsi)
+            weight_bounds: Ağırlık/istatistik payı için aranan değer aralığı
+            tol: Kırılma noktası toleransı
+            
+        Returns:
+            DataFrame: Parametre, temel değer, alt/üst sınır (mutlak ve %),
+            sınırların ötesinde kadroya giren oyuncular, çözüm sayısı.
+            En dar aralıklı (en hassas) parametre en üstte (tornado sırası).
+        """
+        if self.base_result['status'] != 'Optimal':
+            return pd.DataFrame()
+        
+        parameters = parameters or REOPT_PARAMETERS
+        rows = []
+        
+        for param in parameters:
+            base_value = self._base_value(param)
+            
+            if param == 'butce':
+                low, high, high_rival, solves = self._budget_range()
+                low_rival = None
+            else:
+                low, low_rival, solves_low = self._weight_boundary(param, weight_bounds[0], tol)
+                high, high_rival, solves_high = self._weight_boundary(param, weight_bounds[1], tol)
+                solves = solves_low + solves_high
+            
+            low_pct = (low / base_value - 1) * 100 if base_value else np.nan
+            high_pct = (high / base_value - 1) * 100 if base_value and np.isfinite(high) else np.inf
+            
+            rows.append({
+                'Parametre': param,
+                'Temel_Değer': round(base_value, 3),
+                'Alt_Sınır': round(low, 4),
+                'Üst_Sınır': round(high, 4) if np.isfinite(high) else np.inf,
+                'Alt_Yüzde': round(low_pct, 1),
+                'Üst_Yüzde': round(high_pct, 1) if np.isfinite(high_pct) else np.inf,
+                'Alt_Sınırda_Giren': self._entering(low_rival),
+                'Üst_Sınırda_Giren': self._entering(high_rival),
+                'Çözüm_Sayısı': solves,
+            })
+        
+        ranges = pd.DataFrame(rows)
+        ranges['_hassasiyet'] = np.minimum(ranges['Alt_Yüzde'].abs(), ranges['Üst_Yüzde'].abs())
+        return ranges.sort_values('_hassasiyet').drop(columns='_hassasiyet').reset_index(drop=True)
+
+
+# =============================================================================
+# MONTE CARLO SAĞLAMLIK ANALİZİ
+# =============================================================================
+
+# Varsayılan gürültü düzeyleri (standart sapma):
+# form: Form puanı (0-100), rating: Rating puanı - Ofans/Defans gücüne
+# pozisyon eğilimiyle yansır, istatistik: stat_* değerlerinde göreli oran
+MONTE_CARLO_NOISE = {'form': 5.0, 'rating': 2.0, 'istatistik': 0.15}
+
+# data_handler.calculate_offense/defense: güç = (Rating - 60) * 100/31 * eğilim
+RATING_TO_POWER = 100 / 31
+
+
+def _norm_scale(df: pd.DataFrame, column: str) -> float:
+    """Ham sütundaki 1 birimlik değişimin _Norm sütununda karşılığı (min-max doğrusal)."""
+    norm_col = f"{column}_Norm"
+    if column not in df.columns or norm_col not in df.columns:
+        return 0.0
+    raw_range = df[column].max() - df[column].min()
+    if raw_range <= 0:
+        return 0.0
+    return float((df[norm_col].max() - df[norm_col].min()) / raw_range)
+
+
+class _MonteCarloWorker:
+    """
+    Tek bir işçinin (süreç ya da ana süreç) Monte Carlo durumu.
+    
+    Skor bileşenleri ve atama modeli bir kez hazırlanır; her batch'te
+    pertürbe skor tensörü (örnek x oyuncu x pozisyon) vektörize üretilir ve
+    her örnek LineupModel.solve_fast ile çözülür. İşçiye yalnızca tohum gider.
+    """
+    
+    def __init__(self, pool_df: pd.DataFrame, formation: str, budget: float,
+                 strategy: str, noise: Dict[str, float], stat_blend: float,
+                 base_rows: np.ndarray, base_cols: np.ndarray):
+        from .config import OFFENSE_TENDENCY, DEFENSE_TENDENCY, POSITIONAL_WEIGHTS
+        from .optimizer import INELIGIBLE_SCORE, position_weight_split
+        
+        self.model = LineupModel(pool_df, formation)
+        self.budget = budget
+        self.noise = noise
+        self.stat_blend = stat_blend
+        self.base_rows = base_rows
+        self.base_cols = base_cols
+        self.base_players = frozenset(base_rows.tolist())
+        self.ineligible_score = INELIGIBLE_SCORE
+        
+        df = self.model.df
+        positions = self.model.positions
+        weights = STRATEGY_WEIGHTS[strategy]
+        self.row_of = {index: row for row, index in enumerate(self.model.players)}
+        self.col_of = {p: col for col, p in enumerate(positions)}
+        
+        def column(name: str, default: float) -> np.ndarray:
+            if name in df.columns:
+                return df[name].to_numpy(dtype=float)
+            return np.full(len(df), default)
+        
+        self.offense = column('Ofans_Gucu_Norm', 0.5)
+        self.defense = column('Defans_Gucu_Norm', 0.5)
+        self.form = column('Form_Norm', 0.5)
+        
+        # Rating şokunun Ofans/Defans _Norm sütunlarına oyuncu bazlı etkisi
+        sub_pos = df['Alt_Pozisyon']
+        self.offense_slope = (
+            RATING_TO_POWER * sub_pos.map(OFFENSE_TENDENCY).fillna(0.5).to_numpy(dtype=float)
+            * _norm_scale(df, 'Ofans_Gucu')
+        )
+        self.defense_slope = (
+            RATING_TO_POWER * sub_pos.map(DEFENSE_TENDENCY).fillna(0.5).to_numpy(dtype=float)
+            * _norm_scale(df, 'Defans_Gucu')
+        )
+        self.form_scale = _norm_scale(df, 'Form')
+        
+        splits = np.array([position_weight_split(p, weights) for p in positions])
+        self.split = splits.T  # (3, P): ofans, defans, form
+        
+        metrics = sorted({
+            m for p in positions for m in POSITIONAL_WEIGHTS.get(p, {})
+            if f"stat_{m}_Norm" in df.columns
+        })
+        self.stats = np.column_stack(
+            [df[f"stat_{m}_Norm"].to_numpy(dtype=float) for m in metrics]
+        ) if metrics else np.zeros((len(df), 0))
+        self.stat_weights = np.array([
+            [POSITIONAL_WEIGHTS.get(p, {}).get(m, 0.0) for p in positions] for m in metrics
+        ]).reshape(len(metrics), len(positions))
+        # Pozisyonun ağırlık tablosunda yer alan metrikler (işaretten bağımsız)
+        self.stat_mask = np.array([
+            [m in POSITIONAL_WEIGHTS.get(p, {}) for p in positions] for m in metrics
+        ], dtype=float).reshape(len(metrics), len(positions))
+        self.eligible = self.model.eligible
+    
+    def sample_scores(self, rng: np.random.Generator, size: int) -> np.ndarray:
+        """
+        Pertürbe skor tensörü üretir (build_score_matrix'in örnek boyutunda vektörize hali).
+        
+        Returns:
+            np.ndarray: (size, oyuncu, pozisyon)
+        """
+        n = len(self.offense)
+        rating_shock = rng.normal(0.0, self.noise.get('rating', 0.0), (size, n))
+        offense = np.clip(self.offense + rating_shock * self.offense_slope, 0, 1)
+        defense = np.clip(self.defense + rating_shock * self.defense_slope, 0, 1)
+        form = np.clip(
+            self.form + rng.normal(0.0, self.noise.get('form', 0.0), (size, n)) * self.form_scale, 0, 1
+        )
+        stats = np.clip(
+            self.stats * (1 + rng.normal(0.0, self.noise.get('istatistik', 0.0), (size,) + self.stats.shape)),
+            0, 1
+        )
+        
+        ow, dw, fw = self.split
+        base_score = (
+            offense[..., None] * ow + defense[..., None] * dw + form[..., None] * fw
+        ) * 100
+        data_score = stats @ self.stat_weights
+        used_stats = ((stats > 0).astype(float) @ self.stat_mask) > 0
+        
+        blend = self.stat_blend
+        scores = np.where(
+            used_stats & (data_score > 0),
+            base_score * (1 - blend) + data_score * 100 * blend,
+            base_score * (1 - blend)
+        )
+        return np.where(self.eligible, scores, self.ineligible_score)
+    
+    def run_batch(self, seed: int, batch_index: int, size: int) -> Dict:
+        """Bir batch örneği üretir, çözer ve toplu sayımları döndürür."""
+        rng = np.random.default_rng([seed, batch_index])
+        tensor = self.sample_scores(rng, size)
+        
+        counts = np.zeros(self.eligible.shape, dtype=np.int64)
+        optimal = np.full(size, np.nan)
+        same_lineup = 0
+        for s in range(size):
+            selection, score, status = self.model.solve_fast(tensor[s], self.budget)
+            if status != 'Optimal':
+                continue
+            rows = [self.row_of[i] for i, _ in selection]
+            cols = [self.col_of[p] for _, p in selection]
+            np.add.at(counts, (rows, cols), 1)
+            optimal[s] = score
+            same_lineup += frozenset(rows) == self.base_players
+        
+        return {
+            'counts': counts,
+            'optimal': optimal,
+            # Temel kadronun (pertürbasyonsuz optimum) aynı örneklerdeki skoru
+            'base': tensor[:, self.base_rows, self.base_cols].sum(axis=1),
+            'same_lineup': same_lineup,
+        }
+
+
+_MC_WORKER: Optional[_MonteCarloWorker] = None
+
+
+def _mc_init(*args) -> None:
+    """İşçi süreç başlatıcısı: durum süreç başına bir kez kurulur."""
+    global _MC_WORKER
+    _MC_WORKER = _MonteCarloWorker(*args)
+
+
+def _mc_run_batch(seed: int, batch_index: int, size: int) -> Dict:
+    return _MC_WORKER.run_batch(seed, batch_index, size)
+
+
+def _distribution(values: np.ndarray) -> Dict[str, float]:
+    values = values[np.isfinite(values)]
+    if len(values) == 0:
+        return {}
+    p5, p50, p95 = np.percentile(values, [5, 50, 95])
+    return {
+        'ortalama': round(float(values.mean()), 2),
+        'std': round(float(values.std()), 2),
+        'p5': round(float(p5), 2),
+        'p50': round(float(p50), 2),
+        'p95': round(float(p95), 2),
+    }
+
+
+class MonteCarloRobustnessAnalyzer:
+    """
+    Form, Rating ve istatistik girdilerindeki belirsizliğe karşı kadro sağlamlığı.
+    
+    Binlerce pertürbe skor matrisi örneklenir ve her biri için optimal kadro
+    yeniden bulunur. Sonuç: oyuncu bazlı seçilme oranı, optimal skor dağılımı
+    ve temel kadronun (gürültüsüz optimum) pertürbasyonlar altındaki skoru.
+    
+    - Örnekler işçilerde vektörize üretilir (yalnızca tohum gönderilir)
+    - Çözümler CBC yerine süreç içi hızlı motorla yapılır (LineupModel.solve_fast)
+    - Batch'ler süreç havuzunda paralel çalışır; sonuçlar gönderim sırasıyla
+      birleştirildiği için aynı tohum aynı sonucu verir
+    - Her batch sonrası ara sonuç üretilir (run_iter) ve tüm seçilme
+      oranlarının %95 güven aralığı tol altına inince erken durulur
+    """
+    
+    def __init__(self, pool_df: pd.DataFrame, formation: str, budget: float,
+                 strategy: str = 'Dengeli', noise: Optional[Dict[str, float]] = None,
+                 stat_blend: float = DEFAULT_STAT_BLEND):
+        if strategy not in STRATEGY_WEIGHTS:
+            raise ValueError(f"Geçersiz strateji: {strategy}")
+        
+        self.pool_df = pool_df[pool_df['Sakatlik'] == 0]
+        self.formation = formation
+        self.budget = budget
+        self.strategy = strategy
+        self.noise = {**MONTE_CARLO_NOISE, **(noise or {})}
+        self.stat_blend = stat_blend
+        
+        model = LineupModel(self.pool_df, formation)
+        scores = build_score_matrix(
+            model.df, positions=model.positions,
+            strategy_weights=STRATEGY_WEIGHTS[strategy], stat_blend=stat_blend
+        ).to_numpy()
+        selection, self.base_score, self.base_status = model.solve_fast(scores, budget)
+        
+        row_of = {index: row for row, index in enumerate(model.players)}
+        col_of = {p: col for col, p in enumerate(model.positions)}
+        self.base_selection = selection
+        self._base_rows = np.array([row_of[i] for i, _ in selection], dtype=int)
+        self._base_cols = np.array([col_of[p] for _, p in selection], dtype=int)
+        self._players = model.df
+        self._positions = model.positions
+    
+    def _worker_args(self) -> Tuple:
+        return (self.pool_df, self.formation, self.budget, self.strategy,
+                self.noise, self.stat_blend, self._base_rows, self._base_cols)
+    
+    def _snapshot(self, counts: np.ndarray, optimal: List[np.ndarray], base: List[np.ndarray],
+                  same_lineup: int, n_done: int, n_target: int, converged: bool,
+                  half_width: float) -> Dict:
+        """Birikmiş sayımlardan ara/son sonucu üretir."""
+        players = self._players
+        selected = counts.sum(axis=1)
+        frequency = selected / max(n_done, 1)
+        base_set = set(self._base_rows.tolist())
+        
+        freq_df = pd.DataFrame({
+            'ID': players['ID'].to_numpy(),
+            'Oyuncu': players['Oyuncu'].to_numpy(),
+            'Alt_Pozisyon': players['Alt_Pozisyon'].to_numpy(),
+            'En_Sık_Pozisyon': np.array(self._positions)[counts.argmax(axis=1)],
+            'Seçilme_Oranı': np.round(frequency, 4),
+            'Güven_Aralığı': np.round(1.96 * np.sqrt(frequency * (1 - frequency) / max(n_done, 1)), 4),
+            'Temel_Kadroda': [row in base_set for row in range(len(players))],
+        })
+        freq_df.loc[selected == 0, 'En_Sık_Pozisyon'] = '-'
+        freq_df = freq_df[(selected > 0) | freq_df['Temel_Kadroda']]
+        freq_df = freq_df.sort_values(['Seçilme_Oranı', 'Temel_Kadroda'], ascending=False).reset_index(drop=True)
+        
+        optimal_scores = np.concatenate(optimal) if optimal else np.array([])
+        base_scores = np.concatenate(base) if base else np.array([])
+        # Kayan nokta hatasıyla oluşan -0.0 değerleri kırpılır (optimum >= temel kadro)
+        regret = np.maximum(optimal_scores - base_scores, 0.0)
+        
+        return {
+            'örnek_sayısı': n_done,
+            'hedef_örnek': n_target,
+            'yakınsadı': converged,
+            'en_geniş_güven_aralığı': round(float(half_width), 4),
+            'temel_kadro_oranı': round(same_lineup / max(n_done, 1), 4),
+            'oyuncu_frekansları': freq_df,
+            'optimal_skor': _distribution(optimal_scores),
+            'temel_kadro_skoru': _distribution(base_scores),
+            'pişmanlık': _distribution(regret),
+            'optimal_skorlar': optimal_scores,
+            'temel_kadro_skorları': base_scores,
+        }
+    
+    def run_iter(self, n_samples: int = 5000, batch_size: int = 100,
+                 workers: Optional[int] = None, seed: int = 42,
+                 tol: float = 0.02, min_samples: int = 500):
+        """
+        Simülasyonu batch batch çalıştırır ve her batch sonrası ara sonuç üretir.
+        
+        Args:
+            n_samples: En fazla örnek sayısı
+            batch_size: Batch başına örnek (işçiye giden iş birimi)
+            workers: Paralel süreç sayısı (varsayılan: CPU sayısı, en fazla 4; 1 = süreç içi)
+            seed: Rastgelelik tohumu
+            tol: Erken durma eşiği - tüm seçilme oranlarının %95 güven aralığı yarı genişliği
+            min_samples: Erken durmadan önce en az örnek sayısı
+            
+        Yields:
+            Dict: Ara sonuç (örnek sayısı, yakınsama, frekans tablosu, skor dağılımları)
+        """
+        if self.base_status != 'Optimal':
+            return
+        
+        if workers is None:
+            workers = min(4, os.cpu_count() or 1)
+        n_batches = int(np.ceil(n_samples / batch_size))
+        sizes = [min(batch_size, n_samples - b * batch_size) for b in range(n_batches)]
+        
+        counts = np.zeros((len(self._players), len(self._positions)), dtype=np.int64)
+        optimal, base = [], []
+        same_lineup = 0
+        n_done = 0
+        
+        def accumulate(batch: Dict) -> Tuple[bool, float]:
+            nonlocal counts, same_lineup, n_done
+            counts += batch['counts']
+            optimal.append(batch['optimal'])
+            base.append(batch['base'])
+            same_lineup += batch['same_lineup']
+            n_done += len(batch['optimal'])
+            p = counts.sum(axis=1) / n_done
+            half_width = float((1.96 * np.sqrt(p * (1 - p) / n_done)).max())
+            return n_done >= min_samples and half_width <= tol, half_width
+        
+        if workers <= 1:
+            worker = _MonteCarloWorker(*self._worker_args())
+            for b, size in enumerate(sizes):
+                converged, half_width = accumulate(worker.run_batch(seed, b, size))
+                yield self._snapshot(counts, optimal, base, same_lineup, n_done, n_samples, converged, half_width)
+                if converged:
+                    return
+            return
+        
+        with ProcessPoolExecutor(max_workers=workers, initializer=_mc_init,
+                                 initargs=self._worker_args()) as pool:
+            # Sınırlı sayıda batch önden gönderilir; erken durmada kalanlar iptal edilir
+            window = deque()
+            submitted = 0
+            while submitted < n_batches and len(window) < 2 * workers:
+                window.append(pool.submit(_mc_run_batch, seed, submitted, sizes[submitted]))
+                submitted += 1
+            
+            while window:
+                converged, half_width = accumulate(window.popleft().result())
+                if converged:
+                    for future in window:
+                        future.cancel()
+                    yield self._snapshot(counts, optimal, base, same_lineup, n_done, n_samples, True, half_width)
+                    return
+                if submitted < n_batches:
+                    window.append(pool.submit(_mc_run_batch, seed, submitted, sizes[submitted]))
+                    submitted += 1
+                yield self._snapshot(counts, optimal, base, same_lineup, n_done, n_samples, False, half_width)
+    
+    def run(self, **kwargs) -> Dict:
+        """Simülasyonu sonuna kadar (veya yakınsayana kadar) çalıştırıp son sonucu döndürür."""
+        result = {}
+        for result in self.run_iter(**kwargs):
+            pass
+        return result
@@ -0,0 +1,414 @@
+"""
+=============================================================================
+SERVICE.PY - YEREL HTTP/JSON OPTİMİZASYON SERVİSİ
+=============================================================================
+
+Streamlit'e gömülmeden diğer araçların kadro istemesi için küçük bir
+HTTP/JSON servis katmanı (yalnızca standart kütüphane):
+
+- İşlenmiş veri seti ve her strateji için skor matrisi bellekte sıcak tutulur
+- Çözüm sonuçları LRU önbellekte saklanır
+- İstekler sınırlı bir işçi havuzunda (ThreadPoolExecutor) çalışır;
+  CBC ayrı süreçte çözdüğü için thread'ler gerçekten paralel çalışır
+- Aynı anda gelen özdeş istekler tek bir çözümde birleştirilir (coalescing)
+- Her endpoint için gecikme metrikleri tutulur (GET /metrics)
+
+Endpoint'ler:
+    GET  /health                 -> servis durumu
+    GET  /teams                  -> takım listesi
+    GET  /metrics                -> endpoint başına gecikme ve önbellek metrikleri
+    POST /optimize               -> {team, formation, budget?, strategy}
+    POST /analyze/<analiz>       -> aynı gövde; analiz: decision, sensitivity,
+                                    compatibility, bench, narrative
+
+Varsayılan olarak yalnızca 127.0.0.1'e bağlanır:
+    python -m src.service --port 8765
+=============================================================================
+"""
+
+import argparse
+import json
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Hashable, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .config import FORMATIONS, STRATEGY_WEIGHTS
+from .data_handler import load_fc26_data, normalize_data, generate_synthetic_players
+from .optimizer import solve_optimal_lineup, build_score_matrix
+from .decision_analyzer import generate_decision_report
+from .sensitivity_analyzer import SensitivityAnalyzer
+from .compatibility import CompatibilityAnalyzer
+from .bench_analyzer import BenchAnalyzer
+from .narrative_builder import NarrativeBuilder
+
+
+# Karar destek sekmesindeki varsayılan ağırlıklar (main.py ile aynı)
+DEFAULT_ANALYSIS_WEIGHTS = {'rating': 0.25, 'form': 0.20, 'offense': 0.20, 'defense': 0.20, 'cost_penalty': 0.15}
+
+LINEUP_COLUMNS = [
+    'ID', 'Oyuncu', 'Takim', 'Alt_Pozisyon', 'Atanan_Pozisyon', 'Pozisyon_Skoru',
+    'Rating', 'Fiyat_M', 'Form', 'Ofans_Gucu', 'Defans_Gucu'
+]
+
+
+class ServiceError(Exception):
+    """İstemci hatası (HTTP 4xx olarak döner)."""
+
+    def __init__(self, message: str, status: int = 400):
+        super().__init__(message)
+        self.status = status
+
+
+def _to_builtin(value):
+    """NumPy/pandas değerlerini JSON'a uygun Python tiplerine çevirir."""
+    if isinstance(value, pd.DataFrame):
+        return value.to_dict('records')
+    if isinstance(value, np.generic):
+        return value.item()
+    return str(value)
+
+
+class LatencyMetrics:
+    """Endpoint başına gecikme istatistikleri (thread-safe)."""
+
+    def __init__(self, window: int = 1000):
+        self._window = window
+        self._lock = threading.Lock()
+        self._data: Dict[str, Dict] = {}
+
+    def record(self, endpoint: str, elapsed: float, error: bool = False) -> None:
+        with self._lock:
+            entry = self._data.setdefault(endpoint, {
+                'count': 0, 'errors': 0, 'total_s': 0.0, 'max_s': 0.0,
+                'recent': deque(maxlen=self._window)
+            })
+            entry['count'] += 1
+            entry['errors'] += int(error)
+            entry['total_s'] += elapsed
+            entry['max_s'] = max(entry['max_s'], elapsed)
+            entry['recent'].append(elapsed)
+
+    def snapshot(self) -> Dict[str, Dict]:
+        with self._lock:
+            result = {}
+            for endpoint, entry in self._data.items():
+                recent = np.array(entry['recent']) * 1000
+                result[endpoint] = {
+                    'count': entry['count'],
+                    'errors': entry['errors'],
+                    'mean_ms': round(entry['total_s'] / entry['count'] * 1000, 2),
+                    'p50_ms': round(float(np.percentile(recent, 50)), 2),
+                    'p95_ms': round(float(np.percentile(recent, 95)), 2),
+                    'max_ms': round(entry['max_s'] * 1000, 2)
+                }
+            return result
+
+
+class OptimizationService:
+    """
+    Sıcak durumu (veri, skor matrisleri, çözüm önbelleği) tutan servis çekirdeği.
+
+    HTTP katmanından bağımsızdır; doğrudan Python'dan da kullanılabilir.
+    """
+
+    def __init__(self, df_full: pd.DataFrame, max_workers: int = 4, cache_size: int = 256):
+        self.df_full = df_full
+        self.teams = sorted(df_full['Takim'].unique().tolist())
+        self._team_index = {team: df_full.index[df_full['Takim'] == team] for team in self.teams}
+
+        # Her strateji için tüm oyuncular x pozisyonlar skor matrisi (bir kez)
+        self.score_matrices = {
+            strategy: build_score_matrix(df_full, strategy) for strategy in STRATEGY_WEIGHTS
+        }
+
+        self.metrics = LatencyMetrics()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='kds-worker')
+        self._lock = threading.Lock()
+        self._inflight: Dict[Hashable, Future] = {}
+        self._cache: 'OrderedDict[Hashable, object]' = OrderedDict()
+        self._cache_size = cache_size
+        self.counters = {'cache_hits': 0, 'coalesced': 0, 'computed': 0}
+
+    # ------------------------------------------------------------------
+    # Önbellek + birleştirme
+    # ------------------------------------------------------------------
+
+    def _run_once(self, key: Hashable, func: Callable[[], object]) -> object:
+        """
+        Aynı anahtar için sonucu önbellekten döndürür, çalışmakta olan özdeş
+        bir iş varsa onun sonucunu bekler, yoksa işi havuza gönderir.
+        """
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                self.counters['cache_hits'] += 1
+                return self._cache[key]
+
+            future = self._inflight.get(key)
+            submitted = future is None
+            if submitted:
+                future = self._executor.submit(func)
+                self._inflight[key] = future
+                self.counters['computed'] += 1
+            else:
+                self.counters['coalesced'] += 1
+
+        # Kilit dışında: iş çoktan bittiyse _finish aynı thread'de hemen çalışır
+        if submitted:
+            future.add_done_callback(lambda f, k=key: self._finish(k, f))
+
+        return future.result()
+
+    def _finish(self, key: Hashable, future: Future) -> None:
+        with self._lock:
+            self._inflight.pop(key, None)
+            if future.exception() is None:
+                self._cache[key] = future.result()
+                while len(self._cache) > self._cache_size:
+                    self._cache.popitem(last=False)
+
+    # ------------------------------------------------------------------
+    # İstek doğrulama
+    # ------------------------------------------------------------------
+
+    def _team_frame(self, team: str) -> pd.DataFrame:
+        if team not in self._team_index:
+            raise ServiceError(f"Bilinmeyen takım: {team}", status=404)
+        return self.df_full.loc[self._team_index[team]]
+
+    def _parse_request(self, params: Dict) -> Tuple[str, str, float, str]:
+        team = params.get('team')
+        formation = params.get('formation', '4-3-3')
+        strategy = params.get('strategy', 'Dengeli')
+
+        if not team:
+            raise ServiceError("'team' alanı zorunlu")
+        if formation not in FORMATIONS:
+            raise ServiceError(f"Geçersiz formasyon: {formation}")
+        if strategy not in STRATEGY_WEIGHTS:
+            raise ServiceError(f"Geçersiz strateji: {strategy}")
+
+        team_df = self._team_frame(team)
+        budget = params.get('budget')
+        if budget is None:
+            # Arayüzdeki varsayılan: takımın en pahalı 11 oyuncusu
+            budget = float(round(team_df['Fiyat_M'].nlargest(11).sum()))
+        try:
+            budget = float(budget)
+        except (TypeError, ValueError):
+            raise ServiceError(f"Geçersiz bütçe: {budget}")
+
+        return team, formation, budget, strategy
+
+    # ------------------------------------------------------------------
+    # İşlemler
+    # ------------------------------------------------------------------
+
+    def _solve(self, team: str, formation: str, budget: float, strategy: str) -> Dict:
+        team_df = self._team_frame(team)
+        selected_df, total_score, total_cost, status = solve_optimal_lineup(
+            team_df, formation, budget, strategy,
+            score_matrix=self.score_matrices[strategy]
+        )
+        return {
+            'team': team, 'formation': formation, 'budget': budget, 'strategy': strategy,
+            'status': status,
+            'total_score': round(float(total_score), 4),
+            'total_cost': round(float(total_cost), 1),
+            'lineup': selected_df
+        }
+
+    def _lineup(self, params: Dict) -> Dict:
+        key = ('optimize',) + self._parse_request(params)
+        return self._run_once(key, lambda: self._solve(*key[1:]))
+
+    def optimize(self, params: Dict) -> Dict:
+        """POST /optimize - optimal kadroyu döndürür."""
+        result = self._lineup(params)
+        lineup = result['lineup']
+        payload = {k: v for k, v in result.items() if k != 'lineup'}
+        payload['players'] = [] if lineup is None else lineup[
+            [c for c in LINEUP_COLUMNS if c in lineup.columns]
+        ].to_dict('records')
+        return payload
+
+    def analyze(self, analysis: str, params: Dict) -> Dict:
+        """POST /analyze/<analiz> - optimal kadro üzerinde analiz çalıştırır."""
+        runners = {
+            'decision': self._analyze_decision,
+            'sensitivity': self._analyze_sensitivity,
+            'compatibility': self._analyze_compatibility,
+            'bench': self._analyze_bench,
+            'narrative': self._analyze_narrative,
+        }
+        if analysis not in runners:
+            raise ServiceError(f"Bilinmeyen analiz: {analysis}", status=404)
+
+        # Kadro, işleyici thread'inde alınır (havuzda iç içe bekleme olmaz)
+        result = self._lineup(params)
+        if result['status'] != 'Optimal':
+            raise ServiceError(f"Optimizasyon başarısız: {result['status']}", status=422)
+
+        key = ('analyze', analysis) + self._parse_request(params)
+        output = self._run_once(key, lambda: runners[analysis](result))
+        return {
+            'team': result['team'], 'formation': result['formation'],
+            'budget': result['budget'], 'strategy': result['strategy'],
+            'analysis': analysis, 'result': output
+        }
+
+    def _analyze_decision(self, result: Dict) -> Dict:
+        return generate_decision_report(
+            result['lineup'], result['total_score'], result['budget'],
+            result['formation'], DEFAULT_ANALYSIS_WEIGHTS
+        )
+
+    def _analyze_sensitivity(self, result: Dict) -> Dict:
+        analyzer = SensitivityAnalyzer(result['lineup'], result['budget'], DEFAULT_ANALYSIS_WEIGHTS)
+        return {
+            'tornado': analyzer.tornado_analysis().to_dict('records'),
+            'ranking': analyzer.parameter_ranking().to_dict('records')
+        }
+
+    def _analyze_compatibility(self, result: Dict) -> Dict:
+        analyzer = CompatibilityAnalyzer(result['lineup'])
+        return {
+            'chemistry': analyzer.get_team_chemistry_score(),
+            'best_pairs': analyzer.get_best_pairs(top_n=5),
+            'weak_pairs': analyzer.get_weak_pairs(top_n=5)
+        }
+
+    def _analyze_bench(self, result: Dict) -> Dict:
+        analyzer = BenchAnalyzer(result['lineup'], self._team_frame(result['team']))
+        bench = analyzer.build_bench_squad()
+        return {
+            'bench': bench[[c for c in LINEUP_COLUMNS if c in bench.columns]].to_dict('records'),
+            'depth': analyzer.analyze_squad_depth()
+        }
+
+    def _analyze_narrative(self, result: Dict) -> Dict:
+        builder = NarrativeBuilder(result['lineup'], result['formation'], result['budget'])
+        return {'markdown': builder.generate_full_report(), 'insights': builder.get_quick_insights()}
+
+    def status(self) -> Dict:
+        with self._lock:
+            return {
+                'players': len(self.df_full),
+                'teams': len(self.teams),
+                'cached_results': len(self._cache),
+                'inflight': len(self._inflight),
+                **self.counters
+            }
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=True)
+
+
+def make_handler(service: OptimizationService):
+    """Servise bağlı HTTP istek işleyici sınıfını oluşturur."""
+
+    class Handler(BaseHTTPRequestHandler):
+        server_version = 'KDSService/1.0'
+
+        def log_message(self, format, *args):
+            pass  # Gecikmeler /metrics üzerinden izlenir
+
+        def _send(self, status: int, payload: Dict) -> None:
+            body = json.dumps(payload, ensure_ascii=False, default=_to_builtin).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _dispatch(self, endpoint: str, func: Callable[[], Dict]) -> None:
+            start = time.perf_counter()
+            error = False
+            try:
+                status, payload = 200, func()
+            except ServiceError as e:
+                error, status, payload = True, e.status, {'error': str(e)}
+            except json.JSONDecodeError as e:
+                error, status, payload = True, 400, {'error': f"Geçersiz JSON: {e}"}
+            except Exception as e:
+                error, status, payload = True, 500, {'error': f"{type(e).__name__}: {e}"}
+            service.metrics.record(endpoint, time.perf_counter() - start, error)
+            self._send(status, payload)
+
+        def _read_json(self) -> Dict:
+            length = int(self.headers.get('Content-Length') or 0)
+            if length == 0:
+                return {}
+            payload = json.loads(self.rfile.read(length).decode('utf-8'))
+            if not isinstance(payload, dict):
+                raise ServiceError("İstek gövdesi JSON nesnesi olmalı")
+            return payload
+
+        def do_GET(self):
+            path = self.path.split('?')[0].rstrip('/')
+            routes = {
+                '/health': lambda: {'status': 'ok', **service.status()},
+                '/teams': lambda: {'teams': service.teams},
+                '/metrics': lambda: {'endpoints': service.metrics.snapshot(), 'service': service.status()},
+            }
+            if path in routes:
+                self._dispatch(f'GET {path}', routes[path])
+            else:
+                self._send(404, {'error': f"Bulunamadı: {path}"})
+
+        def do_POST(self):
+            path = self.path.split('?')[0].rstrip('/')
+            if path == '/optimize':
+                self._dispatch('POST /optimize', lambda: service.optimize(self._read_json()))
+            elif path.startswith('/analyze/'):
+                analysis = path[len('/analyze/'):]
+                self._dispatch(f'POST /analyze/{analysis}',
+                               lambda: service.analyze(analysis, self._read_json()))
+            else:
+                self._send(404, {'error': f"Bulunamadı: {path}"})
+
+    return Handler
+
+
+def make_server(service: OptimizationService, host: str = '127.0.0.1', port: int = 8765) -> ThreadingHTTPServer:
+    """
+    HTTP sunucusunu oluşturur (başlatmaz). port=0 verilirse boş bir port seçilir;
+    seçilen port server.server_address[1] ile okunabilir.
+    """
+    return ThreadingHTTPServer((host, port), make_handler(service))
+
+
+def main(argv: Optional[list] = None) -> None:
+    parser = argparse.ArgumentParser(prog='python -m src.service',
+                                     description="Yerel KDS optimizasyon servisi")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--workers', type=int, default=4, help="Çözücü işçi sayısı")
+    parser.add_argument('--cache-size', type=int, default=256, help="Sonuç önbelleği boyutu")
+    parser.add_argument('--synthetic', type=int, default=None, metavar='N',
+                        help="Gerçek veri yerine N oyunculuk sentetik havuz kullan")
+    args = parser.parse_args(argv)
+
+    df_raw = generate_synthetic_players(args.synthetic) if args.synthetic else load_fc26_data()
+    service = OptimizationService(normalize_data(df_raw), max_workers=args.workers,
+                                  cache_size=args.cache_size)
+    server = make_server(service, args.host, args.port)
+
+    print(f"KDS servisi: http://{args.host}:{server.server_address[1]} ({len(service.teams)} takım)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.shutdown()
+
+
+if __name__ == '__main__':
+    main()